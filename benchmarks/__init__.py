@@ -0,0 +1 @@
+"""Benchmarks of the camera image pipeline."""
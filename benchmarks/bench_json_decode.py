@@ -0,0 +1,88 @@
+"""
+Benchmark of the Hypfer map decoding: decompression and JSON decoding with the
+json standard library, with orjson (the backend used by the connector when it
+is available) and with the stream decoder (low memory option).
+The payloads are the ones recorded with the "Take snapshot" of the camera
+(.storage/valetudo_camera/*.raw, zlib compressed Hypfer maps) or the PNG maps
+with the "ValetudoMap" text chunk; without arguments the sample map is used.
+--repeat N repeats the pixels of each layer N times, to simulate large maps.
+The peak memory is the tracemalloc peak of one decode.
+Usage: python -m benchmarks.bench_json_decode [--repeat N] [payload.raw ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tracemalloc
+import zlib
+
+from PIL import Image
+
+from benchmarks.sample import SAMPLE_FILE, timeit
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.map_stream import (
+    MapStreamDecoder,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_payload(file_path: str, repeat: int = 1) -> bytes:
+    """Return the zlib compressed map JSON of the recorded payload."""
+    with open(file_path, "rb") as file:
+        data = file.read()
+    if data.startswith(b"\x89PNG"):
+        with Image.open(file_path) as img:
+            data = zlib.compress(img.text["ValetudoMap"].encode())
+    if repeat > 1:
+        m_json = json.loads(zlib.decompress(data))
+        for layer in m_json.get("layers", []):
+            layer["compressedPixels"] = layer["compressedPixels"] * repeat
+        data = zlib.compress(json.dumps(m_json).encode())
+    return data
+
+
+def peak_mb(decode, payload: bytes) -> float:
+    """Return the peak memory in MB allocated by one decode."""
+    tracemalloc.start()
+    result = decode(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / (1024 * 1024)
+
+
+def main() -> None:
+    """Run the benchmark on each payload."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("payloads", nargs="*", default=[SAMPLE_FILE])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    decoders = {"json": lambda payload: json.loads(zlib.decompress(payload))}
+    if orjson is not None:
+        decoders["orjson"] = lambda payload: orjson.loads(zlib.decompress(payload))
+    else:
+        print("orjson is not installed, only the json standard library is measured.")
+    decoders["stream"] = lambda payload: MapStreamDecoder().decode(payload)
+    print(
+        f"{'payload':<24}{'decoder':<10}{'JSON KB':>10}"
+        f"{'decode ms':>12}{'peak MB':>10}"
+    )
+    for file_path in args.payloads:
+        payload = load_payload(file_path, args.repeat)
+        json_kb = len(zlib.decompress(payload)) / 1024
+        for name, decode in decoders.items():
+            print(
+                f"{os.path.basename(file_path)[:23]:<24}{name:<10}{json_kb:>10.1f}"
+                f"{timeit(decode, payload, rounds=args.rounds):>12.2f}"
+                f"{peak_mb(decode, payload):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
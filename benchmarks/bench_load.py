@@ -0,0 +1,121 @@
+"""
+Load test of the camera pipeline with simulated vacuums (benchmarks.simulator):
+each vacuum publishes its cleaning run to the in-process MQTT stand-in, its
+connector receives the maps and they are decoded and rendered as the camera
+does, all the vacuums in the same event loop.
+--firmware mixed alternates Hypfer and Rand256 vacuums.
+--speed 0 publishes the maps as fast as possible, 1 at the update interval.
+Usage: python -m benchmarks.bench_load [--vacuums N] [--house 12x8] [--rooms R]
+       [--path-length P] [--frames F] [--interval S] [--speed X] [--firmware F]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+
+from benchmarks.sample import async_process_map, make_shared
+from benchmarks.simulator import InProcessMqtt, VacuumSimulator
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+
+
+async def run_vacuum(
+    broker: InProcessMqtt, simulator: VacuumSimulator, speed: float
+) -> dict:
+    """Run the cleaning of a vacuum, return its payload sizes and frame times."""
+    shared = make_shared()
+    shared.file_name = simulator.base_topic.split("/")[1]
+    connector = ValetudoConnector(
+        simulator.base_topic, None, shared, mqtt_client=broker
+    )
+    await connector.async_subscribe_to_topics()
+    await simulator.async_start(broker, None)
+    handlers = {}
+    payloads = []
+    frames_ms = []
+    for frame in range(simulator.frames):
+        payloads.append(await simulator.async_publish_frame(broker, None, frame))
+        frame_ms = await async_process_map(connector, shared, handlers)
+        if frame_ms is not None:
+            frames_ms.append(frame_ms)
+        # Let the other vacuums run (and wait the update interval).
+        await asyncio.sleep(simulator.update_interval / speed if speed > 0 else 0)
+    await connector.async_unsubscribe_from_topics()
+    return {"firmware": simulator.firmware, "payloads": payloads, "frames": frames_ms}
+
+
+async def run(args) -> tuple[list[dict], InProcessMqtt]:
+    """Run all the vacuums in the same loop."""
+    broker = InProcessMqtt()
+    width, height = (float(value) for value in args.house.split("x"))
+    simulators = [
+        VacuumSimulator(
+            f"valetudo/vacuum{index}",
+            firmware=(
+                ("Hypfer", "Rand256")[index % 2]
+                if args.firmware == "mixed"
+                else args.firmware
+            ),
+            house_m=(width, height),
+            rooms=args.rooms,
+            path_length=args.path_length,
+            frames=args.frames,
+            update_interval=args.interval,
+            seed=index,
+        )
+        for index in range(args.vacuums)
+    ]
+    results = await asyncio.gather(
+        *(run_vacuum(broker, simulator, args.speed) for simulator in simulators)
+    )
+    return results, broker
+
+
+def main() -> None:
+    """Run the load test and print the frame times by firmware."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vacuums", type=int, default=2)
+    parser.add_argument("--house", default="12x8", help="width x height in m")
+    parser.add_argument("--rooms", type=int, default=6)
+    parser.add_argument("--path-length", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--speed", type=float, default=0.0)
+    parser.add_argument(
+        "--firmware", choices=("Hypfer", "Rand256", "mixed"), default="Hypfer"
+    )
+    args = parser.parse_args()
+    started = time.perf_counter()
+    results, broker = asyncio.run(run(args))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{args.vacuums} vacuums, {args.house} m, {args.rooms} rooms, "
+        f"{args.frames} frames: {elapsed:.1f} s, "
+        f"{broker.messages} messages ({broker.bytes / 1024 / 1024:.1f} MB), "
+        f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB"
+    )
+    print(
+        f"{'firmware':<10}{'payload KB':>12}{'frames':>8}"
+        f"{'median ms':>11}{'max ms':>9}"
+    )
+    for firmware in ("Hypfer", "Rand256"):
+        selected = [result for result in results if result["firmware"] == firmware]
+        if not selected:
+            continue
+        payloads = [size for result in selected for size in result["payloads"]]
+        frames_ms = [ms for result in selected for ms in result["frames"]]
+        print(
+            f"{firmware:<10}{statistics.mean(payloads) / 1024:>12.1f}"
+            f"{len(frames_ms):>8}"
+            f"{statistics.median(frames_ms) if frames_ms else 0:>11.1f}"
+            f"{max(frames_ms, default=0):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
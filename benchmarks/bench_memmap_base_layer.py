@@ -0,0 +1,83 @@
+"""
+Benchmark of the base layer storage: in memory (default) against the memory
+mapped files of the LayerStore. Each mode runs in a new process to compare
+the resident memory after rendering the frames: the memory mapped pages are
+counted in the RSS as shared (file backed) memory, the OS can page them out,
+the anonymous memory (RSS - shared) can only be swapped.
+Usage: python -m benchmarks.bench_memmap_base_layer
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+from benchmarks.sample import load_sample_json, make_shared
+from custom_components.valetudo_vacuum_camera.utils.layer_store import LayerStore
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler import (
+    MapImageHandler,
+)
+
+FRAMES = 10
+
+
+def _run_mode(mode: str) -> dict:
+    """Render the sample frames with the base layer storage mode."""
+    shared = make_shared()
+    if mode == "memmap":
+        shared.layer_store = LayerStore(tempfile.mkdtemp(), shared.file_name)
+    m_json = load_sample_json()
+    handler = MapImageHandler(shared)
+    process = psutil.Process()
+    mem_start = process.memory_info()
+    start = time.perf_counter()
+    asyncio.run(handler.async_get_image_from_json(m_json=m_json))
+    first_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        asyncio.run(handler.async_get_image_from_json(m_json=m_json))
+    frame_ms = (time.perf_counter() - start) * 1000 / FRAMES
+    mem = process.memory_info()
+    return {
+        "mode": mode,
+        "first_ms": first_ms,
+        "frame_ms": frame_ms,
+        "rss_mb": (mem.rss - mem_start.rss) / (1024 * 1024),
+        "anon_mb": ((mem.rss - mem.shared) - (mem_start.rss - mem_start.shared))
+        / (1024 * 1024),
+    }
+
+
+def main() -> None:
+    """Run the benchmark, one process for each mode."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=("memory", "memmap"))
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode)))
+        return
+    print(f"{'mode':<10}{'first ms':>10}{'frame ms':>10}{'RSS MB':>10}{'anon MB':>10}")
+    for mode in ("memory", "memmap"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_memmap_base_layer", "--mode", mode],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{result['mode']:<10}{result['first_ms']:>10.1f}"
+            f"{result['frame_ms']:>10.1f}{result['rss_mb']:>10.1f}"
+            f"{result['anon_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
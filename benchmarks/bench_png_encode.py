@@ -0,0 +1,45 @@
+"""
+Benchmark of the PNG encoding: RGBA (previous output) against the indexed
+colour "P" PNG, for some compression levels and zlib strategies.
+Usage: python -m benchmarks.bench_png_encode
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+from benchmarks.sample import make_shared, render_sample, timeit
+from custom_components.valetudo_vacuum_camera.utils.image_encoder import (
+    PNG_STRATEGIES,
+    ImageEncoder,
+)
+
+
+def _rgba_png(pil_img) -> bytes:
+    """The camera output before the indexed mode."""
+    buffered = BytesIO()
+    pil_img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    shared = make_shared()
+    pil_img = render_sample(shared).convert("RGBA")
+    encoder = ImageEncoder(shared)
+    print(f"Frame {pil_img.width}x{pil_img.height}, {len(pil_img.getcolors(4096))} colours")
+    print(f"{'mode':<10}{'level':>6}{'strategy':>14}{'ms':>10}{'bytes':>10}")
+    rgba_ms = timeit(_rgba_png, pil_img)
+    print(f"{'RGBA':<10}{6:>6}{'default':>14}{rgba_ms:>10.2f}{len(_rgba_png(pil_img)):>10}")
+    shared.png_indexed = True
+    for level in (1, 6, 9):
+        for strategy in PNG_STRATEGIES:
+            shared.png_compress_level = level
+            shared.png_compress_strategy = strategy
+            ms = timeit(encoder.to_png_bytes, pil_img)
+            size = len(encoder.to_png_bytes(pil_img))
+            print(f"{'indexed':<10}{level:>6}{strategy:>14}{ms:>10.2f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
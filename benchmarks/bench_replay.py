@@ -0,0 +1,119 @@
+"""
+Benchmark of a recorded cleaning run: the MQTT capture (recorded with the
+"Record the MQTT Messages" option, .storage/valetudo_camera/<vacuum>.mqtt) is
+replayed in the connector without broker, each map received is decoded and
+rendered as the camera does (Hypfer or Rand256 image handler).
+Without a capture, a short run of the sample map (robot moving along its path)
+is recorded in a temporary file and replayed.
+--speed 0 replays as fast as possible, 1 at the recorded speed.
+Usage: python -m benchmarks.bench_replay [--speed S] [capture.mqtt]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import zlib
+
+from benchmarks.sample import async_process_map, load_sample_json, make_shared
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.capture import (
+    MqttRecorder,
+    MqttReplay,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+
+BASE_TOPIC = "valetudo/benchmark"
+SAMPLE_FRAMES = 30
+SAMPLE_INTERVAL = 2.0  # Seconds between the maps of the sample run.
+
+
+def record_sample(file_path: str, frames: int = SAMPLE_FRAMES) -> None:
+    """Record a short Hypfer run of the sample map, the robot moving on its path."""
+    m_json = load_sample_json()
+    path = next(e for e in m_json["entities"] if e["type"] == "path")["points"]
+    robot = next(e for e in m_json["entities"] if e["type"] == "robot_position")
+    storage_path, file_name = os.path.split(file_path)
+    recorder = MqttRecorder(storage_path, file_name[: -len(".mqtt")], BASE_TOPIC)
+    for sub_topic, payload in (
+        ("$state", b"ready"),
+        ("BatteryStateAttribute/level", b"100"),
+        ("StatusStateAttribute/status", b"cleaning"),
+    ):
+        recorder.record(f"{BASE_TOPIC}/{sub_topic}", payload, timestamp=0.0)
+    for frame in range(frames):
+        step = (len(path) // 2) * (frame + 1) // frames
+        robot["points"] = path[2 * step : 2 * step + 2] or robot["points"]
+        recorder.record(
+            f"{BASE_TOPIC}/MapData/map-data",
+            zlib.compress(json.dumps(m_json).encode()),
+            timestamp=frame * SAMPLE_INTERVAL,
+        )
+    recorder.record(
+        f"{BASE_TOPIC}/StatusStateAttribute/status",
+        b"docked",
+        timestamp=frames * SAMPLE_INTERVAL,
+    )
+    recorder.flush()
+
+
+async def replay(file_path: str, speed: float) -> dict:
+    """Replay the capture, render each map received, return the frames times."""
+    shared = make_shared()
+    connector = ValetudoConnector(BASE_TOPIC, None, shared)
+    handlers = {}
+    frames_ms = []
+
+    async def process(_message) -> None:
+        frame_ms = await async_process_map(connector, shared, handlers)
+        if frame_ms is not None:
+            frames_ms.append(frame_ms)
+
+    stats = await MqttReplay(connector, BASE_TOPIC).async_replay(
+        file_path, speed=speed, on_message=process
+    )
+    stats["frames_ms"] = frames_ms
+    stats["connector"] = connector.get_diagnostics()
+    return stats
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("capture", nargs="?")
+    parser.add_argument("--speed", type=float, default=0.0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        capture = args.capture
+        if capture is None:
+            capture = os.path.join(temp_dir, "sample.mqtt")
+            record_sample(capture)
+        stats = asyncio.run(replay(capture, args.speed))
+    frames_ms = stats["frames_ms"]
+    mqtt = stats["connector"]
+    print(
+        f"messages {stats['messages']}, capture {stats['capture_s']} s, "
+        f"replay {stats['replay_s']} s, firmware {mqtt['firmware']}"
+    )
+    print(
+        f"maps received {mqtt['payloads_received']}, "
+        f"dropped {mqtt['payloads_dropped']}, rendered {len(frames_ms)}"
+    )
+    if frames_ms:
+        first_ms = frames_ms[0]
+        frames_ms = sorted(frames_ms)
+        print(
+            f"frame ms: first {first_ms:.1f}, "
+            f"median {statistics.median(frames_ms):.1f}, "
+            f"p95 {frames_ms[int(len(frames_ms) * 0.95) - 1]:.1f}, "
+            f"max {frames_ms[-1]:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of the integration startup: import time of the integration and of
+its platforms (camera, sensor) in a new process, after the Home Assistant
+components they depend on are already imported (as at the HA boot).
+The image handlers and isal are imported at the first payload, the benchmark
+also lists the integration modules loaded at startup that should be deferred
+(only the ones loaded by the integration: Home Assistant imports isal itself).
+Usage: python -m benchmarks.bench_startup
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+ROUNDS = 5
+
+# Imported by Home Assistant before the integration platforms.
+HA_MODULES = (
+    "homeassistant.components.camera",
+    "homeassistant.components.mqtt",
+    "homeassistant.components.sensor",
+)
+
+INTEGRATION_MODULES = (
+    "custom_components.valetudo_vacuum_camera",
+    "custom_components.valetudo_vacuum_camera.camera",
+    "custom_components.valetudo_vacuum_camera.sensor",
+)
+
+# Modules used only after the first payload.
+DEFERRED_MODULES = (
+    "isal",
+    "custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler",
+    "custom_components.valetudo_vacuum_camera.valetudo.rand256.image_handler",
+)
+
+
+def _run_once() -> dict:
+    """Import the integration in this (new) process."""
+    import importlib
+
+    for module in HA_MODULES:
+        importlib.import_module(module)
+    preloaded = set(sys.modules)
+    start = time.perf_counter()
+    for module in INTEGRATION_MODULES:
+        importlib.import_module(module)
+    import_ms = (time.perf_counter() - start) * 1000
+    return {
+        "import_ms": import_ms,
+        "loaded": [
+            module
+            for module in DEFERRED_MODULES
+            if module in sys.modules and module not in preloaded
+        ],
+    }
+
+
+def main() -> None:
+    """Run the benchmark, one process for each round."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+    if args.once:
+        print(json.dumps(_run_once()))
+        return
+    results = []
+    for _ in range(ROUNDS):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--once"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    times = [result["import_ms"] for result in results]
+    print(
+        f"Integration import: median {statistics.median(times):.1f} ms, "
+        f"min {min(times):.1f} ms, max {max(times):.1f} ms ({ROUNDS} processes)"
+    )
+    loaded = results[-1]["loaded"]
+    print(f"Deferred modules loaded at startup: {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Sample data shared by the benchmarks.
+The sample is the Valetudo (Hypfer) map in tests/mqtt_data.raw, the map json
+is stored in the "ValetudoMap" zTXt chunk of the PNG.
+Run the benchmarks from the repository root: python -m benchmarks.<name>
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+
+from PIL import Image
+
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.const import DEFAULT_VALUES
+from custom_components.valetudo_vacuum_camera.utils.colors_man import (
+    ColorsManagment,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler import (
+    MapImageHandler,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.image_handler import (
+    ReImageHandler,
+)
+
+SAMPLE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests",
+    "mqtt_data.raw",
+)
+
+
+def load_sample_json(file_path: str = SAMPLE_FILE) -> dict:
+    """Return the map json of the sample payload."""
+    with Image.open(file_path) as img:
+        return json.loads(img.text["ValetudoMap"])
+
+
+def make_shared(**options) -> CameraShared:
+    """Return the CameraShared with the default options (and colours)."""
+    device_info = dict(DEFAULT_VALUES)
+    device_info.update(options)
+    shared = CameraShared()
+    shared.file_name = "benchmark"
+    for key, value in device_info.items():
+        if hasattr(shared, key):
+            setattr(shared, key, value)
+    ColorsManagment(shared).set_initial_colours(device_info)
+    return shared
+
+
+def render_sample(shared: CameraShared, m_json: dict | None = None):
+    """Render the sample map with the Hypfer handler, return the PIL image."""
+    m_json = m_json or load_sample_json()
+    handler = MapImageHandler(shared)
+    return asyncio.run(handler.async_get_image_from_json(m_json=m_json))
+
+
+async def async_process_map(connector, shared: CameraShared, handlers: dict):
+    """
+    Decode and render the map available in the connector, as the camera does.
+    @param handlers: image handlers of the vacuum, by firmware (filled here).
+    @return: the time in milliseconds, None if no map was available.
+    """
+    if not await connector.is_data_available():
+        return None
+    started = time.perf_counter()
+    result, data_type = await connector.update_data(True)
+    if data_type == "Hypfer":
+        handler = handlers.setdefault(data_type, MapImageHandler(shared))
+        await handler.async_get_image_from_json(m_json=result)
+    elif result is not None:
+        handler = handlers.setdefault(data_type, ReImageHandler(shared))
+        await handler.get_image_from_rrm(
+            m_json=result, destinations=await connector.get_destinations()
+        )
+    await connector.discard_data()
+    return (time.perf_counter() - started) * 1000
+
+
+def timeit(func, *args, rounds: int = 20) -> float:
+    """Return the average time in milliseconds of func(*args)."""
+    func(*args)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(*args)
+    return (time.perf_counter() - start) * 1000 / rounds
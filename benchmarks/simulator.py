@@ -0,0 +1,471 @@
+"""
+Synthetic vacuum for the load tests, no hardware or broker needed.
+- VacuumSimulator: a house of rooms (grid of rectangles) cleaned along a
+  zigzag path, published as Hypfer map-data (zlib JSON: segments, walls, path,
+  robot, charger, obstacles, zones, virtual wall) or as Rand256 map_data (gzip
+  RRM binary with the blocks read by RRMapParser), with the status, battery
+  and (Rand256) destinations topics.
+- InProcessMqtt: stand-in of homeassistant.components.mqtt (async_subscribe
+  and async_publish), the messages are delivered in process to the callbacks
+  subscribed to the same topic (no wildcards).
+The house size (m), rooms, path points, frames of the run and update interval
+are parameters. The connector uses the stand-in with mqtt_client=InProcessMqtt().
+Usage: see benchmarks.bench_load
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import gzip
+import inspect
+import json
+import math
+import random
+import struct
+import uuid
+import zlib
+
+import numpy as np
+
+PIXEL_SIZE = 5  # cm, Hypfer pixelSize and Rand256 (50 mm) grid.
+PIXELS_PER_M = 100 // PIXEL_SIZE
+GRID_SIZE = 1024  # Map grid pixels (both firmwares).
+DIMENSION_MM = 50 * 1024  # Rand256 map size in mm.
+LANE = 4  # Pixels between the lanes of the cleaning path.
+WALL = 255  # Grid value of the walls (the rooms are 1 to 31).
+DOOR = 254  # Grid value of the doors (floor not in a segment).
+DOOR_WIDTH = 16  # Pixels.
+RRM_FLOOR = 0x07  # Rand256 pixel type of the floor (segment id in bits 3-7).
+
+
+@dataclass(slots=True)
+class SimulatedMessage:
+    """MQTT message delivered by InProcessMqtt."""
+
+    topic: str
+    payload: bytes | str
+    qos: int = 0
+    retain: bool = False
+
+
+class InProcessMqtt:
+    """Stand-in of homeassistant.components.mqtt, delivered in the same loop."""
+
+    def __init__(self):
+        self._subscribers: dict[str, list[tuple]] = {}
+        self.messages = 0
+        self.bytes = 0
+
+    async def async_subscribe(
+        self, hass, topic: str, msg_callback, qos: int = 0, encoding="utf-8"
+    ):
+        """Subscribe the callback to the topic, return the unsubscribe function."""
+        entry = (msg_callback, encoding)
+        self._subscribers.setdefault(topic, []).append(entry)
+
+        def unsubscribe() -> None:
+            self._subscribers[topic].remove(entry)
+
+        return unsubscribe
+
+    async def async_publish(
+        self,
+        hass,
+        topic: str,
+        payload,
+        qos: int = 0,
+        retain: bool = False,
+        encoding="utf-8",
+    ) -> None:
+        """Deliver the payload to the callbacks subscribed to the topic."""
+        if isinstance(payload, str):
+            payload = payload.encode(encoding or "utf-8")
+        self.messages += 1
+        self.bytes += len(payload)
+        for msg_callback, sub_encoding in list(self._subscribers.get(topic, [])):
+            value = payload.decode(sub_encoding) if sub_encoding else payload
+            result = msg_callback(SimulatedMessage(topic, value, qos, retain))
+            if inspect.isawaitable(result):
+                await result
+
+
+class VacuumSimulator:
+    """Publish the maps and the status of a simulated cleaning run."""
+
+    def __init__(
+        self,
+        base_topic: str,
+        firmware: str = "Hypfer",
+        house_m: tuple[float, float] = (12.0, 8.0),
+        rooms: int = 4,
+        path_length: int = 2000,
+        frames: int = 30,
+        update_interval: float = 2.0,
+        seed: int = 0,
+    ):
+        if firmware not in ("Hypfer", "Rand256"):
+            raise ValueError(f"Unknown firmware {firmware}.")
+        self.base_topic = base_topic
+        self.firmware = firmware
+        self.frames = frames
+        self.update_interval = update_interval
+        self._rng = random.Random(seed)
+        self._nonce = str(uuid.UUID(int=self._rng.getrandbits(128)))
+        self._width = min(GRID_SIZE - 2, max(8, int(house_m[0] * PIXELS_PER_M)))
+        self._height = min(GRID_SIZE - 2, max(8, int(house_m[1] * PIXELS_PER_M)))
+        self._left = (GRID_SIZE - self._width) // 2
+        self._top = (GRID_SIZE - self._height) // 2
+        # Rand256 stores the segment id in 5 bits.
+        self._rooms = self._layout(max(1, min(rooms, 31)))
+        self._grid = self._draw_grid()
+        self._path = self._cleaning_path(path_length)
+        self._obstacles = [
+            (self._rng.choice(["sock", "cable", "pet waste"]), self._random_point())
+            for _ in range(3)
+        ]
+
+    def _layout(self, rooms: int) -> list[tuple[int, int, int, int]]:
+        """Return the rooms (x0, y0, x1, y1) in grid pixels, walls included."""
+        cols = math.ceil(math.sqrt(rooms))
+        rows = math.ceil(rooms / cols)
+        xs = np.linspace(0, self._width - 1, cols + 1).round().astype(int).tolist()
+        ys = np.linspace(0, self._height - 1, rows + 1).round().astype(int).tolist()
+        layout = []
+        for row in range(rows):
+            for col in range(cols):
+                if len(layout) == rooms:
+                    break
+                # The last room of the last row takes the rest of the row.
+                last = len(layout) == rooms - 1
+                x1 = xs[-1] if last else xs[col + 1]
+                layout.append((xs[col], ys[row], x1, ys[row + 1]))
+        return layout
+
+    def _draw_grid(self) -> np.ndarray:
+        """Return the house grid: 0 outside, WALL, DOOR or the room number."""
+        grid = np.zeros((self._height, self._width), dtype=np.uint8)
+        for x0, y0, x1, y1 in self._rooms:
+            grid[y0 : y1 + 1, x0 : x1 + 1] = WALL
+        for room_id, (x0, y0, x1, y1) in enumerate(self._rooms, start=1):
+            grid[y0 + 1 : y1, x0 + 1 : x1] = room_id
+            # Doors in the inner walls, on the right and at the bottom.
+            half = min(DOOR_WIDTH, y1 - y0 - 2, x1 - x0 - 2) // 2
+            y_mid, x_mid = (y0 + y1) // 2, (x0 + x1) // 2
+            if x1 < self._width - 1 and grid[y_mid, x1 + 1]:
+                grid[y_mid - half : y_mid + half, x1] = DOOR
+            if y1 < self._height - 1 and grid[y1 + 1, x_mid]:
+                grid[y1, x_mid - half : x_mid + half] = DOOR
+        return grid
+
+    def _cleaning_path(self, path_length: int) -> np.ndarray:
+        """Return the zigzag path through the rooms, (N, 2) points in cm."""
+        vertices = []
+        for x0, y0, x1, y1 in self._rooms:
+            for lane, y in enumerate(range(y0 + 2, y1 - 1, LANE)):
+                ends = [(x0 + 2, y), (x1 - 2, y)]
+                vertices.extend(ends if lane % 2 == 0 else ends[::-1])
+        vertices = np.asarray(vertices, dtype=np.float64)
+        vertices += (self._left, self._top)
+        steps = np.hypot(*np.diff(vertices, axis=0).T)
+        distance = np.concatenate(([0.0], np.cumsum(steps)))
+        samples = np.linspace(0.0, distance[-1], max(2, path_length))
+        path = np.column_stack(
+            (
+                np.interp(samples, distance, vertices[:, 0]),
+                np.interp(samples, distance, vertices[:, 1]),
+            )
+        )
+        return np.round(path * PIXEL_SIZE).astype(np.int32)
+
+    def _random_point(self) -> tuple[int, int]:
+        """Return a point (cm) inside a random room."""
+        x0, y0, x1, y1 = self._rng.choice(self._rooms)
+        return (
+            (self._left + self._rng.randint(x0 + 1, x1 - 1)) * PIXEL_SIZE,
+            (self._top + self._rng.randint(y0 + 1, y1 - 1)) * PIXEL_SIZE,
+        )
+
+    def _room_rect(self, index: int) -> tuple[int, int, int, int]:
+        """Return the floor of the room as x0, y0, x1, y1 in cm."""
+        x0, y0, x1, y1 = self._rooms[index % len(self._rooms)]
+        return (
+            (self._left + x0 + 1) * PIXEL_SIZE,
+            (self._top + y0 + 1) * PIXEL_SIZE,
+            (self._left + x1 - 1) * PIXEL_SIZE,
+            (self._top + y1 - 1) * PIXEL_SIZE,
+        )
+
+    def _path_at(self, frame: int) -> np.ndarray:
+        """Return the path cleaned at the frame."""
+        count = len(self._path) * (frame + 1) // max(1, self.frames)
+        return self._path[: max(2, min(count, len(self._path)))]
+
+    @staticmethod
+    def _angle(path: np.ndarray) -> int:
+        """Return the heading (degrees) of the last path segment."""
+        dx, dy = (path[-1] - path[-2]).tolist()
+        return round(math.degrees(math.atan2(dy, dx))) % 360
+
+    def _runs(self, mask: np.ndarray) -> list[int]:
+        """Return the mask as Hypfer compressedPixels (x, y, length)."""
+        edges = np.diff(np.pad(mask.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        starts = np.argwhere(edges == 1)
+        ends = np.argwhere(edges == -1)
+        runs = np.column_stack(
+            (
+                starts[:, 1] + self._left,
+                starts[:, 0] + self._top,
+                ends[:, 1] - starts[:, 1],
+            )
+        )
+        return runs.ravel().tolist()
+
+    def hypfer_map(self, frame: int) -> dict:
+        """Return the Valetudo (Hypfer) map json of the frame."""
+        doors = self._grid == DOOR
+        layers = [
+            {
+                "__class": "MapLayer",
+                "metaData": {"area": int(doors.sum()) * PIXEL_SIZE * PIXEL_SIZE},
+                "type": "floor",
+                "pixels": [],
+                "compressedPixels": self._runs(doors),
+            }
+        ]
+        for room_id in range(1, len(self._rooms) + 1):
+            mask = self._grid == room_id
+            layers.append(
+                {
+                    "__class": "MapLayer",
+                    "metaData": {
+                        "segmentId": str(room_id),
+                        "name": f"Room {room_id}",
+                        "active": False,
+                        "area": int(mask.sum()) * PIXEL_SIZE * PIXEL_SIZE,
+                    },
+                    "type": "segment",
+                    "pixels": [],
+                    "compressedPixels": self._runs(mask),
+                }
+            )
+        walls = self._grid == WALL
+        layers.append(
+            {
+                "__class": "MapLayer",
+                "metaData": {"area": int(walls.sum()) * PIXEL_SIZE * PIXEL_SIZE},
+                "type": "wall",
+                "pixels": [],
+                "compressedPixels": self._runs(walls),
+            }
+        )
+        path = self._path_at(frame)
+        zx0, zy0, zx1, zy1 = self._room_rect(0)
+        nx0, ny0, nx1, ny1 = self._room_rect(-1)
+        wx0, wy0, wx1, wy1 = self._room_rect(1)
+        entities = [
+            {
+                "__class": "PathMapEntity",
+                "metaData": {},
+                "points": path.ravel().tolist(),
+                "type": "path",
+            },
+            {
+                "__class": "PointMapEntity",
+                "metaData": {},
+                "points": self._path[0].tolist(),
+                "type": "charger_location",
+            },
+            {
+                "__class": "PointMapEntity",
+                "metaData": {"angle": self._angle(path)},
+                "points": path[-1].tolist(),
+                "type": "robot_position",
+            },
+            {
+                "__class": "PolygonMapEntity",
+                "metaData": {},
+                "points": [zx0, zy0, zx1, zy0, zx1, zy1, zx0, zy1],
+                "type": "active_zone",
+            },
+            {
+                "__class": "PolygonMapEntity",
+                "metaData": {},
+                "points": [nx0, ny0, nx0 + 50, ny0, nx0 + 50, ny0 + 50, nx0, ny0 + 50],
+                "type": "no_go_area",
+            },
+            {
+                "__class": "LineMapEntity",
+                "metaData": {},
+                "points": [wx0, (wy0 + wy1) // 2, wx1, (wy0 + wy1) // 2],
+                "type": "virtual_wall",
+            },
+        ]
+        for label, point in self._obstacles:
+            entities.append(
+                {
+                    "__class": "PointMapEntity",
+                    "metaData": {"label": label},
+                    "points": list(point),
+                    "type": "obstacle",
+                }
+            )
+        return {
+            "__class": "ValetudoMap",
+            "metaData": {
+                "version": 2,
+                "nonce": self._nonce,
+                "totalLayerArea": int(self._grid.astype(bool).sum()) * PIXEL_SIZE**2,
+            },
+            "size": {"x": GRID_SIZE * PIXEL_SIZE, "y": GRID_SIZE * PIXEL_SIZE},
+            "pixelSize": PIXEL_SIZE,
+            "layers": layers,
+            "entities": entities,
+        }
+
+    def hypfer_payload(self, frame: int) -> bytes:
+        """Return the Hypfer map-data payload (zlib compressed json)."""
+        return zlib.compress(json.dumps(self.hypfer_map(frame)).encode())
+
+    def rand256_payload(self, frame: int) -> bytes:
+        """Return the Rand256 map_data payload (gzip compressed RRM binary)."""
+        # Image: grid rows bottom up, wall 1, the room number in the bits 3-7.
+        grid = self._grid[::-1]
+        pixels = np.select(
+            [grid == 0, grid == WALL, grid == DOOR],
+            [0, 1, RRM_FLOOR],
+            (grid << 3) | RRM_FLOOR,
+        )
+        pixels = pixels.astype(np.uint8).tobytes()
+        top = GRID_SIZE - self._top - self._height
+        # The IMAGE block is the first one, the parser reads its pixels only there.
+        blocks = [
+            struct.pack("<HHI", 2, 28, len(pixels))
+            + struct.pack(
+                "<iiiii", len(self._rooms), top, self._left, self._height, self._width
+            )
+            + pixels
+        ]
+        path = self._path_at(frame) * 10  # mm
+        points = np.column_stack((path[:, 0], DIMENSION_MM - path[:, 1]))
+        blocks.append(
+            struct.pack("<HHI", 3, 20, 4 * len(points))
+            + struct.pack("<III", len(points), 0, 0)
+            + points.astype("<u2").tobytes()
+        )
+        # Robot and charger are read back as stored (mirrored y, as the paths).
+        robot_x, robot_y = points[-1].tolist()
+        # Valetudo RE angle of the heading (inverse of MapModel.from_rand256).
+        angle = (100 - self._angle(path)) % 360
+        blocks.append(
+            struct.pack("<HHI", 8, 8, 12)
+            + struct.pack("<iii", robot_x, robot_y, angle)
+        )
+        charger_x, charger_y = points[0].tolist()
+        blocks.append(
+            struct.pack("<HHI", 1, 8, 12) + struct.pack("<iii", charger_x, charger_y, 0)
+        )
+        zx0, zy0, zx1, zy1 = (v * 10 for v in self._room_rect(0))
+        blocks.append(
+            struct.pack("<HHI", 6, 12, 8)
+            + struct.pack("<I", 1)
+            + struct.pack("<4H", zx0, DIMENSION_MM - zy0, zx1, DIMENSION_MM - zy1)
+        )
+        nx0, ny0, _, _ = (v * 10 for v in self._room_rect(-1))
+        nx1, ny1 = nx0 + 500, ny0 + 500
+        blocks.append(
+            struct.pack("<HHI", 9, 12, 16)
+            + struct.pack("<I", 1)
+            + struct.pack(
+                "<8H",
+                *(
+                    value
+                    for x, y in ((nx0, ny0), (nx1, ny0), (nx1, ny1), (nx0, ny1))
+                    for value in (x, DIMENSION_MM - y)
+                ),
+            )
+        )
+        wx0, wy0, wx1, wy1 = (v * 10 for v in self._room_rect(1))
+        wall_y = DIMENSION_MM - (wy0 + wy1) // 2
+        blocks.append(
+            struct.pack("<HHI", 10, 12, 16)
+            + struct.pack("<I", 1)
+            + struct.pack("<8H", wx0, wall_y, wx1, wall_y, 0, 0, 0, 0)
+        )
+        data = b"".join(blocks)
+        header = b"rr" + struct.pack("<HIHHII", 0x14, len(data), 1, 1, 1, frame + 1)
+        return gzip.compress(header + data)
+
+    def destinations(self) -> str:
+        """Return the Rand256 destinations (rooms names)."""
+        return json.dumps(
+            {
+                "spots": [],
+                "zones": [],
+                "rooms": [
+                    {"name": f"Room {room_id}", "id": room_id}
+                    for room_id in range(1, len(self._rooms) + 1)
+                ],
+                "updated": 0,
+            }
+        )
+
+    def map_payload(self, frame: int) -> bytes:
+        """Return the map payload of the frame for the firmware simulated."""
+        if self.firmware == "Hypfer":
+            return self.hypfer_payload(frame)
+        return self.rand256_payload(frame)
+
+    async def async_publish_status(self, mqtt, hass, status: str, battery: int):
+        """Publish the status and the battery level."""
+        topic = self.base_topic
+        if self.firmware == "Hypfer":
+            await mqtt.async_publish(hass, f"{topic}/$state", "ready")
+            await mqtt.async_publish(
+                hass, f"{topic}/BatteryStateAttribute/level", str(battery)
+            )
+            await mqtt.async_publish(
+                hass, f"{topic}/StatusStateAttribute/status", status
+            )
+        else:
+            await mqtt.async_publish(
+                hass,
+                f"{topic}/state",
+                json.dumps({"state": status, "battery_level": battery}),
+            )
+
+    async def async_start(self, mqtt, hass) -> None:
+        """Answer the Rand256 destinations requests, publish the cleaning status."""
+        if self.firmware == "Rand256":
+
+            async def handle_command(msg) -> None:
+                if json.loads(msg.payload).get("command") == "get_destinations":
+                    await mqtt.async_publish(
+                        hass, f"{self.base_topic}/destinations", self.destinations()
+                    )
+
+            await mqtt.async_subscribe(
+                hass, f"{self.base_topic}/custom_command", handle_command
+            )
+        await self.async_publish_status(mqtt, hass, "cleaning", 100)
+
+    async def async_publish_frame(self, mqtt, hass, frame: int) -> int:
+        """Publish the map of the frame, return the payload size."""
+        payload = self.map_payload(frame)
+        sub_topic = "MapData/map-data" if self.firmware == "Hypfer" else "map_data"
+        await mqtt.async_publish(
+            hass, f"{self.base_topic}/{sub_topic}", payload, encoding=None
+        )
+        return len(payload)
+
+    async def async_run(self, mqtt, hass, speed: float = 1.0) -> None:
+        """
+        Publish the whole run: status, the maps at the update interval, docked.
+        @param speed: 1.0 real time, 10.0 ten times faster, 0 no wait.
+        """
+        await self.async_start(mqtt, hass)
+        for frame in range(self.frames):
+            await self.async_publish_frame(mqtt, hass, frame)
+            if speed > 0:
+                await asyncio.sleep(self.update_interval / speed)
+        await self.async_publish_status(mqtt, hass, "docked", 100 - self.frames // 10)
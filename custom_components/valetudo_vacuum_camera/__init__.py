@@ -23,19 +23,25 @@ from .common import (
     update_options,
 )
 from .const import (
+    CONF_LOOP_WATCHDOG,
+    CONF_METRICS_INTERVAL,
     CONF_MQTT_HOST,
     CONF_MQTT_PASS,
     CONF_MQTT_USER,
     CONF_VACUUM_CONFIG_ENTRY_ID,
     CONF_VACUUM_CONNECTION_STRING,
     CONF_VACUUM_IDENTIFIERS,
+    DEFAULT_VALUES,
     DOMAIN,
+    PROCESS_METRICS,
 )
+from .utils.loop_watchdog import LOOP_WATCHDOG
+from .utils.metrics import CameraMetrics, ProcessMetrics
 from .utils.users_data import async_rename_room_description, get_translations_vacuum_id
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.CAMERA]
+PLATFORMS = [Platform.CAMERA, Platform.SENSOR]
 
 
 async def options_update_listener(
@@ -255,11 +261,32 @@ async def async_setup_entry(
     unsub_options_update_listener = entry.add_update_listener(options_update_listener)
     # Store a reference to the unsubscribe function to clean up if an entry is unloaded.
     hass_data["unsub_options_update_listener"] = unsub_options_update_listener
+    # Process metrics sampled in background (one sampler for all the cameras),
+    # published by the sensors.
+    process_metrics = hass.data[DOMAIN].setdefault(PROCESS_METRICS, ProcessMetrics())
+    process_metrics.async_start(
+        hass,
+        entry.entry_id,
+        int(
+            entry.options.get(
+                CONF_METRICS_INTERVAL, DEFAULT_VALUES[CONF_METRICS_INTERVAL]
+            )
+        ),
+    )
+    hass_data["metrics"] = CameraMetrics(
+        mqtt_topic_vacuum.split("/")[1].lower(), process_metrics
+    )
+    # Opt-in detector of the integration code blocking the event loop.
+    hass_data["loop_watchdog"] = bool(
+        entry.options.get(CONF_LOOP_WATCHDOG, DEFAULT_VALUES[CONF_LOOP_WATCHDOG])
+    )
+    if hass_data["loop_watchdog"]:
+        LOOP_WATCHDOG.enable()
     hass.data[DOMAIN][entry.entry_id] = hass_data
 
-    # Forward the setup to the camera platform.
+    # Forward the setup to the camera and sensor platforms.
     hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "camera")
+        hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     )
     return True
 
@@ -272,6 +299,12 @@ async def async_unload_entry(
         # Remove config entry from domain.
         entry_data = hass.data[DOMAIN].pop(entry.entry_id)
         entry_data["unsub_options_update_listener"]()
+        process_metrics = entry_data["metrics"].process
+        process_metrics.async_stop(entry.entry_id)
+        if not process_metrics.in_use:
+            hass.data[DOMAIN].pop(PROCESS_METRICS, None)
+        if entry_data.get("loop_watchdog"):
+            LOOP_WATCHDOG.disable()
 
     return unload_ok
 
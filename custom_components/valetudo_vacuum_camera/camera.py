@@ -10,18 +10,20 @@ import asyncio
 from asyncio import gather, get_event_loop
 import concurrent.futures
 from datetime import timedelta
-from io import BytesIO
 import json
 import logging
 import os
 import platform
+import threading
 import time
 from typing import Any, Optional
 
 from PIL import Image
+from aiohttp import web
 from homeassistant import config_entries, core
 from homeassistant.components.camera import PLATFORM_SCHEMA, Camera, CameraEntityFeature
-from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID
+from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.reload import async_setup_reload_service
@@ -36,13 +38,25 @@ from .common import get_vacuum_unique_id_from_mqtt_topic
 from .const import (
     ATTR_MARGINS,
     ATTR_ROTATE,
+    CAMERA_STATE_ACTIVE,
+    CAMERA_STATE_IDLE,
     CONF_ASPECT_RATIO,
     CONF_AUTO_ZOOM,
+    CONF_IMAGE_CODEC,
+    CONF_IMAGE_QUALITY,
+    CONF_MEMMAP_BASE_LAYER,
+    CONF_MQTT_RECORD,
     CONF_OFFSET_BOTTOM,
     CONF_OFFSET_LEFT,
     CONF_OFFSET_RIGHT,
     CONF_OFFSET_TOP,
+    CONF_PALETTE_MODE,
+    CONF_PNG_COMPRESS_LEVEL,
+    CONF_PNG_INDEXED,
+    CONF_PNG_STRATEGY,
     CONF_SNAPSHOTS_ENABLE,
+    CONF_STAGE_TIMINGS,
+    CONF_STREAM_DECODE,
     CONF_VAC_STAT,
     CONF_VAC_STAT_FONT,
     CONF_VAC_STAT_POS,
@@ -57,8 +71,16 @@ from .const import (
 )
 from .snapshots.snapshot import Snapshots
 from .utils.colors_man import ColorsManagment
+from .utils.frame_broadcast import STREAM_BOUNDARY, FrameBroadcast, multipart_frame
+from .utils.image_encoder import ImageEncoder
+from .utils.layer_store import LayerStore
+from .utils.loop_watchdog import watched
+from .utils.metrics import CameraMetrics
 from .utils.users_data import async_get_active_user_language, is_auth_updated
+from .utils.warm_start import WarmStart
+from .valetudo.MQTT.capture import MqttRecorder
 from .valetudo.MQTT.connector import ValetudoConnector
+from .valetudo.MQTT.vacuum_state import STATUS_TEXT_FIELDS
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
@@ -86,6 +108,8 @@ async def async_setup_entry(
         config.update(config_entry.options)
 
     camera = [ValetudoCamera(hass, config)]
+    # Reference used by the diagnostics of the config entry.
+    config["camera"] = camera[0]
     async_add_entities(camera, update_before_add=True)
 
 
@@ -139,6 +163,8 @@ class ValetudoCamera(Camera):
                 self._storage_path = f"{self._directory_path}/{STORAGE_DIR}"
             self.snapshot_img = f"{self._storage_path}/{self._file_name}.png"
             self.log_file = f"{self._storage_path}/{self._file_name}.zip"
+            # Render state persisted between the restarts.
+            self._warm_start = WarmStart(self._storage_path, self._file_name)
             self._attr_unique_id = device_info.get(
                 CONF_UNIQUE_ID,
                 get_vacuum_unique_id_from_mqtt_topic(self._mqtt_listen_topic),
@@ -155,7 +181,6 @@ class ValetudoCamera(Camera):
         self._attr_frame_interval = 6
         self._vac_json_available = None
         self._shared.attr_calibration_points = None
-        self._cpu_percent = None
         self._shared.offset_top = device_info.get(CONF_OFFSET_TOP, 0)
         self._shared.offset_down = device_info.get(CONF_OFFSET_BOTTOM, 0)
         self._shared.offset_left = device_info.get(CONF_OFFSET_LEFT, 0)
@@ -180,6 +205,26 @@ class ValetudoCamera(Camera):
             f"{self._directory_path}/www/snapshot_{self._file_name}.png"
         ):
             os.remove(f"{self._directory_path}/www/snapshot_{self._file_name}.png")
+        self._shared.palette_mode = device_info.get(CONF_PALETTE_MODE, False)
+        self._shared.png_indexed = device_info.get(CONF_PNG_INDEXED, False)
+        self._shared.png_compress_level = int(
+            device_info.get(CONF_PNG_COMPRESS_LEVEL, 6)
+        )
+        self._shared.png_compress_strategy = device_info.get(
+            CONF_PNG_STRATEGY, "default"
+        )
+        self._shared.image_codec = device_info.get(CONF_IMAGE_CODEC, "png")
+        self._shared.image_quality = int(device_info.get(CONF_IMAGE_QUALITY, 80))
+        self._shared.timings.enabled = device_info.get(CONF_STAGE_TIMINGS, False)
+        if device_info.get(CONF_MEMMAP_BASE_LAYER, False):
+            # Base layers in memory mapped files, the OS pages out the cold regions.
+            self._shared.layer_store = LayerStore(self._storage_path, self._file_name)
+        self._shared.stream_decode = device_info.get(CONF_STREAM_DECODE, False)
+        if device_info.get(CONF_MQTT_RECORD, False):
+            # Capture of the MQTT messages, replayed by the benchmarks.
+            self._shared.mqtt_recorder = MqttRecorder(
+                self._storage_path, self._file_name, self._mqtt_listen_topic
+            )
         # If there is a log zip in www remove it
         if os.path.isfile(self.log_file):
             os.remove(self.log_file)
@@ -191,18 +236,77 @@ class ValetudoCamera(Camera):
         self._colours.set_initial_colours(device_info)
         # Create the processor for the camera.
         self.processor = CameraProcessor(self.hass, self._shared)
+        # Process metrics and render cost, published by the sensors.
+        self._metrics = device_info.get("metrics") or CameraMetrics(self._file_name)
+        # Encoder of the camera frames.
+        self._encoder = ImageEncoder(self._shared)
+        self.content_type = self._encoder.content_type
+        self._frame = None  # Last rendered frame (not encoded).
+        self._frame_version = 0  # Incremented at each new frame.
+        self._text_frame = (0, None)  # (frame version, frame with status text)
+        self._last_fingerprint = None  # Inputs fingerprint of the last frame.
+        self._frames_skipped = 0  # Frames not rendered, same inputs.
+        self._camera_state = CAMERA_STATE_ACTIVE  # Polling state machine.
+        self._mqtt.set_activity_callback(self._async_vacuum_activity)
+        # The frame is encoded by one thread at time (async and sync requests).
+        self._encode_lock = threading.Lock()
+        # Live stream viewers share the same encoded frames.
+        self._broadcast = FrameBroadcast(self._file_name)
+        # The vacuum state is copied in the shared data when it changes.
+        self._state_changes: set[str] = set()  # Changed since the last update.
+        self._apply_vacuum_state()
+        self._unsubscribe_state = self._mqtt.state.subscribe(
+            self._async_vacuum_state_changed
+        )
 
     async def async_added_to_hass(self) -> None:
         """Handle entity added to Home Assistant."""
+        await self._async_load_warm_state()
+        self.async_on_remove(
+            self.hass.bus.async_listen(
+                EVENT_HOMEASSISTANT_STOP, self._async_save_warm_state
+            )
+        )
         await self._mqtt.async_subscribe_to_topics()
         self._should_poll = True
         self.async_schedule_update_ha_state(True)
 
     async def async_will_remove_from_hass(self) -> None:
         """Handle entity removal from Home Assistant."""
+        await self._async_save_warm_state()
         await super().async_will_remove_from_hass()
+        self._unsubscribe_state()
         if self._mqtt:
             await self._mqtt.async_unsubscribe_from_topics()
+        if self._shared.layer_store:
+            await self.hass.async_add_executor_job(self._shared.layer_store.close)
+
+    async def _async_load_warm_state(self) -> None:
+        """Serve the last frame saved and prepare the base layer restore."""
+        state = await self.hass.async_add_executor_job(
+            self._warm_start.load, self._shared
+        )
+        if not state:
+            return
+        self.processor.set_warm_state(state)
+        if state.get("calibration_points"):
+            self._shared.attr_calibration_points = state["calibration_points"]
+        if state.get("frame") and state.get("content_type") == self.content_type:
+            # Served until the first frame is rendered.
+            self.Image = state["frame"]
+
+    async def _async_save_warm_state(self, _event=None) -> None:
+        """Save the render state and the last frame."""
+        if self._frame is None:
+            return
+        bytes_data = await self.async_camera_image()
+        await self.hass.async_add_executor_job(
+            self._warm_start.save,
+            self._shared,
+            self.processor.get_warm_handler(),
+            bytes_data,
+            self.content_type,
+        )
 
     @property
     def name(self) -> str:
@@ -232,8 +336,146 @@ class ValetudoCamera(Camera):
     def camera_image(
         self, width: Optional[int] = None, height: Optional[int] = None
     ) -> Optional[bytes]:
-        """Camera Image"""
-        return self.Image
+        """Camera Image, the frame is encoded only when requested."""
+        frame, version = self._frame, self._frame_version
+        if frame is None:
+            return self.Image
+        bytes_data = self.process_pil_to_bytes(frame, version, width, height)
+        if width is None and height is None:
+            self.Image = bytes_data
+        return bytes_data
+
+    @watched
+    async def async_camera_image(
+        self, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[bytes]:
+        """Camera Image, the frame is encoded only when requested."""
+        # The frame and its version are read once, a new frame can be set
+        # while this one is encoded.
+        frame, version = self._frame, self._frame_version
+        if frame is None:
+            return self.Image
+        bytes_data = self._encoder.get_cached(version, width, height)
+        if bytes_data is None:
+            bytes_data = await self.run_async_pil_to_bytes(
+                frame, version, width, height
+            )
+        if width is None and height is None:
+            self.Image = bytes_data
+        return bytes_data
+
+    @watched
+    async def handle_async_mjpeg_stream(
+        self, request: web.Request
+    ) -> web.StreamResponse | None:
+        """
+        Live stream (multipart) of the camera.
+        A frame is sent only when a new frame version is available.
+        """
+        response = web.StreamResponse()
+        response.content_type = (
+            f"multipart/x-mixed-replace; boundary={STREAM_BOUNDARY}"
+        )
+        await response.prepare(request)
+        queue = self._broadcast.subscribe()
+        try:
+            bytes_data = await self.async_camera_image()
+            while True:
+                if bytes_data:
+                    await response.write(multipart_frame(self.content_type, bytes_data))
+                _, bytes_data = await queue.get()
+        except ConnectionError:
+            _LOGGER.debug(f"{self._file_name}: Stream viewer disconnected.")
+        except asyncio.CancelledError:
+            _LOGGER.debug(f"{self._file_name}: Stream closed.")
+            raise
+        finally:
+            self._broadcast.unsubscribe(queue)
+        return response
+
+    async def _async_publish_frame(self) -> None:
+        """Encode (once) and publish the new frame to the stream viewers."""
+        version = self._frame_version
+        if self._broadcast.has_viewers and self._broadcast.version != version:
+            bytes_data = await self.async_camera_image()
+            self._broadcast.publish(version, bytes_data)
+
+    def _render_fingerprint(self) -> int | None:
+        """
+        Fingerprint of the frame inputs: the map payload hash and the
+        camera shared data used to draw the frame.
+        """
+        payload_hash = self._mqtt.get_payload_hash()
+        if payload_hash is None:
+            return None
+        shared = self._shared
+        return hash(
+            (
+                payload_hash,
+                shared.vacuum_state,
+                shared.vacuum_connection,
+                str(shared.current_room),
+                shared.image_rotate,
+                shared.margins,
+                shared.image_aspect_ratio,
+                shared.image_auto_zoom,
+                shared.offset_top,
+                shared.offset_down,
+                shared.offset_left,
+                shared.offset_right,
+                str(shared.user_colors),
+                str(shared.rooms_colors),
+                str(shared.rand256_active_zone),
+                shared.destinations.payload_hash if shared.destinations else None,
+                shared.user_language,
+            )
+        )
+
+    def _set_frame(self, pil_img: Image.Image) -> None:
+        """Keep the last rendered frame, a new frame gets a new version."""
+        if pil_img is not self._frame:
+            self._frame = pil_img
+            self._frame_version += 1
+
+    def _refresh_status_text(self) -> bool:
+        """
+        New version of the same frame: the status text is drawn again
+        when the frame is encoded, the map is not rendered.
+        @return: True if there is a status text to refresh.
+        """
+        if self._frame is None or not self._shared.show_vacuum_state:
+            return False
+        self._frame_version += 1
+        _LOGGER.debug(f"{self._file_name}: Status text refreshed.")
+        return True
+
+    def _apply_vacuum_state(self) -> None:
+        """Copy the vacuum state of the connector in the camera shared data."""
+        state = self._mqtt.state.state
+        self._shared.vacuum_battery = (
+            str(state.battery) if state.battery is not None else None
+        )
+        self._shared.vacuum_connection = state.connection == "ready"
+        if not self._shared.vacuum_connection:
+            self._shared.vacuum_state = "disconnected"
+        else:
+            self._shared.vacuum_state = state.status
+        if self._shared.vacuum_state == "docked" and state.battery is not None:
+            # Charging: the frames are grabbed to update the status text.
+            self._shared.vacuum_bat_charged = int(state.battery) > 99
+        self._shared.rand256_active_zone = state.active_segments
+        self._shared.destinations = state.destinations
+
+    @callback
+    def _async_vacuum_state_changed(self, changed: set[str]) -> None:
+        """The vacuum state changed (notified by the connector state store)."""
+        self._apply_vacuum_state()
+        self._state_changes |= changed
+        if self._camera_state == CAMERA_STATE_IDLE and changed <= STATUS_TEXT_FIELDS:
+            # Polling stopped: only the status text of the last frame changes.
+            if self._refresh_status_text():
+                self.hass.async_create_task(self._async_publish_frame())
+            self.async_write_ha_state()
 
     @property
     def supported_features(self) -> int:
@@ -268,8 +510,59 @@ class ValetudoCamera(Camera):
             self._shared.map_pred_points != {}
         ):
             attrs["points"] = self._shared.map_pred_points
+        if self._shared.timings.enabled:
+            attrs["stage_timings"] = self._shared.timings.summary()
         return attrs
 
+    @staticmethod
+    def _image_bytes(pil_img: Image.Image | None) -> int:
+        """Return the size in memory of the image pixels."""
+        if pil_img is None:
+            return 0
+        return pil_img.width * pil_img.height * len(pil_img.getbands())
+
+    def get_diagnostics(self) -> dict:
+        """Return the performance data of the camera for the diagnostics."""
+        rendered = self._metrics.frames_rendered
+        checked = rendered + self._frames_skipped
+        return {
+            "file_name": self._file_name,
+            "camera_state": self._camera_state,
+            "frame_version": self._frame_version,
+            "frame_interval": self._attr_frame_interval,
+            "frame_size": [self._image_w, self._image_h],
+            "frames": {
+                "rendered": rendered,
+                "skipped": self._frames_skipped,
+                "skip_rate": (
+                    round(self._frames_skipped / checked, 3) if checked else None
+                ),
+            },
+            "encoder_cache": self._encoder.get_stats(),
+            # Frames kept in memory between the updates (bytes).
+            "frame_buffers": {
+                "frame": self._image_bytes(self._frame),
+                "text_frame": self._image_bytes(self._text_frame[1]),
+                "last_image": self._image_bytes(self._last_image),
+            },
+            "stream_viewers": self._broadcast.viewers,
+            "process": {
+                "cpu_percent": self._metrics.cpu_percent,
+                "rss_mb": self._metrics.rss_mb,
+                "memory_percent": self._metrics.memory_percent,
+                "render_time": self._metrics.render_time,
+            },
+            "mqtt": self._mqtt.get_diagnostics() if self._mqtt else None,
+            "handlers": self.processor.get_diagnostics(),
+            "memmap_layers": (
+                self._shared.layer_store.get_stats()
+                if self._shared.layer_store
+                else None
+            ),
+            "stage_timings_enabled": self._shared.timings.enabled,
+            "stage_timings": self._shared.timings.summary(),
+        }
+
     @property
     def should_poll(self) -> bool:
         """ON/OFF Camera Polling"""
@@ -291,13 +584,42 @@ class ValetudoCamera(Camera):
     def turn_on(self) -> None:
         """Camera Turn On"""
         # self._attr_is_on = True
+        self._camera_state = CAMERA_STATE_ACTIVE
         self._should_poll = True
 
     def turn_off(self) -> None:
         """Camera Turn Off"""
         # self._attr_is_on = False
+        self._camera_state = CAMERA_STATE_ACTIVE  # do not resume on activity.
         self._should_poll = False
 
+    async def _async_check_idle(self) -> bool:
+        """
+        Idle state: the vacuum is docked or idle and the snapshot was taken.
+        The polling stops, the last frame is served from the cache.
+        @return: True if the camera is idle.
+        """
+        if (
+            self._should_poll
+            and self._shared.vacuum_state in ("docked", "idle")
+            and self._shared.snapshot_take is True
+            and self._frame is not None
+            and not await self._mqtt.is_data_available()
+        ):
+            self._camera_state = CAMERA_STATE_IDLE
+            self._should_poll = False
+            _LOGGER.info(f"{self._file_name}: Camera idle, polling stopped.")
+        return self._camera_state == CAMERA_STATE_IDLE
+
+    @callback
+    def _async_vacuum_activity(self) -> None:
+        """The vacuum status or the map changed, resume from the idle state."""
+        if self._camera_state == CAMERA_STATE_IDLE:
+            self._camera_state = CAMERA_STATE_ACTIVE
+            self._should_poll = True
+            _LOGGER.info(f"{self._file_name}: Camera active, polling resumed.")
+            self.async_schedule_update_ha_state(True)
+
     def empty_if_no_data(self) -> Image.Image:
         """
         It will return the last image if available or
@@ -320,10 +642,12 @@ class ValetudoCamera(Camera):
                 _LOGGER.info(f"{self._file_name}: Returning Empty image.")
                 return empty_img
 
+    @watched
     async def take_snapshot(self, json_data: Any, image_data: Image.Image) -> None:
         """Camera Automatic Snapshots."""
         await self._snapshots.run_async_take_snapshot(json_data, image_data)
 
+    @watched
     async def load_test_json(self, file_path: str = None) -> Any:
         """Load a test json."""
         # Load a test json
@@ -337,6 +661,7 @@ class ValetudoCamera(Camera):
         else:
             return None
 
+    @watched
     async def async_update(self):
         """Camera Frame Update."""
         # check and update the vacuum reported state
@@ -346,31 +671,23 @@ class ValetudoCamera(Camera):
         if not self._mqtt:
             _LOGGER.debug(f"{self._file_name}: No MQTT data available.")
             # return last/empty image if no MQTT or CPU usage too high.
-            pil_img = self.empty_if_no_data()
-            self.Image = await self.hass.async_create_task(
-                self.run_async_pil_to_bytes(pil_img)
-            )
-            return self.Image
+            self._set_frame(self.empty_if_no_data())
+            return
 
-        # If we have data from MQTT, we process the image.
-        self._shared.vacuum_battery = await self._mqtt.get_battery_level()
-        self._shared.vacuum_connection = await self._mqtt.get_vacuum_connection_state()
-        if not self._shared.vacuum_connection:
-            self._shared.vacuum_state = "disconnected"
-        else:
-            if self._shared.vacuum_state == "disconnected":
-                self._shared.vacuum_state = await self._mqtt.get_vacuum_status()
-            else:
-                self._shared.vacuum_state = await self._mqtt.get_vacuum_status()
-        pid = os.getpid()  # Start to log the CPU usage of this PID.
-        proc = ProcInsp().psutil.Process(pid)  # Get the process PID.
+        # The vacuum state in the shared data is updated by the state store.
+        changes, self._state_changes = self._state_changes, set()
+        if await self._async_check_idle():
+            return
         process_data = await self._mqtt.is_data_available()
+        if not process_data:
+            if not changes.isdisjoint(STATUS_TEXT_FIELDS):
+                # Only the status text changed, the map is not rendered again.
+                if self._refresh_status_text():
+                    await self._async_publish_frame()
+            return
         if process_data:
             # to calculate the cycle time for frame adjustment.
             start_time = time.perf_counter()
-            self._cpu_percent = round(
-                ((proc.cpu_percent() / int(ProcInsp().psutil.cpu_count())) / 10), 1
-            )
             self._processing = True
             # if the vacuum is working, or it is the first image.
             if (
@@ -390,13 +707,22 @@ class ValetudoCamera(Camera):
                 _LOGGER.info(
                     f"{self._file_name}: Camera image data update available: {process_data}"
                 )
+            fingerprint = self._render_fingerprint()
+            if fingerprint is not None and fingerprint == self._last_fingerprint:
+                # Same inputs of the last frame, nothing to parse or render.
+                _LOGGER.debug(f"{self._file_name}: Frame inputs unchanged, skipping.")
+                await self._mqtt.discard_data()
+                if not changes.isdisjoint(STATUS_TEXT_FIELDS):
+                    if self._refresh_status_text():
+                        await self._async_publish_frame()
+                self._frames_skipped += 1
+                self._processing = False
+                return
             try:
                 parsed_json = await self._mqtt.update_data(self._shared.image_grab)
                 if not parsed_json:
                     self._vac_json_available = "Error"
-                    self.Image = await self.hass.async_create_task(
-                        self.run_async_pil_to_bytes(self.empty_if_no_data())
-                    )
+                    self._set_frame(self.empty_if_no_data())
                     raise ValueError
 
                 if parsed_json[1] == "Rand256":
@@ -418,7 +744,6 @@ class ValetudoCamera(Camera):
                 # Just in case, let's check that the data is available.
                 if parsed_json is not None:
                     if self._rrm_data:
-                        self._shared.destinations = await self._mqtt.get_destinations()
                         pil_img = await self.hass.async_create_task(
                             self.processor.run_async_process_valetudo_data(
                                 self._rrm_data
@@ -431,14 +756,15 @@ class ValetudoCamera(Camera):
                     else:
                         # if no image was processed empty or last snapshot/frame
                         pil_img = self.empty_if_no_data()
-                    # Converting the image obtained to bytes
-                    # Using openCV would reduce the CPU and memory usage.
-                    # On Py4 HA OS is not possible to install the openCV library.
-                    # backup the image
-                    self._last_image = pil_img
-                    self.Image = await self.hass.async_create_task(
-                        self.run_async_pil_to_bytes(pil_img)
-                    )
+                    # backup the image, it will be converted to bytes
+                    # only when the camera image is requested.
+                    if pil_img:
+                        self._last_image = pil_img
+                        self._set_frame(pil_img)
+                        self._last_fingerprint = fingerprint
+                    else:
+                        self._set_frame(self.empty_if_no_data())
+                    await self._async_publish_frame()
                     # take a snapshot if we meet the conditions.
                     if self._shared.snapshot_take:
                         if pil_img:
@@ -450,6 +776,7 @@ class ValetudoCamera(Camera):
                     del pil_img
                     _LOGGER.debug(f"{self._file_name}: Image update complete")
                     processing_time = round((time.perf_counter() - start_time), 3)
+                    self._metrics.record_render(processing_time)
                     # Adjust the frame interval to the processing time.
                     self._attr_frame_interval = max(0.1, processing_time)
                     _LOGGER.debug(
@@ -461,41 +788,46 @@ class ValetudoCamera(Camera):
                         f"{self._file_name}: Image not processed. Returning not updated image."
                     )
                     self._attr_frame_interval = 0.1
-                self.camera_image(self._image_w, self._image_h)
-                # HA supervised Memory and CUP usage report.
-                memory_percent = round(
-                    (
-                        (proc.memory_info()[0] / 2.0**30)
-                        / (ProcInsp().psutil.virtual_memory().total / 2.0**30)
-                    )
-                    * 100,
-                    2,
-                )
-                self._cpu_percent = round(
-                    ((proc.cpu_percent() / int(ProcInsp().psutil.cpu_count())) / 10), 1
-                )
-                _LOGGER.debug(
-                    f"{self._file_name} System CPU usage stat: {self._cpu_percent}%"
-                )
+                # HA supervised Memory and CUP usage (sampled in background).
                 _LOGGER.debug(
-                    f"{self._file_name} Camera Memory usage in GB: "
-                    f"{round(proc.memory_info()[0] / 2. ** 30, 2)}, "
-                    f"{memory_percent}% of Total."
+                    f"{self._file_name} System CPU usage stat: "
+                    f"{self._metrics.cpu_percent}%, Camera Memory usage: "
+                    f"{self._metrics.rss_mb} MB, {self._metrics.memory_percent}% of Total."
                 )
                 self._processing = False
-                return self.camera_image(self._image_w, self._image_h)
 
-    async def async_pil_to_bytes(self, pil_img) -> Optional[bytes]:
-        """Convert PIL image to bytes"""
-        if pil_img:
+    async def async_pil_to_bytes(
+        self,
+        pil_img,
+        version: int,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """Convert PIL image to bytes (downscaled to width and height if requested)"""
+        # The frame version was already encoded.
+        bytes_data = self._encoder.get_cached(version, width, height)
+        if bytes_data is not None:
+            _LOGGER.debug(f"{self._file_name}: Output cached Image.")
+            return bytes_data
+        if pil_img and self._text_frame[0] == version:
+            # Status text already drawn on this frame version.
+            pil_img = self._text_frame[1]
+        elif pil_img:
             self._last_image = pil_img
             _LOGGER.debug(
                 f"{self._file_name}: Image from Json: {self._shared.vac_json_id}."
             )
             if self._shared.show_vacuum_state:
+                # The status text is drawn on a copy (RGBA): the rendered frame
+                # is kept without text, a status text refresh draws it again.
+                if pil_img.mode == "P":
+                    pil_img = pil_img.convert("RGBA")
+                else:
+                    pil_img = pil_img.copy()
                 pil_img = await self.processor.run_async_draw_image_text(
                     pil_img, self._shared.user_colors[8]
                 )
+            self._text_frame = (version, pil_img)
         else:
             if self._last_image is not None:
                 _LOGGER.debug(f"{self._file_name}: Output Last Image.")
@@ -505,23 +837,24 @@ class ValetudoCamera(Camera):
                 pil_img = self.empty_if_no_data()
         self._image_w = pil_img.width
         self._image_h = pil_img.height
-        buffered = BytesIO()
-        pil_img.save(buffered, format="PNG")
-        bytes_data = buffered.getvalue()
-        del buffered, pil_img
+        bytes_data = self._encoder.encode(pil_img, version, width, height)
+        del pil_img
         return bytes_data
 
-    def process_pil_to_bytes(self, pil_img):
+    def process_pil_to_bytes(self, pil_img, version, width=None, height=None):
         """Async function to process the image data from the Vacuum Json data."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(self.async_pil_to_bytes(pil_img))
-        finally:
-            loop.close()
+        with self._encode_lock:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                result = loop.run_until_complete(
+                    self.async_pil_to_bytes(pil_img, version, width, height)
+                )
+            finally:
+                loop.close()
         return result
 
-    async def run_async_pil_to_bytes(self, pil_img):
+    async def run_async_pil_to_bytes(self, pil_img, version, width=None, height=None):
         """Thread function to process the image data from the Vacuum Json data."""
         num_processes = 1
         pil_img_list = [pil_img for _ in range(num_processes)]
@@ -535,6 +868,9 @@ class ValetudoCamera(Camera):
                     executor,
                     self.process_pil_to_bytes,
                     pil_img,
+                    version,
+                    width,
+                    height,
                 )
                 for pil_img in pil_img_list
             ]
@@ -16,8 +16,6 @@ from .types import Color, JsonType, PilPNG
 from .utils.drawable import Drawable as Draw
 from .utils.status_text import StatusText
 from .utils.users_data import async_get_active_user_language
-from .valetudo.hypfer.image_handler import MapImageHandler
-from .valetudo.rand256.image_handler import ReImageHandler
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 _LOGGER.propagate = True
@@ -30,8 +28,12 @@ class CameraProcessor:
 
     def __init__(self, hass, camera_shared):
         self.hass = hass
-        self._map_handler = MapImageHandler(camera_shared)
-        self._re_handler = ReImageHandler(camera_shared)
+        # The image handlers are created (and imported) at the first payload,
+        # in the processing thread: a vacuum uses only one firmware.
+        self._map_handler = None  # Hypfer
+        self._re_handler = None  # Rand256
+        self._warm_state = None  # Render state to restore in the Hypfer handler.
+        self._rooms_version = None  # Rand256 rooms attributes in the shared data.
         self._shared = camera_shared
         self._file_name = self._shared.file_name
         self._translations_path = self.hass.config.path(
@@ -46,9 +48,12 @@ class CameraProcessor:
         :return pil_img:
         """
         if parsed_json is not None:
+            self._get_map_handler()
+            started = self._shared.timings.start()
             pil_img = await self._map_handler.async_get_image_from_json(
                 m_json=parsed_json,
             )
+            self._shared.timings.stop("render", started)
 
             if self._shared.export_svg:
                 self._shared.export_svg = False
@@ -108,20 +113,28 @@ class CameraProcessor:
         :return: pil_img
         """
         if parsed_json is not None:
+            self._get_re_handler()
+            started = self._shared.timings.start()
             pil_img = await self._re_handler.get_image_from_rrm(
                 m_json=parsed_json,
                 destinations=self._shared.destinations,
             )
+            self._shared.timings.stop("render", started)
 
             if pil_img is not None:
-                if self._shared.map_rooms is None:
-                    destinations = self._shared.destinations
-                    if destinations is not None:
+                destinations = self._shared.destinations
+                if destinations is not None and (
+                    self._shared.map_rooms is None
+                    or self._rooms_version != self._re_handler.rooms_version
+                ):
+                    rooms = await self._re_handler.get_rooms_attributes(destinations)
+                    self._rooms_version = self._re_handler.rooms_version
+                    if rooms:
                         (
                             self._shared.map_rooms,
                             self._shared.map_pred_zones,
                             self._shared.map_pred_points,
-                        ) = await self._re_handler.get_rooms_attributes(destinations)
+                        ) = rooms
                     if self._shared.map_rooms:
                         _LOGGER.debug(
                             f"\n{self._file_name}: State attributes rooms updated"
@@ -199,9 +212,70 @@ class CameraProcessor:
 
         return result
 
+    def _get_map_handler(self):
+        """Return the Hypfer image handler, created at the first call."""
+        if self._map_handler is None:
+            from .valetudo.hypfer.image_handler import MapImageHandler
+
+            _LOGGER.debug(f"{self._file_name}: Creating the Hypfer image handler.")
+            self._map_handler = MapImageHandler(self._shared)
+            self._map_handler.warm_state = self._warm_state
+            self._warm_state = None
+        return self._map_handler
+
+    def _get_re_handler(self):
+        """Return the Rand256 image handler, created at the first call."""
+        if self._re_handler is None:
+            from .valetudo.rand256.image_handler import ReImageHandler
+
+            _LOGGER.debug(f"{self._file_name}: Creating the Rand256 image handler.")
+            self._re_handler = ReImageHandler(self._shared)
+        return self._re_handler
+
     def get_frame_number(self):
         """Get the frame number."""
-        return self._map_handler.get_frame_number() - 2
+        frame_number = self._map_handler.get_frame_number() if self._map_handler else 0
+        return frame_number - 2
+
+    def set_warm_state(self, state: dict) -> None:
+        """Set the render state saved before the restart (Hypfer base layer)."""
+        if self._map_handler is None:
+            self._warm_state = state
+        else:
+            self._map_handler.warm_state = state
+
+    def get_warm_handler(self):
+        """Return the image handler with the base layer to save (Hypfer only)."""
+        if (
+            self._shared.is_rand
+            or self._map_handler is None
+            or self._map_handler.img_base_layer is None
+        ):
+            return None
+        return self._map_handler
+
+    @staticmethod
+    def _handler_diagnostics(handler) -> dict | None:
+        """Return the canvas and base layer data of the image handler."""
+        if handler is None:
+            return None  # Not created, the vacuum uses the other firmware.
+        base_layer = handler.img_base_layer
+        return {
+            "frame_number": handler.frame_number,
+            "base_layer_builds": handler.base_layer_builds,
+            "canvas_shape": list(base_layer.shape) if base_layer is not None else None,
+            "canvas_bytes": base_layer.nbytes if base_layer is not None else 0,
+            "image_size": handler.img_size,
+            "crop_image_size": handler.crop_img_size,
+            "palette_mode": handler.palette is not None,
+        }
+
+    def get_diagnostics(self) -> dict:
+        """Return the diagnostics of the image handlers."""
+        return {
+            "hypfer": self._handler_diagnostics(self._map_handler),
+            "rand256": self._handler_diagnostics(self._re_handler),
+        }
 
     """
     Functions to Thread the image text processing.
@@ -214,6 +288,7 @@ class CameraProcessor:
         if self._shared.user_language is None:
             self._shared.user_language = await async_get_active_user_language(self.hass)
         if pil_img is not None:
+            started = self._shared.timings.start()
             text, size = self._status_text.get_status_text(pil_img)
             Draw.status_text(
                 image=pil_img,
@@ -223,6 +298,7 @@ class CameraProcessor:
                 path_font=font,
                 position=img_top,
             )
+            self._shared.timings.stop("status_text", started)
         return pil_img
 
     def process_status_text(
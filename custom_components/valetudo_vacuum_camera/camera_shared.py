@@ -7,6 +7,7 @@ Version: v2024.05.2
 import logging
 
 from custom_components.valetudo_vacuum_camera.types import Colors
+from custom_components.valetudo_vacuum_camera.utils.timings import StageTimings
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ class CameraShared(object):
 
     def __init__(self):
         self.frame_number: int = 0  # camera Frame number
-        self.destinations: list = []  # MQTT rand destinations
+        self.destinations = None  # MQTT rand destinations (Destinations)
         self.rand256_active_zone: list = []  # Active zone for rand256
         self.is_rand: bool = False  # MQTT rand data
         self._new_mqtt_message = False  # New MQTT message
@@ -58,6 +59,16 @@ class CameraShared(object):
         self.export_svg = False  # Export SVG
         self.svg_path = None  # SVG Export path
         self.enable_snapshots = False  # Enable snapshots
+        self.palette_mode: bool = False  # Palette (8-bit indexed) rendering
+        self.png_indexed: bool = False  # Indexed colour PNG output
+        self.png_compress_level: int = 6  # PNG zlib compression level
+        self.png_compress_strategy: str = "default"  # PNG zlib strategy
+        self.image_codec: str = "png"  # Output codec (png, webp, jpeg)
+        self.image_quality: int = 80  # WebP and JPEG quality
+        self.timings = StageTimings()  # Render pipeline stage timings
+        self.layer_store = None  # Memory mapped base layers (LayerStore)
+        self.stream_decode: bool = False  # Low memory Hypfer map decoding
+        self.mqtt_recorder = None  # Recorder of the MQTT messages (MqttRecorder)
         self.file_name = ""  # vacuum friendly name as File name
         self.attr_calibration_points = None  # Calibration points of the image
         self.map_rooms = None  # Rooms data from the vacuum
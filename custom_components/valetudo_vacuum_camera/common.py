@@ -12,7 +12,7 @@ from homeassistant.components.vacuum import DOMAIN as VACUUM_DOMAIN
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr, entity_registry as er
 
-from .const import KEYS_TO_UPDATE
+from .const import DEFAULT_VALUES, KEYS_TO_UPDATE
 from .hass_types import GET_MQTT_DATA
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
@@ -96,8 +96,13 @@ async def update_options(bk_options, new_options):
     # updated_options = {}
     keys_to_update = KEYS_TO_UPDATE
     try:
+        # Options added after the entry was created fall back to the defaults.
         updated_options = {
-            key: new_options[key] if key in new_options else bk_options[key]
+            key: (
+                new_options[key]
+                if key in new_options
+                else bk_options.get(key, DEFAULT_VALUES[key])
+            )
             for key in keys_to_update
         }
     except KeyError as e:
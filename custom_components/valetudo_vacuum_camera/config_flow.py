@@ -60,11 +60,23 @@ from .const import (
     COLOR_ZONE_CLEAN,
     CONF_ASPECT_RATIO,
     CONF_AUTO_ZOOM,
+    CONF_IMAGE_CODEC,
+    CONF_IMAGE_QUALITY,
+    CONF_LOOP_WATCHDOG,
+    CONF_MEMMAP_BASE_LAYER,
+    CONF_METRICS_INTERVAL,
+    CONF_MQTT_RECORD,
     CONF_OFFSET_BOTTOM,
     CONF_OFFSET_LEFT,
     CONF_OFFSET_RIGHT,
     CONF_OFFSET_TOP,
+    CONF_PALETTE_MODE,
+    CONF_PNG_COMPRESS_LEVEL,
+    CONF_PNG_INDEXED,
+    CONF_PNG_STRATEGY,
     CONF_SNAPSHOTS_ENABLE,
+    CONF_STAGE_TIMINGS,
+    CONF_STREAM_DECODE,
     CONF_VAC_STAT,
     CONF_VAC_STAT_FONT,
     CONF_VAC_STAT_POS,
@@ -75,9 +87,14 @@ from .const import (
     DEFAULT_VALUES,
     DOMAIN,
     FONTS_AVAILABLE,
+    IMAGE_CODEC_VALUES,
+    IMAGE_QUALITY_VALUES,
     IS_ALPHA,
     IS_ALPHA_R1,
     IS_ALPHA_R2,
+    METRICS_INTERVAL_VALUES,
+    PNG_LEVEL_VALUES,
+    PNG_STRATEGY_VALUES,
     RATIO_VALUES,
     ROTATION_VALUES,
     TEXT_SIZE_VALUES,
@@ -194,6 +211,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 options=RATIO_VALUES,
                 mode=SelectSelectorMode.DROPDOWN,
             )
+            png_level: NumberSelectorConfig = PNG_LEVEL_VALUES
+            png_strategy_selector = SelectSelectorConfig(
+                options=PNG_STRATEGY_VALUES,
+                mode=SelectSelectorMode.DROPDOWN,
+            )
+            image_codec_selector = SelectSelectorConfig(
+                options=IMAGE_CODEC_VALUES,
+                mode=SelectSelectorMode.DROPDOWN,
+            )
+            image_quality: NumberSelectorConfig = IMAGE_QUALITY_VALUES
+            metrics_interval: NumberSelectorConfig = METRICS_INTERVAL_VALUES
             self.IMG_SCHEMA = vol.Schema(
                 {
                     vol.Required(
@@ -262,6 +290,58 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     ): ColorRGBSelector(),
                 }
             )
+            self.PERFORMANCE_SCHEMA = vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PALETTE_MODE,
+                        default=config_entry.options.get(CONF_PALETTE_MODE, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_PNG_INDEXED,
+                        default=config_entry.options.get(CONF_PNG_INDEXED, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_PNG_COMPRESS_LEVEL,
+                        default=config_entry.options.get(CONF_PNG_COMPRESS_LEVEL, 6),
+                    ): NumberSelector(png_level),
+                    vol.Optional(
+                        CONF_PNG_STRATEGY,
+                        default=config_entry.options.get(CONF_PNG_STRATEGY, "default"),
+                    ): SelectSelector(png_strategy_selector),
+                    vol.Optional(
+                        CONF_IMAGE_CODEC,
+                        default=config_entry.options.get(CONF_IMAGE_CODEC, "png"),
+                    ): SelectSelector(image_codec_selector),
+                    vol.Optional(
+                        CONF_IMAGE_QUALITY,
+                        default=config_entry.options.get(CONF_IMAGE_QUALITY, 80),
+                    ): NumberSelector(image_quality),
+                    vol.Optional(
+                        CONF_METRICS_INTERVAL,
+                        default=config_entry.options.get(CONF_METRICS_INTERVAL, 60),
+                    ): NumberSelector(metrics_interval),
+                    vol.Optional(
+                        CONF_STAGE_TIMINGS,
+                        default=config_entry.options.get(CONF_STAGE_TIMINGS, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_LOOP_WATCHDOG,
+                        default=config_entry.options.get(CONF_LOOP_WATCHDOG, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_MEMMAP_BASE_LAYER,
+                        default=config_entry.options.get(CONF_MEMMAP_BASE_LAYER, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_STREAM_DECODE,
+                        default=config_entry.options.get(CONF_STREAM_DECODE, False),
+                    ): BooleanSelector(),
+                    vol.Optional(
+                        CONF_MQTT_RECORD,
+                        default=config_entry.options.get(CONF_MQTT_RECORD, False),
+                    ): BooleanSelector(),
+                }
+            )
             self.COLOR_BASE_SCHEMA = vol.Schema(
                 {
                     vol.Optional(
@@ -408,6 +488,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     return await self.async_step_download_logs()
                 elif next_action == "opt_4":
                     return await self.async_rename_translations()
+                elif next_action == "opt_5":
+                    return await self.async_step_performance()
                 elif next_action == "more options":
                     """
                     From TAPO custom control component, this is,
@@ -424,6 +506,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 {"label": "configure_status_text", "value": "opt_2"},
                 {"label": "copy_camera_logs_to_www", "value": "opt_3"},
                 {"label": "rename_colours_descriptions", "value": "opt_4"},
+                {"label": "configure_performance", "value": "opt_5"},
             ],
             mode=SelectSelectorMode.LIST,
             translation_key="camera_config_advanced",
@@ -509,6 +592,40 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             description_placeholders=self.options,
         )
 
+    async def async_step_performance(self, user_input: Optional[Dict[str, Any]] = None):
+        """
+        Images Rendering Performance Configuration
+        """
+        if user_input is not None:
+            self.options.update(
+                {
+                    "palette_mode": user_input.get(CONF_PALETTE_MODE),
+                    "png_indexed": user_input.get(CONF_PNG_INDEXED),
+                    "png_compress_level": int(
+                        user_input.get(CONF_PNG_COMPRESS_LEVEL, 6)
+                    ),
+                    "png_compress_strategy": user_input.get(CONF_PNG_STRATEGY),
+                    "image_codec": user_input.get(CONF_IMAGE_CODEC),
+                    "image_quality": int(user_input.get(CONF_IMAGE_QUALITY, 80)),
+                    "metrics_interval": int(
+                        user_input.get(CONF_METRICS_INTERVAL, 60)
+                    ),
+                    "stage_timings": user_input.get(CONF_STAGE_TIMINGS, False),
+                    "loop_watchdog": user_input.get(CONF_LOOP_WATCHDOG, False),
+                    "memmap_base_layer": user_input.get(CONF_MEMMAP_BASE_LAYER, False),
+                    "stream_decode": user_input.get(CONF_STREAM_DECODE, False),
+                    "mqtt_record": user_input.get(CONF_MQTT_RECORD, False),
+                }
+            )
+
+            return await self.async_step_opt_save()
+
+        return self.async_show_form(
+            step_id="performance",
+            data_schema=self.PERFORMANCE_SCHEMA,
+            description_placeholders=self.options,
+        )
+
     async def async_step_base_colours(
         self, user_input: Optional[Dict[str, Any]] = None
     ):
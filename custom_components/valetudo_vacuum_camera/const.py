@@ -6,6 +6,8 @@
 PLATFORMS = ["camera"]
 DOMAIN = "valetudo_vacuum_camera"
 DEFAULT_NAME = "valetudo vacuum camera"
+# hass.data[DOMAIN] key of the process metrics sampler shared by the cameras.
+PROCESS_METRICS = "process_metrics"
 DEFAULT_ROOMS = 15
 ATTR_ROTATE = "rotate_image"
 ATTR_CROP = "crop_image"
@@ -30,6 +32,18 @@ CONF_SNAPSHOTS_ENABLE = "enable_www_snapshots"
 CONF_EXPORT_SVG = "get_svg_file"
 CONF_AUTO_ZOOM = "auto_zoom"
 CONF_ZOOM_LOCK_RATIO = "zoom_lock_ratio"
+CONF_PALETTE_MODE = "palette_mode"
+CONF_PNG_INDEXED = "png_indexed"
+CONF_PNG_COMPRESS_LEVEL = "png_compress_level"
+CONF_PNG_STRATEGY = "png_compress_strategy"
+CONF_IMAGE_CODEC = "image_codec"
+CONF_IMAGE_QUALITY = "image_quality"
+CONF_METRICS_INTERVAL = "metrics_interval"
+CONF_STAGE_TIMINGS = "stage_timings"
+CONF_LOOP_WATCHDOG = "loop_watchdog"
+CONF_MEMMAP_BASE_LAYER = "memmap_base_layer"
+CONF_STREAM_DECODE = "stream_decode"
+CONF_MQTT_RECORD = "mqtt_record"
 ICON = "mdi:camera"
 NAME = "Valetudo Vacuum Camera"
 
@@ -49,6 +63,18 @@ DEFAULT_VALUES = {
     "vac_status_position": True,
     "get_svg_file": False,
     "enable_www_snapshots": False,
+    "palette_mode": False,
+    "png_indexed": False,
+    "png_compress_level": 6,
+    "png_compress_strategy": "default",
+    "image_codec": "png",
+    "image_quality": 80,
+    "metrics_interval": 60,
+    "stage_timings": False,
+    "loop_watchdog": False,
+    "memmap_base_layer": False,
+    "stream_decode": False,
+    "mqtt_record": False,
     "color_charger": [255, 128, 0],
     "color_move": [238, 247, 255],
     "color_wall": [255, 255, 0],
@@ -117,6 +143,18 @@ KEYS_TO_UPDATE = [
     "vac_status_font",
     "get_svg_file",
     "enable_www_snapshots",
+    "palette_mode",
+    "png_indexed",
+    "png_compress_level",
+    "png_compress_strategy",
+    "image_codec",
+    "image_quality",
+    "metrics_interval",
+    "stage_timings",
+    "loop_watchdog",
+    "memmap_base_layer",
+    "stream_decode",
+    "mqtt_record",
     "color_charger",
     "color_move",
     "color_wall",
@@ -181,6 +219,38 @@ TEXT_SIZE_VALUES = {
     "step": 1,  # Step value
 }
 
+PNG_LEVEL_VALUES = {
+    "min": 0,  # No compression
+    "max": 9,  # Best compression
+    "step": 1,  # Step value
+}
+
+PNG_STRATEGY_VALUES = [
+    {"label": "Default", "value": "default"},
+    {"label": "Filtered", "value": "filtered"},
+    {"label": "Huffman Only", "value": "huffman_only"},
+    {"label": "RLE", "value": "rle"},
+    {"label": "Fixed", "value": "fixed"},
+]
+
+IMAGE_CODEC_VALUES = [
+    {"label": "PNG", "value": "png"},
+    {"label": "WebP", "value": "webp"},
+    {"label": "JPEG", "value": "jpeg"},
+]
+
+IMAGE_QUALITY_VALUES = {
+    "min": 10,  # Minimum value
+    "max": 100,  # Maximum value
+    "step": 5,  # Step value
+}
+
+METRICS_INTERVAL_VALUES = {
+    "min": 0,  # Disabled
+    "max": 3600,  # Maximum value (seconds)
+    "step": 10,  # Step value
+}
+
 ROTATION_VALUES = [
     {"label": "0", "value": "0"},
     {"label": "90", "value": "90"},
@@ -230,6 +300,10 @@ FONTS_AVAILABLE = [
 ]
 
 
+"""Camera polling states"""
+CAMERA_STATE_ACTIVE = "active"
+CAMERA_STATE_IDLE = "idle"
+
 """App Constants. Not in use, and dummy values"""
 IDLE_SCAN_INTERVAL = 120
 CLEANING_SCAN_INTERVAL = 5
@@ -0,0 +1,62 @@
+"""
+Diagnostics
+Version: v2024.06.3
+Performance data of the camera, downloaded from the integration page:
+pipeline timings, caches and buffers usage, canvas and payload sizes, parser
+mode. The vacuum identity (name, topic, device) and the broker credentials
+are redacted.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_UNIQUE_ID
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_MQTT_HOST,
+    CONF_MQTT_PASS,
+    CONF_MQTT_USER,
+    CONF_VACUUM_CONFIG_ENTRY_ID,
+    CONF_VACUUM_CONNECTION_STRING,
+    CONF_VACUUM_ENTITY_ID,
+    CONF_VACUUM_IDENTIFIERS,
+    DOMAIN,
+)
+from .utils.loop_watchdog import LOOP_WATCHDOG
+
+TO_REDACT = {
+    CONF_MQTT_HOST,
+    CONF_MQTT_PASS,
+    CONF_MQTT_USER,
+    CONF_UNIQUE_ID,
+    CONF_VACUUM_CONFIG_ENTRY_ID,
+    CONF_VACUUM_CONNECTION_STRING,
+    CONF_VACUUM_ENTITY_ID,
+    CONF_VACUUM_IDENTIFIERS,
+    "file_name",  # The vacuum name (from the MQTT topic).
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of the camera config entry."""
+    config = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    camera = config.get("camera")
+    return {
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+        "camera": (
+            async_redact_data(camera.get_diagnostics(), TO_REDACT)
+            if camera is not None
+            else None
+        ),
+        "loop_watchdog": {
+            "enabled": LOOP_WATCHDOG.enabled,
+            "threshold": LOOP_WATCHDOG.threshold,
+            "stalls": list(LOOP_WATCHDOG.stalls),
+        },
+    }
@@ -0,0 +1,129 @@
+"""
+Sensors
+Version: v2024.06.3
+Camera process metrics (CPU, memory) and render cost sensors.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from typing import Callable
+
+from homeassistant import config_entries, core
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    CONF_UNIQUE_ID,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .common import get_vacuum_unique_id_from_mqtt_topic
+from .const import CONF_VACUUM_CONNECTION_STRING, CONF_VACUUM_IDENTIFIERS, DOMAIN
+from .utils.metrics import CameraMetrics
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CameraSensorDescription(SensorEntityDescription):
+    """Camera metrics sensor description."""
+
+    value_fn: Callable[[CameraMetrics], float | None]
+
+
+# CPU and memory are of the Home Assistant process (the same for all the
+# cameras), the render time is of the camera.
+SENSORS: tuple[CameraSensorDescription, ...] = (
+    CameraSensorDescription(
+        key="cpu_percent",
+        translation_key="cpu_percent",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.cpu_percent,
+    ),
+    CameraSensorDescription(
+        key="memory_rss",
+        translation_key="memory_rss",
+        native_unit_of_measurement=UnitOfInformation.MEGABYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.rss_mb,
+    ),
+    CameraSensorDescription(
+        key="render_time",
+        translation_key="render_time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: (
+            round(metrics.render_time * 1000, 1)
+            if metrics.render_time is not None
+            else None
+        ),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: core.HomeAssistant,
+    config_entry: config_entries.ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Setup the metrics sensors from a config entry."""
+    config = hass.data[DOMAIN][config_entry.entry_id]
+    metrics = config.get("metrics")
+    if metrics is None:
+        return
+    async_add_entities(
+        [CameraMetricsSensor(config, metrics, description) for description in SENSORS]
+    )
+
+
+class CameraMetricsSensor(SensorEntity):
+    """Camera metrics sensor."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: CameraSensorDescription
+
+    def __init__(
+        self,
+        config: dict,
+        metrics: CameraMetrics,
+        description: CameraSensorDescription,
+    ):
+        self.entity_description = description
+        self._metrics = metrics
+        unique_id = config.get(CONF_UNIQUE_ID) or get_vacuum_unique_id_from_mqtt_topic(
+            config[CONF_VACUUM_CONNECTION_STRING]
+        )
+        self._attr_unique_id = f"{unique_id}_{description.key}"
+        self._identifiers = config.get(CONF_VACUUM_IDENTIFIERS)
+
+    @property
+    def device_info(self):
+        """Return the device info."""
+        try:
+            from homeassistant.helpers.device_registry import DeviceInfo
+        except ImportError:
+            from homeassistant.helpers.entity import DeviceInfo
+        return DeviceInfo(identifiers=self._identifiers)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the metric value."""
+        return self.entity_description.value_fn(self._metrics)
+
+    async def async_added_to_hass(self) -> None:
+        """Update the sensor when the metrics are updated."""
+        self.async_on_remove(self._metrics.add_listener(self.async_write_ha_state))
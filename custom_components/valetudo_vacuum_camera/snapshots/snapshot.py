@@ -19,6 +19,13 @@ from custom_components.valetudo_vacuum_camera.utils.users_data import (
 _LOGGER = logging.getLogger(__name__)  # Create a logger instance
 
 
+def _json_default(value):
+    """Convert the numpy arrays (stream decoded compressedPixels) to lists."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 class Snapshots:
     """
     Snapshots class to save the JSON data and the filtered logs to a ZIP archive.
@@ -96,7 +103,7 @@ class Snapshots:
             # Save JSON data to a file
             json_file_name = os.path.join(self.storage_path, f"{file_name}.json")
             with open(json_file_name, "w") as json_file:
-                json.dump(json_data, json_file, indent=4)
+                json.dump(json_data, json_file, indent=4, default=_json_default)
 
             log_data = await self.async_get_filtered_logs()
 
@@ -4,13 +4,17 @@ Drawable is part of the Image_Handler
 used functions to draw the elements on the Numpy Array
 that is actually our camera frame.
 Version: v2024.06.1
+The fonts and the status text strips are cached (process wide).
 """
 
 from __future__ import annotations
 
+from collections import OrderedDict
+from functools import lru_cache
 import math
+import threading
 
-from PIL import ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
 from custom_components.valetudo_vacuum_camera.types import (
@@ -22,6 +26,17 @@ from custom_components.valetudo_vacuum_camera.types import (
 
 # import re
 
+DEFAULT_FONT = "custom_components/valetudo_vacuum_camera/utils/fonts/FiraSans.ttf"
+STRIPS_CACHE_SIZE = 8  # Status text strips cached (all the cameras).
+_strips: OrderedDict[tuple, Image.Image] = OrderedDict()
+_strips_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def load_font(path_font: str, size: int) -> ImageFont.FreeTypeFont:
+    """Load the font once for each path and size."""
+    return ImageFont.truetype(path_font, size)
+
 
 class Drawable:
     """
@@ -75,15 +90,18 @@ class Drawable:
 
     @staticmethod
     async def go_to_flag(
-        layer: NumpyArray, center: Point, rotation_angle: int, flag_color: Color
+        layer: NumpyArray,
+        center: Point,
+        rotation_angle: int,
+        flag_color: Color,
+        pole_color: Color = (0, 0, 255, 255),
     ) -> NumpyArray:
         """
         It is draw a flag on centered at specified coordinates on
         the input layer. It uses the rotation angle of the image
         to orientate the flag on the given layer.
+        The pole color default is RGBA blue.
         """
-        # Define flag color
-        pole_color = (0, 0, 255, 255)  # RGBA color (blue)
         # Define flag size and position
         flag_size = 50
         pole_width = 6
@@ -235,11 +253,12 @@ class Drawable:
         layer: NumpyArray, virtual_walls, color: Color
     ) -> NumpyArray:
         """
-        Draw virtual walls on the input layer.
+        Draw virtual walls (MapEntity) on the input layer.
         """
         for wall in virtual_walls:
-            for i in range(0, len(wall), 4):
-                x1, y1, x2, y2 = wall[i : i + 4]
+            points = wall.points.tolist()
+            for i in range(0, len(points) - 1, 2):
+                (x1, y1), (x2, y2) = points[i], points[i + 1]
                 # Draw the virtual wall as a line with a fixed width of 6 pixels
                 layer = Drawable._line(layer, x1, y1, x2, y2, color, width=6)
         return layer
@@ -380,18 +399,15 @@ class Drawable:
     @staticmethod
     async def zones(layers: NumpyArray, coordinates, color: Color) -> NumpyArray:
         """
-        Draw the zones on the input layer.
+        Draw the zones (MapEntity) on the input layer.
         """
         dot_radius = 1  # number of pixels the dot should be
         dot_spacing = 4  # space between dots.
         # Iterate over zones
         for zone in coordinates:
-            points = zone["points"]
             # determinate the points to cover.
-            min_x = min(points[::2])
-            max_x = max(points[::2])
-            min_y = min(points[1::2])
-            max_y = max(points[1::2])
+            min_x, min_y = zone.points.min(axis=0).tolist()
+            max_x, max_y = zone.points.max(axis=0).tolist()
             # Draw ellipses (dots)
             for y in range(min_y, max_y, dot_spacing):
                 for x in range(min_x, max_x, dot_spacing):
@@ -401,12 +417,19 @@ class Drawable:
 
     @staticmethod
     async def robot(
-        layers: NumpyArray, x: int, y: int, angle: float, fill: Color, log: str = ""
+        layers: NumpyArray,
+        x: int,
+        y: int,
+        angle: float,
+        fill: Color,
+        log: str = "",
+        outline: Color = None,
     ) -> NumpyArray:
         """
         We Draw the robot with in a smaller array
         this helps numpy to work faster and at lower
         memory cost.
+        The outline is calculated from the fill colour if not given (palette mode).
         """
         # Create a 52*52 empty image numpy array of the background
         top_left_x = x - 26
@@ -427,7 +450,8 @@ class Drawable:
         r_lidar = r_scaled * 3  # Scale factor for the lidar
         r_button = r_scaled * 1  # scale factor of the button
         # Outline colour from fill colour
-        outline = (fill[0] // 2, fill[1] // 2, fill[2] // 2, fill[3])
+        if outline is None:
+            outline = (fill[0] // 2, fill[1] // 2, fill[2] // 2, fill[3])
         # Draw the robot outline
         tmp_layer = Drawable._filled_circle(
             tmp_layer, (tmp_x, tmp_y), radius, fill, outline, 1
@@ -475,7 +499,7 @@ class Drawable:
         @return: robot image overlaid on the background image.
         """
         # Calculate the dimensions of the robot image
-        robot_height, robot_width, _ = robot_image.shape
+        robot_height, robot_width = robot_image.shape[:2]
         # Calculate the center of the robot image (in case const changes)
         robot_center_x = robot_width // 2
         robot_center_y = robot_height // 2
@@ -514,6 +538,52 @@ class Drawable:
 
         return image
 
+    @staticmethod
+    def status_text_strip(
+        width: int,
+        size: int,
+        color: Color,
+        status: list[str],
+        path_font: str,
+    ) -> Image.Image:
+        """
+        Return the status text drawn on a transparent strip of the image width.
+        The strips are cached: a strip is drawn again only when the text,
+        the colour, the size, the font or the width change.
+        """
+        key = (width, size, tuple(color), tuple(status), path_font)
+        with _strips_lock:
+            strip = _strips.get(key)
+            if strip is not None:
+                _strips.move_to_end(key)
+                return strip
+        default_font = load_font(DEFAULT_FONT, size)
+        user_font = load_font(path_font, size)
+        stroke = 2 if path_font.endswith("VT.ttf") else None
+        height = max(
+            [default_font.getbbox(text)[3] for text in status]
+            + [user_font.getbbox(text, stroke_width=stroke or 0)[3] for text in status]
+            + [size]
+        )
+        strip = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(strip)
+        x = 10
+        for text in status:
+            if "\u2211" in text or "\u03DE" in text:
+                draw.text((x, 0), text, font=default_font, fill=tuple(color))
+            elif stroke:
+                draw.text(
+                    (x, 0), text, font=user_font, fill=tuple(color), stroke_width=stroke
+                )
+            else:
+                draw.text((x, 0), text, font=user_font, fill=tuple(color))
+            x += draw.textlength(text, font=default_font)
+        with _strips_lock:
+            _strips[key] = strip
+            while len(_strips) > STRIPS_CACHE_SIZE:
+                _strips.popitem(last=False)
+        return strip
+
     @staticmethod
     def status_text(
         image: PilPNG,
@@ -523,34 +593,15 @@ class Drawable:
         path_font: str,
         position: bool,
     ) -> None:
-        """Draw the Status Test on the image."""
-        # Load a fonts
-        path_default_font = (
-            "custom_components/valetudo_vacuum_camera/utils/fonts/FiraSans.ttf"
-        )
-        default_font = ImageFont.truetype(path_default_font, size)
-        user_font = ImageFont.truetype(path_font, size)
-        # Define the text and position
+        """Draw the Status Test on the image (composite of the cached strip)."""
+        strip = Drawable.status_text_strip(image.width, size, color, status, path_font)
         if position:
-            x, y = 10, 10
+            y = 10
         else:
-            x, y = 10, image.height - 20 - size
-        # Create a drawing object
-        draw = ImageDraw.Draw(image)
-        # Draw the text
-        for text in status:
-            if "\u2211" in text or "\u03DE" in text:
-                font = default_font
-                width = None
-            else:
-                font = user_font
-                is_variable = path_font.endswith("VT.ttf")
-                if is_variable:
-                    width = 2
-                else:
-                    width = None
-            if width:
-                draw.text((x, y), text, font=font, fill=color, stroke_width=width)
-            else:
-                draw.text((x, y), text, font=font, fill=color)
-            x += draw.textlength(text, font=default_font)
+            y = image.height - 20 - size
+        # The strip is cut at the bottom of the image.
+        strip = strip.crop((0, 0, strip.width, min(strip.height, image.height - y)))
+        if image.mode == "RGBA":
+            image.alpha_composite(strip, (0, y))
+        else:
+            image.paste(strip, (0, y), strip)
@@ -0,0 +1,77 @@
+"""
+Frame Broadcast Class.
+Share the encoded frames between the viewers of the camera live stream.
+Each viewer has a queue of one frame: when a viewer is slower than the
+frames production the older frame is replaced, the rendering never waits.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STREAM_BOUNDARY = "--frameboundary"
+
+
+def multipart_frame(content_type: str, bytes_data: bytes) -> bytes:
+    """Return the frame as a part of the multipart (x-mixed-replace) stream."""
+    return (
+        bytes(
+            f"{STREAM_BOUNDARY}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(bytes_data)}\r\n\r\n",
+            "utf-8",
+        )
+        + bytes_data
+        + b"\r\n"
+    )
+
+
+class FrameBroadcast:
+    """Broadcast the encoded frames to the stream viewers."""
+
+    def __init__(self, file_name: str = ""):
+        self.file_name = file_name
+        self._viewers: set[asyncio.Queue] = set()
+        self.version: int = -1  # Last frame version published.
+
+    @property
+    def has_viewers(self) -> bool:
+        """Return True if someone is watching the stream."""
+        return bool(self._viewers)
+
+    @property
+    def viewers(self) -> int:
+        """Return the number of stream viewers."""
+        return len(self._viewers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Add a viewer, return the queue of its frames."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._viewers.add(queue)
+        _LOGGER.debug(f"{self.file_name}: Stream viewers {len(self._viewers)}.")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove the viewer."""
+        self._viewers.discard(queue)
+        _LOGGER.debug(f"{self.file_name}: Stream viewers {len(self._viewers)}.")
+
+    def publish(self, version: int, bytes_data: bytes) -> None:
+        """
+        Publish the encoded frame to all the viewers.
+        The same bytes are shared, a frame not yet sent to a slow viewer is dropped.
+        """
+        if version == self.version or not bytes_data:
+            return
+        self.version = version
+        for queue in self._viewers:
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((version, bytes_data))
@@ -0,0 +1,241 @@
+"""
+Image Encoder Class.
+Encode the camera frames to the bytes served by the camera entity.
+The map colours are discrete, the RGBA frames are quantized (exact) to an
+indexed "P" PNG with the tRNS transparency when possible.
+The frames can be also encoded as WebP or JPEG, the encoded bytes (and the
+downscaled variants) are cached in a small LRU per frame version and codec.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from io import BytesIO
+import logging
+import zlib
+
+from PIL import Image
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.types import PilPNG
+
+_LOGGER = logging.getLogger(__name__)
+
+# zlib strategies available for the PNG compression.
+PNG_STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "huffman_only": zlib.Z_HUFFMAN_ONLY,
+    "rle": zlib.Z_RLE,
+    "fixed": zlib.Z_FIXED,
+}
+
+# Content type of the supported codecs.
+CONTENT_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+VARIANTS_CACHE_SIZE = 8  # Encoded frames (full size and downscaled) cached.
+
+
+class ImageEncoder:
+    """Encode the PIL images of the camera to bytes."""
+
+    def __init__(self, shared_data):
+        self.shared = shared_data
+        self.file_name = self.shared.file_name
+        # LRU of the encoded frames, key: (frame version, width, height, codec)
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self.hits: int = 0  # Frames served from the cache.
+        self.misses: int = 0  # Frames encoded.
+
+    @property
+    def codec(self) -> str:
+        """Return the configured codec (png if not supported)."""
+        codec = str(self.shared.image_codec).lower()
+        return codec if codec in CONTENT_TYPES else "png"
+
+    @property
+    def content_type(self) -> str:
+        """Return the content type of the encoded frames."""
+        return CONTENT_TYPES[self.codec]
+
+    def get_cached(
+        self, version: int, width: int | None = None, height: int | None = None
+    ) -> bytes | None:
+        """Return the cached bytes of the frame version (and size) if available."""
+        key = (version, width, height, self.codec)
+        bytes_data = self._cache.get(key)
+        if bytes_data is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return bytes_data
+
+    def get_stats(self) -> dict:
+        """Return the usage of the encoded frames cache."""
+        requests = self.hits + self.misses
+        return {
+            "codec": self.codec,
+            "entries": len(self._cache),
+            "cached_bytes": sum(len(data) for data in self._cache.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 3) if requests else None,
+        }
+
+    def encode(
+        self,
+        pil_img: PilPNG,
+        version: int,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> bytes:
+        """
+        Encode the frame with the configured codec.
+        The bytes are cached, the same frame version is never encoded twice.
+        @param pil_img: PIL image of the frame.
+        @param version: frame version.
+        @param width: requested width (None for the full size).
+        @param height: requested height (None for the full size).
+        @return: the encoded bytes.
+        """
+        codec = self.codec
+        key = (version, width, height, codec)
+        bytes_data = self.get_cached(version, width, height)
+        if bytes_data is not None:
+            return bytes_data
+        self.misses += 1
+        timings = self.shared.timings
+        started = timings.start()
+        if width or height:
+            pil_img = self.downscale(pil_img, width, height)
+            if (
+                codec == "png"
+                and self.shared.png_indexed
+                and pil_img.getcolors(256) is None
+            ):
+                # The box filter blends the map colours, quantize the variant.
+                pil_img = pil_img.quantize(256, method=Image.Quantize.FASTOCTREE)
+        if codec == "webp":
+            bytes_data = self.to_webp_bytes(pil_img)
+        elif codec == "jpeg":
+            bytes_data = self.to_jpeg_bytes(pil_img)
+        else:
+            bytes_data = self.to_png_bytes(pil_img)
+        timings.stop("encode", started)
+        # A new frame version evicts the older ones.
+        for old_key in [k for k in self._cache if k[0] != version]:
+            del self._cache[old_key]
+        self._cache[key] = bytes_data
+        while len(self._cache) > VARIANTS_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return bytes_data
+
+    @staticmethod
+    def downscale(
+        pil_img: PilPNG, width: int | None = None, height: int | None = None
+    ) -> PilPNG:
+        """
+        Downscale the image to fit in width x height keeping the aspect ratio.
+        The images are never enlarged.
+        @param pil_img: PIL image of the frame.
+        @param width: requested width (or None).
+        @param height: requested height (or None).
+        @return: the downscaled image.
+        """
+        scale = min(
+            width / pil_img.width if width else 1.0,
+            height / pil_img.height if height else 1.0,
+        )
+        if scale >= 1.0:
+            return pil_img
+        size = (
+            max(1, round(pil_img.width * scale)),
+            max(1, round(pil_img.height * scale)),
+        )
+        if pil_img.mode not in ("RGB", "RGBA"):
+            # The box filter needs the colours, not the palette indexes.
+            pil_img = pil_img.convert("RGBA")
+        return pil_img.resize(size, Image.Resampling.BOX)
+
+    @staticmethod
+    def quantize_to_palette(pil_img: PilPNG) -> PilPNG | None:
+        """
+        Exact quantization of the image to a "P" mode image.
+        @param pil_img: PIL image (any mode).
+        @return: the "P" mode image or None if the image has more than 256 colours.
+        """
+        if pil_img.mode == "P":
+            return pil_img
+        if pil_img.mode != "RGBA":
+            pil_img = pil_img.convert("RGBA")
+        colors = pil_img.getcolors(256)
+        if colors is None:
+            return None
+        # Pack the RGBA pixels in uint32 and look up their palette index.
+        palette = np.array([color for _, color in colors], dtype=np.uint8)
+        keys = palette.view(np.uint32).ravel()
+        order = np.argsort(keys)
+        keys = keys[order]
+        palette = palette[order]
+        pixels = np.ascontiguousarray(np.asarray(pil_img, dtype=np.uint8))
+        packed = pixels.view(np.uint32).reshape(pixels.shape[:2])
+        labels = np.searchsorted(keys, packed).astype(np.uint8)
+        del pixels, packed
+        p_img = Image.fromarray(labels, mode="P")
+        p_img.putpalette(palette[:, :3].tobytes())
+        if np.any(palette[:, 3] != 255):
+            p_img.info["transparency"] = palette[:, 3].tobytes()
+        return p_img
+
+    def to_png_bytes(self, pil_img: PilPNG) -> bytes:
+        """
+        Encode the image to PNG with the compression options of the camera.
+        @param pil_img: PIL image to encode.
+        @return: PNG bytes.
+        """
+        if self.shared.png_indexed and pil_img.mode != "P":
+            p_img = self.quantize_to_palette(pil_img)
+            if p_img is None:
+                _LOGGER.debug(
+                    f"{self.file_name}: More than 256 colours, saving RGBA PNG."
+                )
+            else:
+                pil_img = p_img
+        buffered = BytesIO()
+        pil_img.save(
+            buffered,
+            format="PNG",
+            compress_level=self.shared.png_compress_level,
+            compress_type=PNG_STRATEGIES.get(
+                self.shared.png_compress_strategy, zlib.Z_DEFAULT_STRATEGY
+            ),
+        )
+        bytes_data = buffered.getvalue()
+        del buffered
+        return bytes_data
+
+    def to_webp_bytes(self, pil_img: PilPNG) -> bytes:
+        """Encode the image to WebP, quality 100 is lossless."""
+        if pil_img.mode not in ("RGB", "RGBA"):
+            pil_img = pil_img.convert("RGBA")
+        quality = int(self.shared.image_quality)
+        buffered = BytesIO()
+        # The flat colours of the maps are smaller lossless than lossy.
+        pil_img.save(buffered, format="WEBP", quality=quality, lossless=quality >= 100)
+        bytes_data = buffered.getvalue()
+        del buffered
+        return bytes_data
+
+    def to_jpeg_bytes(self, pil_img: PilPNG) -> bytes:
+        """Encode the image to JPEG (no alpha channel) with the configured quality."""
+        if pil_img.mode != "RGB":
+            pil_img = pil_img.convert("RGB")
+        buffered = BytesIO()
+        pil_img.save(buffered, format="JPEG", quality=int(self.shared.image_quality))
+        bytes_data = buffered.getvalue()
+        del buffered
+        return bytes_data
@@ -0,0 +1,29 @@
+"""
+JSON Backend.
+Decoder of the map JSON: orjson (shipped with Home Assistant) when it can be
+imported, else the standard library json.
+Both decode the bytes directly, the decompressed payload is never copied to a
+str before the decoding.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _select_backend() -> tuple[str, Callable[[bytes | str], Any]]:
+    """Return the name and the loads function of the fastest backend available."""
+    try:
+        import orjson  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        _LOGGER.debug("orjson not available, using the json standard library.")
+        return "json", json.loads
+    return "orjson", orjson.loads
+
+
+JSON_BACKEND, json_loads = _select_backend()
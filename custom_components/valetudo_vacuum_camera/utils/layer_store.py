@@ -0,0 +1,72 @@
+"""
+Layer Store Class.
+Memory mapped storage of the map base layers for the low RAM hosts.
+The layers are .npy files in .storage/valetudo_camera opened with np.memmap:
+the OS can page out the regions not used, and the same file is reused (not
+allocated again) at each rebuild and after the restarts.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.types import NumpyArray
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LayerStore:
+    """Keep the base layers of a vacuum in memory mapped files."""
+
+    def __init__(self, storage_path: str, file_name: str):
+        self.file_name = file_name
+        self._storage_path = storage_path
+        self._layers: dict[str, np.memmap] = {}
+
+    def _layer_file(self, name: str) -> str:
+        """Return the file of the layer."""
+        return os.path.join(self._storage_path, f"{self.file_name}_{name}.mmap.npy")
+
+    def _open(self, name: str, shape: tuple, dtype) -> np.memmap:
+        """Open the layer file, it is created only if the shape or type changed."""
+        layer_file = self._layer_file(name)
+        if os.path.isfile(layer_file):
+            try:
+                layer = np.lib.format.open_memmap(layer_file, mode="r+")
+                if layer.shape == shape and layer.dtype == dtype:
+                    return layer
+                del layer
+            except (ValueError, OSError) as e:
+                # Not a valid layer file (truncated or unreadable), created again.
+                _LOGGER.debug(f"{self.file_name}: Invalid {name} file: {e}")
+        _LOGGER.debug(f"{self.file_name}: Creating the {name} file {shape}.")
+        return np.lib.format.open_memmap(
+            layer_file, mode="w+", dtype=dtype, shape=shape
+        )
+
+    def store(self, name: str, array: NumpyArray) -> np.memmap:
+        """
+        Copy the array in the memory mapped layer.
+        @param name: layer name.
+        @param array: the layer data.
+        @return: the memory mapped layer (used in place of the array copy).
+        """
+        layer = self._layers.get(name)
+        if layer is None or layer.shape != array.shape or layer.dtype != array.dtype:
+            layer = self._layers[name] = self._open(name, array.shape, array.dtype)
+        layer[...] = array
+        return layer
+
+    def close(self) -> None:
+        """Write the pages changed and close the files."""
+        for layer in self._layers.values():
+            layer.flush()
+        self._layers.clear()
+
+    def get_stats(self) -> dict:
+        """Return the size of the memory mapped layers."""
+        return {name: layer.nbytes for name, layer in self._layers.items()}
@@ -0,0 +1,197 @@
+"""
+Loop Watchdog Class.
+Opt-in detector of the blocking code running on the Home Assistant event loop.
+The coroutine entry points of the integration decorated with @watched are
+driven step by step: each step is a synchronous section of the coroutine
+(the code between two awaits). A monitor thread samples the stack of the
+loop thread when a section runs over the threshold, the stall is logged with
+the sample when the section ends.
+When disabled the decorated coroutines are awaited directly.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+import types
+from typing import Any, Callable, Coroutine, Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOP_STALL_THRESHOLD = 0.1  # Seconds of a synchronous section to be a stall.
+STACK_DEPTH = 12  # Frames kept in the stack samples.
+STALLS_KEPT = 32  # Last stalls kept for the diagnostics.
+
+
+class LoopWatchdog:
+    """Measure the synchronous sections of the watched coroutines."""
+
+    def __init__(self, threshold: float = LOOP_STALL_THRESHOLD):
+        self.threshold = threshold
+        self.stalls: deque[dict] = deque(maxlen=STALLS_KEPT)
+        self._users = 0  # Config entries (or tests) using the watchdog.
+        self._lock = threading.Lock()
+        # Running sections, key: thread id, value: [name, started, stack sample]
+        self._sections: dict[int, list] = {}
+        self._listeners: list[Callable[[dict], None]] = []
+        self._monitor: threading.Thread | None = None
+        self._stop_event: threading.Event | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if the watchdog is running."""
+        return self._users > 0
+
+    def enable(self) -> None:
+        """Start the watchdog (the calls are counted, one disable for each)."""
+        with self._lock:
+            self._users += 1
+            if self._monitor is not None:
+                return
+            self._stop_event = threading.Event()
+            self._monitor = threading.Thread(
+                target=self._monitor_loop,
+                args=(self._stop_event,),
+                name="valetudo_loop_watchdog",
+                daemon=True,
+            )
+            self._monitor.start()
+        _LOGGER.info(f"Event loop watchdog started, threshold {self.threshold} s.")
+
+    def disable(self) -> None:
+        """Stop the watchdog when it isn't used anymore."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users or self._monitor is None:
+                return
+            # The monitor thread ends at its next wake up, never wait for it.
+            self._monitor = None
+            self._stop_event.set()
+        _LOGGER.info("Event loop watchdog stopped.")
+
+    def add_listener(self, listener: Callable[[dict], None]) -> Callable[[], None]:
+        """Add a function called with each stall, return the remove function."""
+        self._listeners.append(listener)
+
+        def remove_listener() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    def _monitor_loop(self, stop_event: threading.Event) -> None:
+        """Sample the stack of the sections running over the threshold."""
+        while not stop_event.wait(self.threshold / 2):
+            now = time.perf_counter()
+            frames = None
+            for thread_id, section in list(self._sections.items()):
+                if section[2] is not None or now - section[1] < self.threshold:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()  # pylint: disable=protected-access
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    section[2] = "".join(traceback.format_stack(frame, STACK_DEPTH))
+
+    def _end_section(self, thread_id: int) -> None:
+        """Close the section of the thread, report it if it was a stall."""
+        section = self._sections.pop(thread_id, None)
+        if section is None:
+            return  # The watchdog was stopped meanwhile.
+        name, started, sample = section
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold:
+            return
+        stall = {
+            "entry_point": name,
+            "duration": round(elapsed * 1000, 1),
+            "stack": sample,
+        }
+        self.stalls.append(stall)
+        _LOGGER.warning(
+            f"{name} blocked the event loop for {stall['duration']} ms."
+            + (f"\nStack sample:\n{sample}" if sample else "")
+        )
+        for listener in list(self._listeners):
+            listener(stall)
+
+    @types.coroutine
+    def _drive(self, name: str, coro: Coroutine) -> Any:
+        """Run the coroutine one step at a time, measuring each step."""
+        thread_id = threading.get_ident()
+        value, error = None, None
+        while True:
+            self._sections[thread_id] = [name, time.perf_counter(), None]
+            try:
+                if error is None:
+                    yielded = coro.send(value)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._end_section(thread_id)
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as err:  # pylint: disable=broad-except
+                value, error = None, err
+
+    async def run(self, name: str, coro: Coroutine) -> Any:
+        """Await the coroutine measuring its synchronous sections."""
+        if not self.enabled or threading.get_ident() in self._sections:
+            # Disabled, or called from a section already measured.
+            return await coro
+        return await self._drive(name, coro)
+
+
+LOOP_WATCHDOG = LoopWatchdog()
+
+
+def watched(func: Callable[..., Coroutine]) -> Callable[..., Coroutine]:
+    """Decorate a coroutine function entry point measured by the watchdog."""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not LOOP_WATCHDOG.enabled:
+            return await func(*args, **kwargs)
+        return await LOOP_WATCHDOG.run(name, func(*args, **kwargs))
+
+    return wrapper
+
+
+@contextmanager
+def assert_no_loop_stall(threshold: float = LOOP_STALL_THRESHOLD) -> Iterator[list]:
+    """
+    Test helper: fail when a watched coroutine blocks the loop over threshold.
+    Plain coroutines can be measured with: await LOOP_WATCHDOG.run(name, coro)
+    @param threshold: seconds of a synchronous section to be a stall.
+    @return: the list of the stalls found (filled while running).
+    """
+    stalls: list[dict] = []
+    previous = LOOP_WATCHDOG.threshold
+    LOOP_WATCHDOG.threshold = threshold
+    LOOP_WATCHDOG.enable()
+    remove_listener = LOOP_WATCHDOG.add_listener(stalls.append)
+    try:
+        yield stalls
+    finally:
+        remove_listener()
+        LOOP_WATCHDOG.disable()
+        LOOP_WATCHDOG.threshold = previous
+    if stalls:
+        details = "\n".join(
+            f"{stall['entry_point']}: {stall['duration']} ms\n{stall['stack'] or ''}"
+            for stall in stalls
+        )
+        raise AssertionError(f"The event loop was blocked:\n{details}")
@@ -0,0 +1,245 @@
+"""
+Map Model Classes.
+Compact representation of the vacuum map, used by both image handlers in
+place of the decoded JSON (that is released after each frame).
+- MapLayer: floor, segment and wall pixels as (N, 3) int32 runs (x, y, length).
+- MapEntity: points, paths, zones and lines as (N, 2) int32 arrays.
+- MapModel: map size, layers and entities (by type) of a frame.
+MapModel.from_hypfer and MapModel.from_rand256 convert the data of the two
+firmwares, the Rand256 coordinates are converted to the Valetudo ones here.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.types import JsonType, NumpyArray
+
+RAND256_DIMENSION_MM = 50 * 1024  # Size of the Rand256 map in mm.
+RAND256_MAP_SIZE = 5120  # Size of the Rand256 map image in pixels.
+RAND256_PIXEL_SIZE = 5  # Size of the Rand256 map pixels.
+
+
+def _points(values, columns: int = 2) -> NumpyArray:
+    """Return the flat list of coordinates as an (N, columns) int32 array."""
+    return np.asarray(values, dtype=np.int32).reshape(-1, columns)
+
+
+@dataclass(slots=True)
+class MapLayer:
+    """Floor, segment or wall pixels of the map."""
+
+    type: str
+    runs: NumpyArray  # (N, 3) int32: x, y and length of the pixels runs.
+    segment_id: int | str | None = None
+    name: str | None = None
+    active: int = 0
+
+
+@dataclass(slots=True)
+class MapEntity:
+    """Point, path, zone or line of the map."""
+
+    type: str
+    points: NumpyArray  # (N, 2) int32 coordinates.
+    angle: float | None = None  # robot_position only.
+    label: str | None = None  # obstacle only.
+
+
+@dataclass(slots=True)
+class MapModel:
+    """Map of a frame."""
+
+    firmware: str
+    size_x: int
+    size_y: int
+    pixel_size: int
+    json_id: str | None = None
+    layers: list[MapLayer] = field(default_factory=list)
+    entities: dict[str, list[MapEntity]] = field(default_factory=dict)
+
+    def add_entity(self, entity: MapEntity) -> None:
+        """Add the entity to the ones of its type."""
+        self.entities.setdefault(entity.type, []).append(entity)
+
+    def get_entities(self, entity_type: str) -> list[MapEntity]:
+        """Return the entities of the type (empty list if none)."""
+        return self.entities.get(entity_type, [])
+
+    def get_segments(self) -> list[MapLayer]:
+        """Return the segment (room) layers, in the map order."""
+        return [layer for layer in self.layers if layer.type == "segment"]
+
+    def find_layers(self) -> tuple[dict[str, list[NumpyArray]], list[int]]:
+        """Return the runs of each layer type and the active flags of the segments."""
+        layer_dict: dict[str, list[NumpyArray]] = {}
+        active_list = []
+        for layer in self.layers:
+            layer_dict.setdefault(layer.type, []).append(layer.runs)
+            if layer.type == "segment":
+                active_list.append(layer.active)
+        return layer_dict, active_list
+
+    @classmethod
+    def from_hypfer(cls, m_json: JsonType) -> MapModel:
+        """Convert the Valetudo (Hypfer) map json."""
+        try:
+            json_id = m_json["metaData"]["nonce"]
+        except (KeyError, TypeError):
+            json_id = None
+        model = cls(
+            firmware="Hypfer",
+            size_x=int(m_json["size"]["x"]),
+            size_y=int(m_json["size"]["y"]),
+            pixel_size=int(m_json["pixelSize"]),
+            json_id=json_id,
+        )
+        for layer in m_json.get("layers", []):
+            if layer.get("__class") != "MapLayer" or not layer.get("type"):
+                continue
+            meta_data = layer.get("metaData", {})
+            model.layers.append(
+                MapLayer(
+                    type=layer["type"],
+                    runs=_points(layer.get("compressedPixels", []), 3),
+                    segment_id=meta_data.get("segmentId"),
+                    name=meta_data.get("name"),
+                    active=int(meta_data.get("active", 0)),
+                )
+            )
+        for entity in m_json.get("entities", []):
+            entity_type = entity.get("type")
+            if not entity_type:
+                continue
+            meta_data = entity.get("metaData", {})
+            angle = meta_data.get("angle")
+            model.add_entity(
+                MapEntity(
+                    type=entity_type,
+                    points=_points(entity.get("points", [])),
+                    angle=float(angle) if angle is not None else None,
+                    label=meta_data.get("label"),
+                )
+            )
+        return model
+
+    @classmethod
+    def from_rand256(cls, rrm_json: JsonType) -> MapModel:
+        """Convert the Valetudo Re (Rand256) parsed map."""
+        model = cls(
+            firmware="Rand256",
+            size_x=RAND256_MAP_SIZE,
+            size_y=RAND256_MAP_SIZE,
+            pixel_size=RAND256_PIXEL_SIZE,
+        )
+        image = rrm_json.get("image", {})
+        dimensions = image.get("dimensions", {})
+        position = image.get("position", {})
+        grid = (
+            dimensions.get("width", 0),
+            dimensions.get("height", 0),
+            position.get("top", 0),
+            position.get("left", 0),
+        )
+        pixels = image.get("pixels", {})
+        model.layers.append(
+            MapLayer(type="floor", runs=cls._rrm_runs(pixels.get("floor", []), *grid))
+        )
+        segments = image.get("segments", {})
+        for segment_id in segments.get("id", []):
+            model.layers.append(
+                MapLayer(
+                    type="segment",
+                    runs=cls._rrm_runs(
+                        segments.get(f"pixels_seg_{segment_id}", []), *grid
+                    ),
+                    segment_id=segment_id,
+                )
+            )
+        model.layers.append(
+            MapLayer(type="wall", runs=cls._rrm_runs(pixels.get("walls", []), *grid))
+        )
+        robot = rrm_json.get("robot")
+        if robot:
+            angle = round(rrm_json.get("robot_angle", 0))
+            if angle < 0:
+                angle = (360 - angle) + 80
+            else:
+                angle = (180 - angle) - 80
+            model.add_entity(
+                MapEntity(
+                    type="robot_position",
+                    points=cls._rrm_position(robot),
+                    angle=angle % 360,
+                )
+            )
+        if rrm_json.get("charger"):
+            model.add_entity(
+                MapEntity(
+                    type="charger_location",
+                    points=cls._rrm_position(rrm_json["charger"]),
+                )
+            )
+        if rrm_json.get("goto_target"):
+            model.add_entity(
+                MapEntity(
+                    type="go_to_target",
+                    points=cls._rrm_position(rrm_json["goto_target"]),
+                )
+            )
+        for path_key, path_type in (
+            ("path", "path"),
+            ("goto_predicted_path", "predicted_path"),
+        ):
+            points = rrm_json.get(path_key, {}).get("points")
+            if points:
+                model.add_entity(
+                    MapEntity(
+                        type=path_type,
+                        points=np.round(_points(points) / 10).astype(np.int32),
+                    )
+                )
+        for zone in rrm_json.get("currently_cleaned_zones", []):
+            # Rectangle x1, y1, x2, y2 to its four corners.
+            x1, y1, x2, y2 = (value // 10 for value in zone)
+            model.add_entity(
+                MapEntity(
+                    type="active_zone",
+                    points=_points([x1, y1, x2, y1, x2, y2, x1, y2]),
+                )
+            )
+        for zone in rrm_json.get("forbidden_zones", []):
+            model.add_entity(
+                MapEntity(type="no_go_area", points=_points(zone) // 10)
+            )
+        for wall in rrm_json.get("virtual_walls", []):
+            model.add_entity(
+                MapEntity(type="virtual_wall", points=_points(wall) // 10)
+            )
+        return model
+
+    @staticmethod
+    def _rrm_position(position: list) -> NumpyArray:
+        """Convert the Rand256 position (mm) to the Valetudo coordinates."""
+        x, y = position[0], position[1]
+        return _points([round(x / 10), round((RAND256_DIMENSION_MM - y) / 10)])
+
+    @staticmethod
+    def _rrm_runs(
+        pixel_data: list, width: int, height: int, top: int, left: int
+    ) -> NumpyArray:
+        """Convert the Rand256 pixels indexes to the (N, 3) pixels runs."""
+        if not pixel_data or not width:
+            return np.empty((0, 3), dtype=np.int32)
+        index = np.asarray(pixel_data, dtype=np.int32)
+        x = (index % width) + left
+        y = ((height - 1) - (index // width)) + top
+        # Repeated indexes are merged in the same run.
+        starts = np.flatnonzero(
+            np.concatenate(([True], (x[1:] != x[:-1]) | (y[1:] != y[:-1])))
+        )
+        counts = np.diff(np.append(starts, len(index)))
+        return np.column_stack((x[starts], y[starts], counts)).astype(np.int32)
@@ -0,0 +1,167 @@
+"""
+Camera Metrics Class.
+Sample the Home Assistant process CPU and memory usage in background with a
+single psutil Process, shared by all the cameras (the values are of the whole
+process), and keep the render cost of each camera.
+The values are published by the sensor entities of the camera.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import os
+from typing import Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from psutil_home_assistant import PsutilWrapper as ProcInsp
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Listeners:
+    """Functions called at each update."""
+
+    def __init__(self):
+        self._listeners: list[Callable[[], None]] = []
+
+    @callback
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Add a function called at each update, return the remove function."""
+        self._listeners.append(listener)
+
+        def remove_listener() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    def _notify(self) -> None:
+        """Call the listeners."""
+        for listener in list(self._listeners):
+            listener()
+
+
+class ProcessMetrics(_Listeners):
+    """Home Assistant process metrics sampler, shared by the cameras."""
+
+    def __init__(self):
+        super().__init__()
+        self._hass: HomeAssistant | None = None
+        self._proc = None  # psutil Process of Home Assistant.
+        self._cpu_count: int = 1
+        self._unsub_sampler = None
+        self._interval: int = 0  # Current sampling interval (s).
+        self._intervals: dict[str, int] = {}  # user: requested interval (s)
+        self.cpu_percent: float | None = None  # % of the total CPU.
+        self.rss_mb: float | None = None  # Resident memory in MB.
+        self.memory_percent: float | None = None  # % of the total memory.
+
+    @property
+    def in_use(self) -> bool:
+        """True if a camera uses the sampler."""
+        return bool(self._intervals)
+
+    def sample(self) -> None:
+        """Sample the process metrics (blocking, run it in the executor)."""
+        if self._proc is None:
+            psutil = ProcInsp().psutil
+            self._proc = psutil.Process(os.getpid())
+            self._cpu_count = int(psutil.cpu_count() or 1)
+            self._proc.cpu_percent()  # The first call always returns 0.0
+        with self._proc.oneshot():
+            self.cpu_percent = round(self._proc.cpu_percent() / self._cpu_count, 1)
+            self.rss_mb = round(self._proc.memory_info().rss / (1024 * 1024), 1)
+            self.memory_percent = round(self._proc.memory_percent(), 2)
+        _LOGGER.debug(
+            f"Process CPU {self.cpu_percent}%, "
+            f"RSS {self.rss_mb} MB ({self.memory_percent}%)."
+        )
+
+    async def _async_sample(self, _now=None) -> None:
+        """Sample in the executor and notify the listeners."""
+        await self._hass.async_add_executor_job(self.sample)
+        self._notify()
+
+    @callback
+    def async_start(self, hass: HomeAssistant, user: str, interval: int) -> None:
+        """
+        Sample in background for the user (a config entry) every interval
+        seconds (0 disabled), the shortest interval of the users is used.
+        """
+        self._hass = hass
+        self._intervals[user] = int(interval or 0)
+        self._async_schedule()
+
+    @callback
+    def async_stop(self, user: str) -> None:
+        """Stop the background sampling of the user."""
+        self._intervals.pop(user, None)
+        self._async_schedule()
+
+    @callback
+    def _async_schedule(self) -> None:
+        """(Re)start the sampling at the shortest interval of the users."""
+        interval = min(
+            (value for value in self._intervals.values() if value > 0), default=0
+        )
+        if interval == self._interval:
+            return
+        if self._unsub_sampler:
+            self._unsub_sampler()
+            self._unsub_sampler = None
+        self._interval = interval
+        if interval:
+            self._unsub_sampler = async_track_time_interval(
+                self._hass, self._async_sample, timedelta(seconds=interval)
+            )
+            self._hass.async_create_task(self._async_sample())
+
+
+class CameraMetrics(_Listeners):
+    """Render cost of the camera and the process metrics."""
+
+    def __init__(self, file_name: str = "", process: ProcessMetrics | None = None):
+        super().__init__()
+        self.file_name = file_name
+        self.process = process or ProcessMetrics()
+        self.render_time: float | None = None  # Last frame render time (s).
+        self.frames_rendered: int = 0
+
+    @property
+    def cpu_percent(self) -> float | None:
+        """CPU usage of the process, % of the total CPU."""
+        return self.process.cpu_percent
+
+    @property
+    def rss_mb(self) -> float | None:
+        """Resident memory of the process in MB."""
+        return self.process.rss_mb
+
+    @property
+    def memory_percent(self) -> float | None:
+        """Memory of the process, % of the total memory."""
+        return self.process.memory_percent
+
+    def record_render(self, seconds: float) -> None:
+        """Store the render time of the last frame."""
+        self.render_time = seconds
+        self.frames_rendered += 1
+        self._notify()
+
+    @callback
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """
+        Add a function called at each render and process sample, return the
+        remove function.
+        """
+        remove_render = super().add_listener(listener)
+        remove_sample = self.process.add_listener(listener)
+
+        def remove_listener() -> None:
+            remove_render()
+            remove_sample()
+
+        return remove_listener
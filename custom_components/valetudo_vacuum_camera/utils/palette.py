@@ -0,0 +1,157 @@
+"""
+Palette (8-bit indexed) colours for the camera frames.
+The maps are composed with less than 40 colours, instead to paint every
+layer as RGBA we draw the palette index of the colour in a uint8 label canvas.
+The RGBA expansion (or the "P" mode image) is done only at the end.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import logging
+
+from PIL import Image, ImageOps
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.types import Color, NumpyArray, PilPNG
+from custom_components.valetudo_vacuum_camera.utils.colors_man import (
+    base_colors_array,
+    color_grey,
+    rooms_color,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Palette indexes of the map elements.
+PAL_BACKGROUND = 0
+PAL_WALL = 1
+PAL_ZONE_CLEAN = 2
+PAL_ROBOT = 3
+PAL_ROBOT_OUTLINE = 4
+PAL_CHARGER = 5
+PAL_MOVE = 6
+PAL_NO_GO = 7
+PAL_GO_TO = 8
+PAL_GO_TO_POLE = 9
+PAL_GREY = 10
+PAL_TEXT = 11
+PAL_ROOM_0 = 16  # rooms use PAL_ROOM_0 to PAL_ROOM_0 + 15
+PAL_ROOMS = 16
+# the floor uses the room colours, not tinted: PAL_FLOOR_0 to PAL_FLOOR_0 + 15
+PAL_FLOOR_0 = PAL_ROOM_0 + PAL_ROOMS
+PAL_SIZE = PAL_FLOOR_0 + PAL_ROOMS
+
+# Positions of the base colours in CameraShared.user_colors
+USER_COLORS_INDEX = {
+    PAL_WALL: 0,
+    PAL_ZONE_CLEAN: 1,
+    PAL_ROBOT: 2,
+    PAL_BACKGROUND: 3,
+    PAL_MOVE: 4,
+    PAL_CHARGER: 5,
+    PAL_NO_GO: 6,
+    PAL_GO_TO: 7,
+    PAL_TEXT: 8,
+}
+
+COLOR_POLE = (0, 0, 255, 255)  # Go to flag pole colour (blue)
+
+
+class ColorPalette:
+    """
+    Build the palette from the user colours (CameraShared.user_colors and rooms_colors).
+    The palette index is the value drawn in the label canvas.
+    """
+
+    def __init__(self, shared_data):
+        self.shared = shared_data
+        self.colors: NumpyArray = np.zeros((PAL_SIZE, 4), dtype=np.uint8)
+        self._rooms: NumpyArray = np.zeros((PAL_ROOMS, 4), dtype=np.uint8)
+        self._active_rooms: tuple = ()
+        self.build()
+
+    @staticmethod
+    def _rgba(colors, index: int, default: Color) -> Color:
+        """Return the RGBA colour at index or the default one."""
+        try:
+            color = colors[index]
+        except (IndexError, KeyError, TypeError):
+            color = None
+        if not color:
+            return default
+        if len(color) == 3:
+            return color[0], color[1], color[2], 255
+        return tuple(color)
+
+    def build(self) -> None:
+        """(Re)Build the palette from the shared colours."""
+        user_colors = self.shared.user_colors
+        rooms_colors = self.shared.rooms_colors
+        for pal_index, user_index in USER_COLORS_INDEX.items():
+            self.colors[pal_index] = self._rgba(
+                user_colors, user_index, base_colors_array[user_index]
+            )
+        self.colors[PAL_ROBOT_OUTLINE] = tuple(
+            int(c) // 2 for c in self.colors[PAL_ROBOT][:3]
+        ) + (int(self.colors[PAL_ROBOT][3]),)
+        self.colors[PAL_GO_TO_POLE] = COLOR_POLE
+        self.colors[PAL_GREY] = color_grey
+        for room in range(PAL_ROOMS):
+            self._rooms[room] = self._rgba(rooms_colors, room, rooms_color[room])
+        self.colors[PAL_ROOM_0 : PAL_ROOM_0 + PAL_ROOMS] = self._rooms
+        self.colors[PAL_FLOOR_0 : PAL_FLOOR_0 + PAL_ROOMS] = self._rooms
+        self._active_rooms = ()
+
+    def set_active_rooms(self, active_zones: list | None) -> bool:
+        """
+        Tint the rooms marked as active (zone clean colour) changing only the palette.
+        The label canvas don't need to be redrawn.
+        @param active_zones: list of 0 / 1 for each room.
+        @return: True if the palette changed.
+        """
+        active = tuple(active_zones or ())
+        if active == self._active_rooms:
+            return False
+        self._active_rooms = active
+        rooms = self._rooms.astype(np.uint16)
+        tinted = ((2 * rooms) + self.colors[PAL_ZONE_CLEAN]) // 3
+        for room in range(PAL_ROOMS):
+            if room < len(active) and active[room] == 1:
+                self.colors[PAL_ROOM_0 + room] = tinted[room]
+            else:
+                self.colors[PAL_ROOM_0 + room] = self._rooms[room]
+        return True
+
+    @staticmethod
+    def room_index(room_id: int) -> int:
+        """Return the palette index of the room."""
+        return PAL_ROOM_0 + (room_id % PAL_ROOMS)
+
+    @staticmethod
+    def floor_index(room_id: int) -> int:
+        """Return the palette index of the floor (room colour, never tinted)."""
+        return PAL_FLOOR_0 + (room_id % PAL_ROOMS)
+
+    @staticmethod
+    def create_label_canvas(width: int, height: int, index: int) -> NumpyArray:
+        """Create the empty label canvas filled with the palette index."""
+        return np.full((height, width), index, dtype=np.uint8)
+
+    def to_rgba(self, labels: NumpyArray) -> NumpyArray:
+        """Expand the label canvas to a RGBA numpy array (look up table)."""
+        return self.colors[labels]
+
+    def to_pil(self, labels: NumpyArray) -> PilPNG:
+        """Return the label canvas as "P" mode PIL image with its palette."""
+        pil_img = Image.fromarray(labels, mode="P")
+        pil_img.putpalette(self.colors[:, :3].tobytes())
+        pil_img.info["transparency"] = self.colors[:, 3].tobytes()
+        return pil_img
+
+
+def pad_image(pil_img: PilPNG, size: tuple[int, int]) -> PilPNG:
+    """ImageOps.pad that keeps the palette transparency of the "P" mode images."""
+    padded = ImageOps.pad(pil_img, size)
+    if "transparency" in pil_img.info:
+        padded.info["transparency"] = pil_img.info["transparency"]
+    return padded
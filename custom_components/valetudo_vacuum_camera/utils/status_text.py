@@ -1,19 +1,24 @@
 """
 Version: 2024.06.0
 Status text of the vacuum cleaners.
-Clas to handle the status text of the vacuum cleaners.
+Class to handle the status text of the vacuum cleaners.
+The translations files are cached, read again only when modified.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import os
 
 from custom_components.valetudo_vacuum_camera.types import JsonType, PilPNG
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 _LOGGER.propagate = True
 
+# Translations file path: (modification time, translations), all the cameras.
+_translations_cache: dict[str, tuple[int, JsonType]] = {}
+
 
 class StatusText:
     """
@@ -37,6 +42,10 @@ class StatusText:
         file_name = f"{language}.json"
         file_path = f"{self._translations_path}/{file_name}"
         try:
+            mtime = os.stat(file_path).st_mtime_ns
+            cached = _translations_cache.get(file_path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
             with open(file_path) as file:
                 translations = json.load(file)
         except FileNotFoundError:
@@ -47,6 +56,7 @@ class StatusText:
         except json.JSONDecodeError:
             _LOGGER.warning(f"{file_path} is not a valid JSON file.")
             return None
+        _translations_cache[file_path] = (mtime, translations)
         return translations
 
     def get_vacuum_status_translation(self, language: str) -> any:
@@ -103,17 +113,17 @@ class StatusText:
                     else:
                         if in_room:
                             status_text.append(f" ({in_room})")
-                if self._shared.vacuum_state == "docked":
+                if self._shared.vacuum_battery is None:
+                    pass  # Battery level not received yet.
+                elif self._shared.vacuum_state == "docked":
                     if int(self._shared.vacuum_battery) <= 99:
                         status_text.append(" \u00B7 ")
                         status_text.append(f"{charging}{charge_level} ")
                         status_text.append(f"{self._shared.vacuum_battery}%")
-                        self._shared.vacuum_bat_charged = False
                     else:
                         status_text.append(" \u00B7 ")
                         status_text.append(f"{charge_level} ")
                         status_text.append("Ready.")
-                        self._shared.vacuum_bat_charged = True
                 else:
                     status_text.append(" \u00B7 ")
                     status_text.append(f"{charge_level}")
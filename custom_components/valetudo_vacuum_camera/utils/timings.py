@@ -0,0 +1,78 @@
+"""
+Stage Timings Class.
+Lightweight span timers of the render pipeline stages (decompression,
+parsing, base layers, overlays, trim and rotate, status text, encode).
+Each stage keeps a rolling window of samples, summarized as p50 / p95 / max.
+When disabled the timers only return None (no clock reads, no samples).
+The samples are recorded by the render threads and summarized by the event
+loop (diagnostics), the windows are accessed under a lock.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import logging
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+TIMINGS_WINDOW = 128  # Samples kept for each stage.
+
+
+class StageTimings:
+    """Rolling timings of the render pipeline stages."""
+
+    def __init__(self, enabled: bool = False, window: int = TIMINGS_WINDOW):
+        self.enabled = enabled
+        self._window = window
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> float | None:
+        """Start a span, return the start time (None if disabled)."""
+        if not self.enabled:
+            return None
+        return time.perf_counter()
+
+    def stop(self, stage: str, started: float | None) -> None:
+        """Stop the span of the stage started at started."""
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self._window)
+            samples.append(elapsed)
+
+    def reset(self) -> None:
+        """Remove all the samples."""
+        with self._lock:
+            self._samples.clear()
+
+    @staticmethod
+    def _percentile(ordered: list[float], percent: float) -> float:
+        """Return the percentile of the ordered samples (nearest rank)."""
+        index = round(percent / 100 * (len(ordered) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        """Return p50, p95 and max (milliseconds) of each stage."""
+        with self._lock:
+            snapshot = {
+                stage: list(samples) for stage, samples in self._samples.items()
+            }
+        result = {}
+        for stage, samples in snapshot.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            result[stage] = {
+                "count": len(ordered),
+                "p50": round(self._percentile(ordered, 50) * 1000, 2),
+                "p95": round(self._percentile(ordered, 95) * 1000, 2),
+                "max": round(ordered[-1] * 1000, 2),
+            }
+        return result
@@ -0,0 +1,185 @@
+"""
+Warm Start Class.
+Persist the render state of the camera in .storage/valetudo_camera, so that
+after a restart the camera serves the last frame immediately and the first
+frame reuses the base layer when the map did not change.
+Files of each vacuum:
+- {file_name}_render_state.json: crop box, trims, rooms and calibration data.
+- {file_name}_last_frame.bin: the last encoded frame (full size).
+- {file_name}_base_layer.npy: the base layer, loaded memory mapped.
+The state is used only if the options affecting the base layer are the same,
+the base layer only if the map layers are the same.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# Image handler attributes restored with the base layer.
+HANDLER_STATE_FIELDS = (
+    "auto_crop",
+    "crop_area",
+    "crop_img_size",
+    "trim_up",
+    "trim_down",
+    "trim_left",
+    "trim_right",
+    "room_propriety",
+    "rooms_pos",
+)
+
+
+def _json_default(value):
+    """Convert the numpy values to the json types."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class WarmStart:
+    """Save and load the render state of the camera."""
+
+    def __init__(self, storage_path: str, file_name: str):
+        self.file_name = file_name
+        self._state_file = os.path.join(storage_path, f"{file_name}_render_state.json")
+        self._frame_file = os.path.join(storage_path, f"{file_name}_last_frame.bin")
+        self._base_file = os.path.join(storage_path, f"{file_name}_base_layer.npy")
+        self._base_hash = None  # Map hash of the base layer saved on disk.
+
+    @staticmethod
+    def map_hash(layers: dict, active: list) -> str:
+        """Return the hash of the map layers and of the active segments."""
+        digest = hashlib.blake2b(repr(active).encode(), digest_size=16)
+        for layer_type in sorted(layers):
+            digest.update(layer_type.encode())
+            for pixels in layers[layer_type]:
+                # Same hash for the lists and the (stream decoded) int32 arrays.
+                digest.update(np.asarray(pixels, dtype=np.int32).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def render_key(shared) -> str:
+        """Return the hash of the options used to draw and trim the base layer."""
+        options = (
+            shared.user_colors,
+            shared.rooms_colors,
+            shared.palette_mode,
+            shared.margins,
+            shared.offset_top,
+            shared.offset_down,
+            shared.offset_left,
+            shared.offset_right,
+            shared.image_rotate,
+            shared.image_aspect_ratio,
+        )
+        return hashlib.blake2b(repr(options).encode(), digest_size=8).hexdigest()
+
+    def save(
+        self,
+        shared,
+        handler=None,
+        frame_bytes: bytes | None = None,
+        content_type: str | None = None,
+    ) -> None:
+        """
+        Save the render state (blocking, run it in the executor).
+        @param shared: camera shared data.
+        @param handler: image handler with the base layer (None to skip it).
+        @param frame_bytes: last encoded frame.
+        @param content_type: content type of the encoded frame.
+        """
+        state = {
+            "render_key": self.render_key(shared),
+            "content_type": content_type,
+            "calibration_points": shared.attr_calibration_points,
+            "image_ref": [shared.image_ref_width, shared.image_ref_height],
+            "map_hash": None,
+        }
+        try:
+            if (
+                handler is not None
+                and handler.img_base_layer is not None
+                and handler.map_model is not None
+            ):
+                layers, active = handler.map_model.find_layers()
+                state["map_hash"] = self.map_hash(layers, active)
+                state["img_hash"] = handler.img_hash
+                state["handler"] = {
+                    field: getattr(handler, field) for field in HANDLER_STATE_FIELDS
+                }
+                if self._base_hash != state["map_hash"]:
+                    # The base layer is written only when the map changes.
+                    np.save(self._base_file, np.asarray(handler.img_base_layer))
+                    self._base_hash = state["map_hash"]
+            if frame_bytes:
+                with open(self._frame_file, "wb") as file:
+                    file.write(frame_bytes)
+            with open(self._state_file, "w", encoding="utf-8") as file:
+                json.dump(state, file, default=_json_default)
+        except (OSError, TypeError, ValueError) as e:
+            _LOGGER.warning(f"{self.file_name}: Unable to save the render state: {e}")
+            return
+        _LOGGER.debug(f"{self.file_name}: Render state saved.")
+
+    def load(self, shared) -> dict | None:
+        """
+        Load the render state (blocking, run it in the executor).
+        @param shared: camera shared data, the options must match the saved ones.
+        @return: the state with the "frame" bytes and the memory mapped
+        "base_layer" (if available) or None.
+        """
+        if not os.path.isfile(self._state_file):
+            return None
+        try:
+            with open(self._state_file, encoding="utf-8") as file:
+                state = json.load(file)
+            if state.get("render_key") != self.render_key(shared):
+                _LOGGER.info(f"{self.file_name}: Options changed, cold start.")
+                return None
+            state["frame"] = None
+            if os.path.isfile(self._frame_file):
+                with open(self._frame_file, "rb") as file:
+                    state["frame"] = file.read()
+            state["base_layer"] = None
+            if state.get("map_hash") and os.path.isfile(self._base_file):
+                # Copy on write: the handler never changes the saved file.
+                state["base_layer"] = np.load(self._base_file, mmap_mode="c")
+                self._base_hash = state["map_hash"]
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"{self.file_name}: Unable to load the render state: {e}")
+            return None
+        _LOGGER.info(f"{self.file_name}: Render state loaded, warm start.")
+        return state
+
+    @staticmethod
+    def restore(handler, state: dict, layers: dict, active: list) -> bool:
+        """
+        Restore the base layer and the crop data of the handler.
+        @param handler: image handler.
+        @param state: state loaded.
+        @param layers: layers of the current map.
+        @param active: active segments of the current map.
+        @return: True if restored (the map is the same of the saved one).
+        """
+        if state.get("base_layer") is None:
+            return False
+        if state.get("map_hash") != WarmStart.map_hash(layers, active):
+            return False
+        for field, value in state.get("handler", {}).items():
+            if field in HANDLER_STATE_FIELDS:
+                setattr(handler, field, value)
+        handler.img_base_layer = state["base_layer"]
+        handler.img_hash = state.get("img_hash")
+        ref_width, ref_height = state.get("image_ref") or (0, 0)
+        if ref_width and ref_height:
+            handler.shared.image_ref_width = ref_width
+            handler.shared.image_ref_height = ref_height
+        return True
@@ -0,0 +1,206 @@
+"""
+MQTT Capture Classes.
+Recording and replay of the MQTT messages of a vacuum.
+- MqttRecorder: appends the messages received by the connector (map data,
+  status, battery, destinations, custom_command) to a capture file.
+- MqttReplay: feeds a capture to ValetudoConnector.async_message_received
+  at the recorded speed, accelerated or as fast as possible, without broker.
+The capture file (.storage/valetudo_camera/<file_name>.mqtt) is a sequence of
+gzip members, each one with the records of a flush. Each record is the header
+RECORD_HEADER (seconds since the start, topic size, payload size) followed by
+the topic (after the vacuum base topic) and the payload bytes.
+The recording stops when the capture file reaches MAX_CAPTURE_SIZE or the
+recording lasts MAX_CAPTURE_DURATION (delete the file to record again).
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import gzip
+import logging
+import os
+import struct
+import time
+from typing import Any, Awaitable, Callable, Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD_HEADER = struct.Struct("<dHI")  # seconds, topic size, payload size
+FLUSH_SIZE = 1024 * 1024  # Bytes of records kept in memory before a flush.
+MAX_CAPTURE_SIZE = 100 * 1024 * 1024  # Max bytes of the capture file.
+MAX_CAPTURE_DURATION = 24 * 3600  # Max seconds recorded.
+
+
+@dataclass(slots=True)
+class CaptureMessage:
+    """MQTT message of a capture (same attributes used by the connector)."""
+
+    topic: str
+    payload: bytes
+    timestamp: float  # Seconds since the start of the capture.
+    qos: int = 0
+    retain: bool = False
+
+
+class MqttRecorder:
+    """Record the MQTT messages of a vacuum in a capture file."""
+
+    def __init__(
+        self,
+        storage_path: str,
+        file_name: str,
+        base_topic: str,
+        max_size: int = MAX_CAPTURE_SIZE,
+        max_duration: float = MAX_CAPTURE_DURATION,
+    ):
+        self.file_path = os.path.join(storage_path, f"{file_name}.mqtt")
+        self._base = len(base_topic) + 1
+        self._started = None  # Monotonic time of the first message.
+        self._pending: list[bytes] = []  # Records not written yet.
+        self._pending_size = 0
+        self._write_lock = asyncio.Lock()
+        self._max_size = max_size
+        self._max_duration = max_duration
+        # Bytes of the capture file (a capture of a previous run is continued).
+        self._file_size = (
+            os.path.getsize(self.file_path) if os.path.isfile(self.file_path) else 0
+        )
+        self.stopped = False  # The capture reached the max size or duration.
+        self.messages = 0
+
+    def record(
+        self, topic: str, payload: Any, timestamp: float | None = None
+    ) -> bool:
+        """
+        Keep the message in memory.
+        @param timestamp: seconds since the start, default the time elapsed.
+        @return: True when the records in memory should be flushed.
+        """
+        if self.stopped:
+            return False
+        if timestamp is None:
+            now = time.monotonic()
+            if self._started is None:
+                self._started = now
+            timestamp = now - self._started
+        if isinstance(payload, str):
+            payload = payload.encode()
+        elif not isinstance(payload, (bytes, bytearray)):
+            payload = str(payload).encode()
+        sub_topic = topic[self._base :].encode()
+        record_size = RECORD_HEADER.size + len(sub_topic) + len(payload)
+        if (
+            self._file_size + self._pending_size + record_size > self._max_size
+            or timestamp > self._max_duration
+        ):
+            self.stopped = True
+            _LOGGER.warning(
+                f"{self.file_path}: MQTT recording stopped, capture limit reached "
+                f"({self.messages} messages recorded)."
+            )
+            return bool(self._pending)
+        self._pending.append(
+            RECORD_HEADER.pack(timestamp, len(sub_topic), len(payload))
+        )
+        self._pending.append(sub_topic)
+        self._pending.append(bytes(payload))
+        self._pending_size += record_size
+        self.messages += 1
+        return self._pending_size >= FLUSH_SIZE
+
+    async def async_flush(self, hass) -> None:
+        """Write the records in memory to the capture file (in the executor)."""
+        data = self._take_pending()
+        if data:
+            async with self._write_lock:
+                await hass.async_add_executor_job(self._write, data)
+
+    def flush(self) -> None:
+        """Write the records in memory to the capture file (outside the loop)."""
+        data = self._take_pending()
+        if data:
+            self._write(data)
+
+    def _take_pending(self) -> bytes:
+        """Return the records in memory and clear them."""
+        data = b"".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        return data
+
+    def _write(self, data: bytes) -> None:
+        """Append the records to the capture file as a gzip member."""
+        member = gzip.compress(data, compresslevel=6)
+        with open(self.file_path, "ab") as file:
+            file.write(member)
+        self._file_size += len(member)
+        _LOGGER.debug(f"{self.file_path}: {len(data)} bytes of MQTT messages saved.")
+
+
+def read_capture(file_path: str, base_topic: str = "") -> Iterator[CaptureMessage]:
+    """
+    Read the messages of a capture file, one record at a time.
+    @param base_topic: vacuum base topic prepended to the recorded topics.
+    """
+    prefix = f"{base_topic}/" if base_topic else ""
+    with gzip.open(file_path, "rb") as file:
+        while True:
+            try:
+                header = file.read(RECORD_HEADER.size)
+                if not header:
+                    return
+                if len(header) != RECORD_HEADER.size:
+                    raise EOFError
+                timestamp, topic_size, payload_size = RECORD_HEADER.unpack(header)
+                topic = file.read(topic_size)
+                payload = file.read(payload_size)
+                if len(topic) != topic_size or len(payload) != payload_size:
+                    raise EOFError
+            except EOFError:
+                _LOGGER.warning(
+                    f"{file_path}: truncated capture, last message skipped."
+                )
+                return
+            yield CaptureMessage(prefix + topic.decode(), payload, timestamp)
+
+
+class MqttReplay:
+    """Feed a capture to a connector, without the MQTT broker."""
+
+    def __init__(self, connector, base_topic: str):
+        self._connector = connector
+        self._base_topic = base_topic
+
+    async def async_replay(
+        self,
+        file_path: str,
+        speed: float = 1.0,
+        on_message: Callable[[CaptureMessage], Awaitable[None]] | None = None,
+    ) -> dict:
+        """
+        Replay the capture.
+        @param speed: 1.0 real time, 10.0 ten times faster, 0 no wait.
+        @param on_message: awaited after each message (e.g. to process the map).
+        @return: messages replayed, capture duration and replay time.
+        """
+        self._connector.register_topic_handlers()
+        started = time.perf_counter()
+        messages = 0
+        timestamp = 0.0
+        for message in read_capture(file_path, self._base_topic):
+            if speed > 0:
+                delay = message.timestamp / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self._connector.async_message_received(message)
+            if on_message is not None:
+                await on_message(message)
+            messages += 1
+            timestamp = message.timestamp
+        return {
+            "messages": messages,
+            "capture_s": round(timestamp, 3),
+            "replay_s": round(time.perf_counter() - started, 3),
+        }
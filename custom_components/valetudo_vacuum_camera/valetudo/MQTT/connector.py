@@ -3,16 +3,43 @@ Version: v2024.05.3
 - Removed the PNG decode, the json is extracted from map-data instead of map-data-hass.
 - Tested no influence on the camera performance.
 - Added gzip library used in Valetudo RE data compression.
+- Added the hash of the map payload used to fingerprint the camera frames.
+- Added the activity callback, used to resume the camera from the idle state.
+- The MQTT entry points are measured by the event loop watchdog (when enabled).
+- The topics are dispatched with a dict built at subscribe time, the topics of
+  the other firmware are unsubscribed at the first map received.
+- The map payloads identical to the last one are dropped before decompression.
+- The Hypfer map bytes are decoded with the fast JSON backend (orjson if available).
+- Optional low memory (stream) decoding of the Hypfer map.
+- Optional recording of the MQTT messages (capture file), replayed by MqttReplay.
+- The MQTT client can be replaced (mqtt_client), used by the simulator.
+- The Rand256 destinations are parsed once, when the payload changes.
+- The vacuum state is kept in a VacuumStateStore, its changes are notified.
 """
 
+import hashlib
 import json
 import logging
+import time
 
 from homeassistant.components import mqtt
 from homeassistant.core import callback
 from homeassistant.helpers.storage import STORAGE_DIR
-from isal import igzip, isal_zlib
 
+from custom_components.valetudo_vacuum_camera.utils.json_backend import (
+    JSON_BACKEND,
+    json_loads,
+)
+from custom_components.valetudo_vacuum_camera.utils.loop_watchdog import watched
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.map_stream import (
+    MapStreamDecoder,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.vacuum_state import (
+    VacuumStateStore,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.destinations import (
+    Destinations,
+)
 from custom_components.valetudo_vacuum_camera.valetudo.rand256.rrparser import (
     RRMapParser,
 )
@@ -20,33 +47,55 @@ from custom_components.valetudo_vacuum_camera.valetudo.rand256.rrparser import (
 _LOGGER = logging.getLogger(__name__)
 _QOS = 0
 
+# Topics (after the vacuum base topic) and their handlers of each firmware.
+HYPFER_TOPICS = {
+    "MapData/map-data": "hypfer_handle_image_data",
+    "StatusStateAttribute/status": "hypfer_handle_status_payload",
+    "StatusStateAttribute/error_description": "hypfer_handle_errors",
+    "$state": "hypfer_handle_connect_state",
+    "BatteryStateAttribute/level": "hypfer_handle_battery_level",
+}
+RAND256_TOPICS = {
+    "map_data": "rand256_handle_image_payload",
+    "state": "rand256_handle_statuses",
+    "destinations": "rand256_handle_destinations",
+    "custom_command": "rrm_handle_active_segments",
+}
+
 
 class ValetudoConnector:
     """Valetudo Camera MQTT Connector."""
 
-    def __init__(self, mqtt_topic, hass, camera_shared):
+    def __init__(self, mqtt_topic, hass, camera_shared, mqtt_client=None):
         self._hass = hass
+        self._mqtt = mqtt_client or mqtt  # homeassistant.components.mqtt
         self._mqtt_topic = mqtt_topic
-        self._unsubscribe_handlers = []
+        self._unsubscribe_handlers = {}  # topic: unsubscribe function
+        self._topic_handlers = {}  # topic: handler of the messages
+        self._topic_stats = {}  # topic: messages count and handler time
+        self._firmware = None  # Firmware detected from the map topic
         self._ignore_data = False
         self._rcv_topic = None
         self._payload = None
         self._img_payload = None
-        self._mqtt_vac_stat = ""
-        self._mqtt_vac_connect_state = "disconnected"
-        self._mqtt_vac_battery_level = None
-        self._mqtt_vac_err = None
         self._data_in = False
         self._do_it_once = True  # Rand256
         self._is_rrm = False  # Rand256
         self._rrm_json = None  # Rand256
         self._rrm_payload = None  # Rand256
-        self._rrm_destinations = None  # Rand256
-        self._mqtt_vac_re_stat = None  # Rand256
         self._rrm_data = RRMapParser()  # Rand256
-        self._rrm_active_segments = []  # Rand256
+        self._payload_hash = None  # Hash of the last map payload
+        self._payload_size = 0  # Size of the last map payload (compressed)
+        self._decompressed_size = 0  # Size of the last map payload (decompressed)
+        self._data_type = None  # Firmware of the last map payload
+        self._inputs_changed = False  # Status changed since the last map processed
+        self._payloads_received = 0  # Map payloads received
+        self._payloads_dropped = 0  # Map payloads identical to the last one
+        self._activity_callback = None  # Called on status or map changes
         self._file_name = camera_shared.file_name
         self._shared = camera_shared
+        # Status, connection, battery, error, active segments and destinations.
+        self.state = VacuumStateStore(self._file_name)
 
     async def update_data(self, process: bool = True):
         """
@@ -62,19 +111,43 @@ class ValetudoConnector:
                 _LOGGER.debug(
                     f"{self._file_name}: Processing {data_type} data from MQTT."
                 )
-                if data_type == "Hypfer":
-                    json_data = isal_zlib.decompress(payload).decode()
-                    result = json.loads(json_data)
+                timings = self._shared.timings
+                self._payload_size = len(payload)
+                self._data_type = data_type
+                if data_type == "Hypfer" and self._shared.stream_decode:
+                    # Decompressed and parsed in chunks, a single span.
+                    started = timings.start()
+                    result = MapStreamDecoder().decode(payload)
+                    timings.stop("parse", started)
+                    self._decompressed_size = None
+                elif data_type == "Hypfer":
+                    from isal import isal_zlib  # Imported at the first payload.
+
+                    started = timings.start()
+                    json_data = isal_zlib.decompress(payload)
+                    timings.stop("decompress", started)
+                    self._decompressed_size = len(json_data)
+                    started = timings.start()
+                    result = json_loads(json_data)
+                    timings.stop("parse", started)
                 elif (data_type == "Rand256") and (self._ignore_data is False):
+                    from isal import igzip  # Imported at the first payload.
+
+                    started = timings.start()
                     payload_decompressed = igzip.decompress(payload)
+                    timings.stop("decompress", started)
+                    self._decompressed_size = len(payload_decompressed)
+                    started = timings.start()
                     self._rrm_json = self._rrm_data.parse_data(
                         payload=payload_decompressed, pixels=True
                     )
+                    timings.stop("parse", started)
                     result = self._rrm_json
                 else:
                     result = None
                 self._is_rrm = bool(self._rrm_json)
                 self._data_in = False
+                self._inputs_changed = False
                 _LOGGER.info(
                     f"{self._file_name}: Extraction of {data_type} JSON Complete."
                 )
@@ -82,7 +155,7 @@ class ValetudoConnector:
             else:
                 _LOGGER.info(
                     f"No image data from {self._mqtt_topic},"
-                    f"vacuum in {self._mqtt_vac_stat} status."
+                    f"vacuum in {self.state.state.status} status."
                 )
                 self._ignore_data = True
                 self._data_in = False
@@ -91,38 +164,103 @@ class ValetudoConnector:
 
     async def get_vacuum_status(self) -> str:
         """Return the vacuum status."""
-        if self._mqtt_vac_stat:
-            return str(self._mqtt_vac_stat)
-        if self._mqtt_vac_re_stat:
-            return str(self._mqtt_vac_re_stat)
+        if self.state.state.status:
+            return str(self.state.state.status)
 
     async def get_vacuum_error(self) -> str:
         """Return the vacuum error."""
-        return str(self._mqtt_vac_err)
+        return str(self.state.state.error)
 
     async def get_battery_level(self) -> str:
         """Rerun vacuum battery Level."""
-        return str(self._mqtt_vac_battery_level)
+        return str(self.state.state.battery)
 
     async def get_vacuum_connection_state(self) -> bool:
         """Return the vacuum connection state."""
-        if self._mqtt_vac_connect_state != "ready":
+        if self.state.state.connection != "ready":
             return False
         return True
 
-    async def get_destinations(self) -> any:
-        """Return the destinations used only for Rand256."""
-        return self._rrm_destinations
+    async def get_destinations(self) -> Destinations | None:
+        """Return the destinations (parsed) used only for Rand256."""
+        return self.state.state.destinations
 
     async def get_rand256_active_segments(self) -> list:
         """Return the active segments used only for Rand256."""
-        return list(self._rrm_active_segments)
+        return list(self.state.state.active_segments)
 
     async def is_data_available(self) -> bool:
         """Check and Return the data availability."""
         return bool(self._data_in)
 
+    def set_activity_callback(self, activity_callback) -> None:
+        """Set the function called when the vacuum status or the map change."""
+        self._activity_callback = activity_callback
+
+    def _notify_activity(self) -> None:
+        """Notify the vacuum activity (status or map changed)."""
+        self._inputs_changed = True
+        if self._activity_callback:
+            self._activity_callback()
+
+    def _is_duplicate_payload(self, payload: bytes) -> bool:
+        """
+        Hash the compressed map payload, return True if it is the same of
+        the last one and nothing else changed since: it can be dropped.
+        """
+        self._payloads_received += 1
+        payload_hash = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        if payload_hash == self._payload_hash and not self._inputs_changed:
+            self._payloads_dropped += 1
+            _LOGGER.debug(f"{self._file_name}: Same map payload, dropped.")
+            return True
+        self._payload_hash = payload_hash
+        return False
+
+    def get_payload_hash(self) -> str | None:
+        """Return the hash of the last map payload received (computed once)."""
+        payload = self._img_payload if self._img_payload else self._rrm_payload
+        if not payload:
+            return None
+        if self._payload_hash is None:
+            self._payload_hash = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        return self._payload_hash
+
+    async def discard_data(self) -> None:
+        """The available data was already processed, mark it as consumed."""
+        self._data_in = False
+        self._inputs_changed = False
+
+    def get_diagnostics(self) -> dict:
+        """Return the parser mode and the sizes of the last map payload."""
+        return {
+            "parser_mode": self._data_type,
+            "json_backend": JSON_BACKEND,
+            "stream_decode": self._shared.stream_decode,
+            "recorded_messages": (
+                self._shared.mqtt_recorder.messages
+                if self._shared.mqtt_recorder is not None
+                else None
+            ),
+            "decompressor": "isal_zlib" if self._data_type == "Hypfer" else "igzip",
+            "payload_size": self._payload_size,
+            "decompressed_size": self._decompressed_size,
+            "payload_hash": self._payload_hash,
+            "data_available": bool(self._data_in),
+            "payloads_received": self._payloads_received,
+            "payloads_dropped": self._payloads_dropped,
+            "dedup_hit_rate": (
+                round(self._payloads_dropped / self._payloads_received, 3)
+                if self._payloads_received
+                else None
+            ),
+            "firmware": self._firmware,
+            "state_versions": dict(self.state.versions),
+            "topics": self.get_topic_stats(),
+        }
+
     @callback
+    @watched
     async def save_payload(self, file_name: str) -> None:
         """
         Save payload when available.
@@ -149,8 +287,16 @@ class ValetudoConnector:
         MapData/map_data is for Hypfer.
         @param msg: MQTT message
         """
+        if self._firmware is None:
+            self._select_firmware("Hypfer")
+        if self._ignore_data:
+            return
         if not self._data_in:
+            if self._is_duplicate_payload(msg.payload):
+                return
             _LOGGER.info(f"Received {self._file_name} image data from MQTT")
+            if msg.payload != self._img_payload:
+                self._notify_activity()
             self._img_payload = msg.payload
             self._data_in = True
 
@@ -162,11 +308,10 @@ class ValetudoConnector:
         """
         self._payload = await self.async_decode_mqtt_payload(msg)
         if self._payload:
-            self._mqtt_vac_stat = self._payload
-            _LOGGER.info(
-                f"{self._file_name}: Received vacuum {self._mqtt_vac_stat} status."
-            )
-            if self._mqtt_vac_stat != "docked":
+            if self.state.update(status=self._payload):
+                self._notify_activity()
+            _LOGGER.info(f"{self._file_name}: Received vacuum {self._payload} status.")
+            if self._payload != "docked":
                 self._ignore_data = False
 
     async def hypfer_handle_connect_state(self, msg) -> None:
@@ -177,9 +322,10 @@ class ValetudoConnector:
         """
         self._payload = await self.async_decode_mqtt_payload(msg)
         if self._payload:
-            self._mqtt_vac_connect_state = self._payload
+            if self.state.update(connection=self._payload):
+                self._notify_activity()
             _LOGGER.info(
-                f"{self._mqtt_topic}: Received vacuum connection status: {self._mqtt_vac_connect_state}."
+                f"{self._mqtt_topic}: Received vacuum connection status: {self._payload}."
             )
         await self.is_disconnect_vacuum()
 
@@ -188,11 +334,11 @@ class ValetudoConnector:
         Disconnect the vacuum detected.
         Generate a Warning message if the vacuum is disconnected.
         """
-        if self._mqtt_vac_connect_state == "disconnected":
+        if self.state.state.connection == "disconnected":
             _LOGGER.warning(
                 f"{self._mqtt_topic}: Vacuum Disconnected from MQTT, waiting for connection."
             )
-            self._mqtt_vac_stat = "disconnected"
+            self.state.update(status="disconnected")
             self._ignore_data = False
             if self._img_payload:
                 self._data_in = True
@@ -206,8 +352,8 @@ class ValetudoConnector:
         @param msg: MQTT message
         """
         self._payload = await self.async_decode_mqtt_payload(msg)
-        self._mqtt_vac_err = self._payload
-        _LOGGER.info(f"{self._mqtt_topic}: Received vacuum Error: {self._mqtt_vac_err}")
+        self.state.update(error=self._payload)
+        _LOGGER.info(f"{self._mqtt_topic}: Received vacuum Error: {self._payload}")
 
     async def hypfer_handle_battery_level(self, msg) -> None:
         """
@@ -217,9 +363,9 @@ class ValetudoConnector:
         """
         self._payload = await self.async_decode_mqtt_payload(msg)
         if self._payload:
-            self._mqtt_vac_battery_level = int(self._payload)
+            self.state.update(battery=int(self._payload))
             _LOGGER.info(
-                f"{self._file_name}: Received vacuum battery level: {self._mqtt_vac_battery_level}%."
+                f"{self._file_name}: Received vacuum battery level: {self._payload}%."
             )
 
     async def rand256_handle_image_payload(self, msg):
@@ -227,11 +373,17 @@ class ValetudoConnector:
         Handle new MQTT messages.
         map-data is for Rand256.
         """
+        if self._firmware is None:
+            self._select_firmware("Rand256")
+        if self._is_duplicate_payload(msg.payload):
+            return
         _LOGGER.info(f"Received {self._file_name} image data from MQTT")
         # RRM Image data update the received payload
+        if msg.payload != self._rrm_payload:
+            self._notify_activity()
         self._rrm_payload = msg.payload
-        if self._mqtt_vac_connect_state == "disconnected":
-            self._mqtt_vac_connect_state = "ready"
+        if self.state.state.connection == "disconnected":
+            self.state.update(connection="ready")
         self._data_in = True
         self._ignore_data = False
         if self._do_it_once:
@@ -248,15 +400,19 @@ class ValetudoConnector:
         self._payload = msg.payload
         if self._payload:
             tmp_data = json.loads(self._payload)
-            self._mqtt_vac_re_stat = tmp_data.get("state", None)
-            self._mqtt_vac_battery_level = tmp_data.get("battery_level", None)
+            changed = self.state.update(
+                status=tmp_data.get("state", None),
+                battery=tmp_data.get("battery_level", None),
+            )
+            if "status" in changed:
+                self._notify_activity()
             _LOGGER.info(
-                f"{self._file_name}: Received vacuum {self._mqtt_vac_re_stat} status "
-                f"and battery level: {self._mqtt_vac_battery_level}%."
+                f"{self._file_name}: Received vacuum {self.state.state.status} status "
+                f"and battery level: {self.state.state.battery}%."
             )
-            if (
-                self._mqtt_vac_stat != "docked"
-                or int(self._mqtt_vac_battery_level) <= 100
+            battery = self.state.state.battery
+            if self.state.state.status != "docked" or (
+                battery is not None and int(battery) <= 100
             ):
                 self._data_in = True
                 self._is_rrm = True
@@ -268,10 +424,24 @@ class ValetudoConnector:
         @param msg: MQTT message
         """
         self._payload = msg.payload
-        tmp_data = await self.async_decode_mqtt_payload(msg)
-        self._rrm_destinations = tmp_data
+        destinations = self.state.state.destinations
+        if (
+            destinations is not None
+            and Destinations.payload_digest(msg.payload) == destinations.payload_hash
+        ):
+            _LOGGER.debug(f"{self._file_name}: Same destinations, not parsed.")
+            return
+        try:
+            destinations = Destinations.from_payload(msg.payload)
+        except (ValueError, TypeError, KeyError) as e:
+            _LOGGER.warning(f"{self._file_name}: Invalid destinations: {e}")
+            return
+        self.state.update(destinations=destinations)
         _LOGGER.info(
-            f"{self._file_name}: Received vacuum destinations: {self._rrm_destinations}"
+            f"{self._file_name}: Received vacuum destinations: "
+            f"{len(destinations.rooms)} rooms, "
+            f"{len(destinations.zones)} zones, "
+            f"{len(destinations.spots)} spots."
         )
 
     async def rrm_handle_active_segments(self, msg) -> None:
@@ -284,75 +454,94 @@ class ValetudoConnector:
         command_status = json.loads(msg.payload)
         command = command_status.get("command", None)
 
-        if command == "segmented_cleanup" and self._rrm_destinations:
+        destinations = self.state.state.destinations
+        if command == "segmented_cleanup" and destinations:
             segment_ids = command_status.get("segment_ids", [])
-            # Parse rooms JSON from _rrm_destinations
-            rooms_json = json.loads(self._rrm_destinations)
-            rooms = rooms_json.get("rooms", [])
-            # Create a mapping of room IDs to their positions in rooms list
-            room_ids = {room["id"]: idx for idx, room in enumerate(rooms, start=1)}
-            # Initialize rrm_active_segments with zeros
-            self._rrm_active_segments = [0] * len(rooms)
-
-            for segment_id in segment_ids:
-                if segment_id in room_ids:
-                    room_idx = room_ids[segment_id] - 1  # Adjust index to start from 0
-                    self._rrm_active_segments[room_idx] = 1
-            self._shared.rand256_active_zone = self._rrm_active_segments
+            # Rooms positions from the destinations index (parsed at arrival).
+            self.state.update(
+                active_segments=destinations.active_segments(segment_ids)
+            )
             _LOGGER.debug(
-                f"Active Segments of {self._file_name}: {self._rrm_active_segments}"
+                f"Active Segments of {self._file_name}: "
+                f"{self.state.state.active_segments}"
             )
 
     @callback
+    @watched
     async def async_message_received(self, msg) -> None:
         """
         Handle new MQTT messages.
         MapData/map_data is for Hypfer, and map-data is for Rand256.
         """
         self._rcv_topic = msg.topic
-        if self._rcv_topic == f"{self._mqtt_topic}/map_data":
-            await self.rand256_handle_image_payload(msg)
-        elif (self._rcv_topic == f"{self._mqtt_topic}/MapData/map-data") and (
-            not self._ignore_data
-        ):
-            await self.hypfer_handle_image_data(msg)
-        elif self._rcv_topic == f"{self._mqtt_topic}/StatusStateAttribute/status":
-            await self.hypfer_handle_status_payload(msg)
-        elif self._rcv_topic == f"{self._mqtt_topic}/$state":
-            await self.hypfer_handle_connect_state(msg)
-        elif (
-            self._rcv_topic
-            == f"{self._mqtt_topic}/StatusStateAttribute/error_description"
-        ):
-            await self.hypfer_handle_errors(msg)
-        elif self._rcv_topic == f"{self._mqtt_topic}/BatteryStateAttribute/level":
-            await self.hypfer_handle_battery_level(msg)
-        elif self._rcv_topic == f"{self._mqtt_topic}/state":
-            await self.rand256_handle_statuses(msg)
-        elif self._rcv_topic == f"{self._mqtt_topic}/custom_command":
-            await self.rrm_handle_active_segments(msg)
-        elif self._rcv_topic == f"{self._mqtt_topic}/destinations":
-            await self._hass.async_create_task(self.rand256_handle_destinations(msg))
+        handler = self._topic_handlers.get(msg.topic)
+        if handler is None:
+            return
+        recorder = self._shared.mqtt_recorder
+        if recorder is not None and recorder.record(msg.topic, msg.payload):
+            await recorder.async_flush(self._hass)
+        started = time.perf_counter()
+        await handler(msg)
+        elapsed = time.perf_counter() - started
+        stats = self._topic_stats[msg.topic]
+        stats["messages"] += 1
+        stats["time"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+
+    def register_topic_handlers(self) -> None:
+        """Map the topics of both firmwares to their handlers (no subscription)."""
+        if self._mqtt_topic:
+            for topics in (HYPFER_TOPICS, RAND256_TOPICS):
+                for sub_topic, handler_name in topics.items():
+                    topic = f"{self._mqtt_topic}/{sub_topic}"
+                    self._topic_handlers[topic] = getattr(self, handler_name)
+                    self._topic_stats.setdefault(
+                        topic, {"messages": 0, "time": 0.0, "max": 0.0}
+                    )
 
     async def async_subscribe_to_topics(self) -> None:
         """Subscribe to the MQTT topics for Hypfer and ValetudoRe."""
-        if self._mqtt_topic:
-            for x in [
-                f"{self._mqtt_topic}/MapData/map-data",
-                f"{self._mqtt_topic}/StatusStateAttribute/status",
-                f"{self._mqtt_topic}/StatusStateAttribute/error_description",
-                f"{self._mqtt_topic}/$state",
-                f"{self._mqtt_topic}/BatteryStateAttribute/level",
-                f"{self._mqtt_topic}/map_data",  # added for ValetudoRe
-                f"{self._mqtt_topic}/state",  # added for ValetudoRe
-                f"{self._mqtt_topic}/destinations",  # added for ValetudoRe
-                f"{self._mqtt_topic}/custom_command",  # added for ValetudoRe
-            ]:
-                self._unsubscribe_handlers.append(
-                    await mqtt.async_subscribe(
-                        self._hass, x, self.async_message_received, _QOS, encoding=None
-                    )
-                )
+        self.register_topic_handlers()
+        for topic in self._topic_handlers:
+            self._unsubscribe_handlers[topic] = await self._mqtt.async_subscribe(
+                self._hass,
+                topic,
+                self.async_message_received,
+                _QOS,
+                encoding=None,
+            )
+
+    def _select_firmware(self, firmware: str) -> None:
+        """Keep only the topics of the firmware detected."""
+        self._firmware = firmware
+        other_topics = RAND256_TOPICS if firmware == "Hypfer" else HYPFER_TOPICS
+        for sub_topic in other_topics:
+            topic = f"{self._mqtt_topic}/{sub_topic}"
+            self._topic_handlers.pop(topic, None)
+            self._topic_stats.pop(topic, None)
+            unsubscribe = self._unsubscribe_handlers.pop(topic, None)
+            if unsubscribe:
+                unsubscribe()
+        _LOGGER.debug(
+            f"{self._file_name}: {firmware} vacuum, "
+            f"topics subscribed: {list(self._topic_handlers)}"
+        )
+
+    def get_topic_stats(self) -> dict:
+        """Return the messages count and the handler latency of each topic."""
+        base = len(self._mqtt_topic or "") + 1
+        return {
+            topic[base:]: {
+                "messages": stats["messages"],
+                "avg_ms": (
+                    round(stats["time"] / stats["messages"] * 1000, 3)
+                    if stats["messages"]
+                    else None
+                ),
+                "max_ms": round(stats["max"] * 1000, 3),
+            }
+            for topic, stats in self._topic_stats.items()
+        }
 
     async def rrm_publish_destinations(self) -> None:
         """
@@ -362,7 +551,7 @@ class ValetudoConnector:
         """
         cust_payload = {"command": "get_destinations"}
         cust_payload = json.dumps(cust_payload)
-        await mqtt.async_publish(
+        await self._mqtt.async_publish(
             self._hass,
             self._mqtt_topic + "/custom_command",
             cust_payload,
@@ -373,7 +562,12 @@ class ValetudoConnector:
     async def async_unsubscribe_from_topics(self) -> None:
         """Unsubscribe from all MQTT topics."""
         _LOGGER.debug("Unsubscribing topics!!!")
-        map(lambda x: x(), self._unsubscribe_handlers)
+        for unsubscribe in self._unsubscribe_handlers.values():
+            unsubscribe()
+        self._unsubscribe_handlers.clear()
+        self._topic_handlers.clear()
+        if self._shared.mqtt_recorder is not None:
+            await self._shared.mqtt_recorder.async_flush(self._hass)
 
     @staticmethod
     async def async_decode_mqtt_payload(msg):
@@ -0,0 +1,85 @@
+"""
+Vacuum State Store.
+Typed state of the vacuum received from MQTT: status, connection, battery,
+error, Rand256 active segments and destinations. Each field has a version
+incremented when its value changes, the subscribers are called with the names
+of the changed fields (nothing is called when a message repeats the state).
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+import logging
+from typing import Callable
+
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.destinations import (
+    Destinations,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields drawn only in the status text, not in the map.
+STATUS_TEXT_FIELDS = frozenset({"battery"})
+
+
+@dataclass(slots=True)
+class VacuumState:
+    """State of the vacuum."""
+
+    status: str | None = None
+    connection: str = "disconnected"
+    battery: int | None = None
+    error: str | None = None
+    active_segments: list[int] = field(default_factory=list)  # Rand256
+    destinations: Destinations | None = None  # Rand256
+
+
+STATE_FIELDS = tuple(state_field.name for state_field in fields(VacuumState))
+
+
+class VacuumStateStore:
+    """Versioned vacuum state with change notifications."""
+
+    def __init__(self, file_name: str = ""):
+        self.file_name = file_name
+        self.state = VacuumState()
+        self.version = 0  # Incremented at each change of the state.
+        self.versions = dict.fromkeys(STATE_FIELDS, 0)  # field: version
+        self._subscribers: list[tuple[Callable, frozenset | None]] = []
+
+    def update(self, **changes) -> set[str]:
+        """
+        Update the state fields, notify the subscribers of the changed ones.
+        @return: the names of the changed fields.
+        """
+        changed = set()
+        for name, value in changes.items():
+            if getattr(self.state, name) != value:
+                setattr(self.state, name, value)
+                self.versions[name] += 1
+                changed.add(name)
+        if not changed:
+            return changed
+        self.version += 1
+        _LOGGER.debug(f"{self.file_name}: Vacuum state changed: {sorted(changed)}.")
+        for subscriber, subscribed in list(self._subscribers):
+            if subscribed is None or not subscribed.isdisjoint(changed):
+                subscriber(changed)
+        return changed
+
+    def subscribe(
+        self, subscriber: Callable[[set[str]], None], subscribed=None
+    ) -> Callable[[], None]:
+        """
+        Call the subscriber with the changed fields (only when one of the
+        subscribed fields changed, if given), return the unsubscribe function.
+        """
+        entry = (subscriber, frozenset(subscribed) if subscribed else None)
+        self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+
+        return unsubscribe
@@ -10,12 +10,18 @@ import hashlib
 import json
 import logging
 
+import numpy as np
+
 from custom_components.valetudo_vacuum_camera.types import (
     Color,
-    JsonType,
     NumpyArray,
     RobotPosition,
 )
+from custom_components.valetudo_vacuum_camera.utils.map_model import MapModel
+from custom_components.valetudo_vacuum_camera.utils.palette import (
+    COLOR_POLE,
+    PAL_GO_TO_POLE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,11 +41,16 @@ class ImageDraw:
         """Draw the goto target flag on the map."""
         go_to = entity_dict.get("go_to_target")
         if go_to:
+            if self.img_h.palette:
+                pole_color = PAL_GO_TO_POLE
+            else:
+                pole_color = COLOR_POLE
             np_array = await self.img_h.draw.go_to_flag(
                 np_array,
-                (go_to[0]["points"][0], go_to[0]["points"][1]),
+                tuple(go_to[0].points[0].tolist()),
                 self.img_h.shared.image_rotate,
                 color_go_to,
+                pole_color,
             )
             return np_array
         else:
@@ -59,9 +70,15 @@ class ImageDraw:
         for compressed_pixels in compressed_pixels_list:
             pixels = self.img_h.data.sublist(compressed_pixels, 3)
             if layer_type == "segment" or layer_type == "floor":
-                room_color = self.img_h.shared.rooms_colors[room_id]
+                if self.img_h.palette and layer_type == "floor":
+                    room_color = self.img_h.palette.floor_index(room_id)
+                elif self.img_h.palette:
+                    # the active rooms are tinted changing the palette.
+                    room_color = self.img_h.palette.room_index(room_id)
+                else:
+                    room_color = self.img_h.shared.rooms_colors[room_id]
                 try:
-                    if layer_type == "segment":
+                    if layer_type == "segment" and not self.img_h.palette:
                         # Check if the room is active and set a modified color
                         if self.img_h.active_zones and (
                             room_id in range(len(self.img_h.active_zones))
@@ -105,13 +122,13 @@ class ImageDraw:
             obstacle_positions = []
             if obstacle_data:
                 for obstacle in obstacle_data:
-                    label = obstacle.get("metaData", {}).get("label")
-                    points = obstacle.get("points", [])
+                    label = obstacle.label
+                    points = obstacle.points.tolist()
 
                     if label and points:
                         obstacle_pos = {
                             "label": label,
-                            "points": {"x": points[0], "y": points[1]},
+                            "points": {"x": points[0][0], "y": points[0][1]},
                         }
                         obstacle_positions.append(obstacle_pos)
 
@@ -142,7 +159,7 @@ class ImageDraw:
             _LOGGER.warning(f"{self.file_name}: No charger position found.")
         else:
             if charger_pos:
-                charger_pos = charger_pos[0]["points"]
+                charger_pos = charger_pos[0].points[0].tolist()
                 self.img_h.charger_pos = {
                     "x": charger_pos[0],
                     "y": charger_pos[1],
@@ -154,70 +171,40 @@ class ImageDraw:
             else:
                 return np_array
 
-    async def async_get_json_id(self, my_json: JsonType) -> str | None:
+    async def async_get_json_id(self, model: MapModel) -> str | None:
         """Return the JSON ID from the image."""
-        try:
-            json_id = my_json["metaData"]["nonce"]
-        except (ValueError, KeyError) as e:
-            _LOGGER.debug(f"{self.file_name}: No JsonID provided: {e}")
-            json_id = None
-        return json_id
+        if model.json_id is None:
+            _LOGGER.debug(f"{self.file_name}: No JsonID provided.")
+        return model.json_id
 
     async def async_draw_zones(
         self,
-        m_json: JsonType,
+        model: MapModel,
         np_array: NumpyArray,
         color_zone_clean: Color,
         color_no_go: Color,
     ) -> NumpyArray:
-        """Get the zone clean from the JSON data."""
-        try:
-            zone_clean = self.img_h.data.find_zone_entities(m_json)
-        except (ValueError, KeyError):
-            zone_clean = None
-        else:
-            _LOGGER.info(f"{self.file_name}: Got zones.")
-        if zone_clean:
-            try:
-                zones_active = zone_clean.get("active_zone")
-            except KeyError:
-                zones_active = None
-            if zones_active:
-                np_array = await self.img_h.draw.zones(
-                    np_array, zones_active, color_zone_clean
-                )
-            try:
-                no_go_zones = zone_clean.get("no_go_area")
-            except KeyError:
-                no_go_zones = None
-
-            try:
-                no_mop_zones = zone_clean.get("no_mop_area")
-            except KeyError:
-                no_mop_zones = None
-
-            if no_go_zones:
-                np_array = await self.img_h.draw.zones(
-                    np_array, no_go_zones, color_no_go
-                )
-            if no_mop_zones:
-                np_array = await self.img_h.draw.zones(
-                    np_array, no_mop_zones, color_no_go
-                )
-            return np_array
-        else:
-            return np_array
+        """Draw the zones of the map."""
+        zones_active = model.get_entities("active_zone")
+        if zones_active:
+            np_array = await self.img_h.draw.zones(
+                np_array, zones_active, color_zone_clean
+            )
+        no_go_zones = model.get_entities("no_go_area")
+        if no_go_zones:
+            np_array = await self.img_h.draw.zones(np_array, no_go_zones, color_no_go)
+        no_mop_zones = model.get_entities("no_mop_area")
+        if no_mop_zones:
+            np_array = await self.img_h.draw.zones(
+                np_array, no_mop_zones, color_no_go
+            )
+        return np_array
 
     async def async_draw_virtual_walls(
-        self, m_json: JsonType, np_array: NumpyArray, color_no_go: Color
+        self, model: MapModel, np_array: NumpyArray, color_no_go: Color
     ) -> NumpyArray:
-        """Get the virtual walls from the JSON data."""
-        try:
-            virtual_walls = self.img_h.data.find_virtual_walls(m_json)
-        except (ValueError, KeyError):
-            virtual_walls = None
-        else:
-            _LOGGER.info(f"{self.file_name}: Got virtual walls.")
+        """Draw the virtual walls of the map."""
+        virtual_walls = model.get_entities("virtual_wall")
         if virtual_walls:
             np_array = await self.img_h.draw.draw_virtual_walls(
                 np_array, virtual_walls, color_no_go
@@ -229,36 +216,23 @@ class ImageDraw:
     async def async_draw_paths(
         self,
         np_array: NumpyArray,
-        m_json: JsonType,
+        model: MapModel,
         color_move: Color,
         color_gray: Color,
     ) -> NumpyArray:
-        """Get the paths from the JSON data."""
-        # Initialize the variables
-        path_pixels = None
-        predicted_path = None
-        # Extract the paths data from the JSON data.
-        try:
-            paths_data = self.img_h.data.find_paths_entities(m_json)
-            predicted_path = paths_data.get("predicted_path", [])
-            path_pixels = paths_data.get("path", [])
-        except KeyError as e:
-            _LOGGER.warning(f"{self.file_name}: Error extracting paths data: {str(e)}")
-        finally:
-            if predicted_path:
-                predicted_path = predicted_path[0]["points"]
-                predicted_path = self.img_h.data.sublist(predicted_path, 2)
-                predicted_pat2 = self.img_h.data.sublist_join(predicted_path, 2)
-                np_array = await self.img_h.draw.lines(
-                    np_array, predicted_pat2, 2, color_gray
-                )
+        """Draw the predicted path and the paths of the map."""
+        predicted_path = model.get_entities("predicted_path")
+        if predicted_path:
+            predicted_pat2 = self.img_h.data.sublist_join(predicted_path[0].points, 2)
+            np_array = await self.img_h.draw.lines(
+                np_array, predicted_pat2, 2, color_gray
+            )
+        path_pixels = model.get_entities("path")
         if path_pixels:
             for path in path_pixels:
-                # Get the points from the current path and extend multiple paths.
-                points = path.get("points", [])
-                sublists = self.img_h.data.sublist(points, 2)
+                # Join the points of the current path and extend multiple paths.
                 self.img_h.shared.map_new_path = self.img_h.data.sublist_join(
-                    sublists, 2
+                    path.points, 2
                 )
                 np_array = await self.img_h.draw.lines(
                     np_array, self.img_h.shared.map_new_path, 5, color_move
@@ -267,27 +241,21 @@ class ImageDraw:
         else:
             return np_array
 
-    async def async_get_entity_data(self, m_json: JsonType) -> dict or None:
-        """Get the entity data from the JSON data."""
-        try:
-            entity_dict = self.img_h.data.find_points_entities(m_json)
-        except (ValueError, KeyError):
-            entity_dict = None
-        else:
-            _LOGGER.info(f"{self.file_name}: Got the points in the json.")
-        return entity_dict
+    async def async_get_entity_data(self, model: MapModel) -> dict or None:
+        """Get the entities of the map by type."""
+        return model.entities
 
     @staticmethod
     async def async_copy_array(original_array: NumpyArray) -> NumpyArray:
-        """Copy the array."""
-        return NumpyArray.copy(original_array)
+        """Copy the array (as ndarray, also when the base layer is memory mapped)."""
+        return np.copy(original_array)
 
     async def calculate_array_hash(self, layers: dict, active: list[int] = None) -> str:
         """Calculate the hash of the image based on the layers and active segments walls."""
         self.img_h.active_zones = active
         if layers and active:
             data_to_hash = {
-                "layers": len(layers["wall"][0]),
+                "layers": int(np.size(layers["wall"][0])),
                 "active_segments": tuple(active),
             }
             data_json = json.dumps(data_to_hash, sort_keys=True)
@@ -388,10 +356,8 @@ class ImageDraw:
             return None, None, None
         finally:
             if robot_pos:
-                robot_position = robot_pos[0]["points"]
-                robot_position_angle = round(
-                    float(robot_pos[0]["metaData"]["angle"]), 1
-                )
+                robot_position = robot_pos[0].points[0].tolist()
+                robot_position_angle = round(float(robot_pos[0].angle), 1)
                 if self.img_h.rooms_pos is None:
                     self.img_h.robot_pos = {
                         "x": robot_position[0],
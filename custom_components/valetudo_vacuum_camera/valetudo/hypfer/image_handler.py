@@ -10,7 +10,7 @@ from __future__ import annotations
 import json
 import logging
 
-from PIL import Image, ImageOps
+from PIL import Image
 import numpy as np
 
 from custom_components.valetudo_vacuum_camera.types import (
@@ -25,6 +25,22 @@ from custom_components.valetudo_vacuum_camera.types import (
 from custom_components.valetudo_vacuum_camera.utils.colors_man import color_grey
 from custom_components.valetudo_vacuum_camera.utils.drawable import Drawable
 from custom_components.valetudo_vacuum_camera.utils.img_data import ImageData
+from custom_components.valetudo_vacuum_camera.utils.map_model import MapModel
+from custom_components.valetudo_vacuum_camera.utils.palette import (
+    PAL_BACKGROUND,
+    PAL_CHARGER,
+    PAL_GO_TO,
+    PAL_GREY,
+    PAL_MOVE,
+    PAL_NO_GO,
+    PAL_ROBOT,
+    PAL_ROBOT_OUTLINE,
+    PAL_WALL,
+    PAL_ZONE_CLEAN,
+    ColorPalette,
+    pad_image,
+)
+from custom_components.valetudo_vacuum_camera.utils.warm_start import WarmStart
 from custom_components.valetudo_vacuum_camera.valetudo.hypfer.handler_utils import (
     ImageUtils as ImUtils,
 )
@@ -53,7 +69,7 @@ class MapImageHandler(object):
         self.img_hash = None  # hash of the image calculated to check differences.
         self.img_base_layer = None  # numpy array store the map base layer.
         self.img_size = None  # size of the created image
-        self.json_data = None  # local stored and shared json data.
+        self.map_model = None  # map of the last frame (MapModel).
         self.json_id = None  # grabbed data of the vacuum image id.
         self.path_pixels = None  # vacuum path datas.
         self.robot_in_room = None  # vacuum room position.
@@ -62,6 +78,8 @@ class MapImageHandler(object):
         self.rooms_pos = None  # vacuum room coordinates / name list.
         self.active_zones = None  # vacuum active zones.
         self.frame_number = 0  # frame number of the image.
+        self.base_layer_builds = 0  # number of base layer (re)builds.
+        self.warm_state = None  # render state saved before the restart.
         self.zooming = False  # zooming the image.
         self.shared = shared_data  # camera shared data
         self.svg_wait = False  # SVG image creation wait.
@@ -75,6 +93,9 @@ class MapImageHandler(object):
         self.offset_right = self.shared.offset_right  # offset right
         self.offset_x = 0  # offset x for the aspect ratio.
         self.offset_y = 0  # offset y for the aspect ratio.
+        self.palette = (
+            ColorPalette(self.shared) if self.shared.palette_mode else None
+        )  # palette of the label canvas (palette mode only).
         self.imd = ImDraw(self)
         self.imu = ImUtils(self)
 
@@ -92,12 +113,15 @@ class MapImageHandler(object):
         try:
             if not self.auto_crop:
                 # Find the coordinates of the first occurrence of a non-background color
-                nonzero_coords = np.column_stack(
-                    np.where(image_array != list(detect_colour))
-                )
+                if isinstance(detect_colour, int):
+                    # palette mode, the label canvas has only two dimensions.
+                    background = detect_colour
+                else:
+                    background = list(detect_colour)
+                nonzero_coords = np.column_stack(np.where(image_array != background))
                 # Calculate the trim box based on the first and last occurrences
-                min_y, min_x, _ = np.min(nonzero_coords, axis=0)
-                max_y, max_x, _ = np.max(nonzero_coords, axis=0)
+                min_y, min_x = np.min(nonzero_coords, axis=0)[:2]
+                max_y, max_x = np.max(nonzero_coords, axis=0)[:2]
                 del nonzero_coords
                 _LOGGER.debug(
                     "{}: Found trims max and min values (y,x) ({}, {}) ({},{})...".format(
@@ -166,45 +190,41 @@ class MapImageHandler(object):
             return None
         return rotated
 
-    async def async_extract_room_properties(self, json_data):
-        """Extract room properties from the JSON data."""
+    async def async_extract_room_properties(self, model: MapModel):
+        """Extract room properties from the map."""
 
         room_properties = {}
         self.rooms_pos = []
-        pixel_size = json_data.get("pixelSize", [])
+        pixel_size = model.pixel_size
 
-        for layer in json_data.get("layers", []):
-            if layer["__class"] == "MapLayer":
-                meta_data = layer.get("metaData", {})
-                segment_id = meta_data.get("segmentId")
-                if segment_id is not None:
-                    name = meta_data.get("name")
-                    compressed_pixels = layer.get("compressedPixels", [])
-                    pixels = self.data.sublist(compressed_pixels, 3)
-                    # Calculate x and y min/max from compressed pixels
-                    x_min, y_min, x_max, y_max = await self.data.get_rooms_coordinates(
-                        pixels, pixel_size
-                    )
-                    corners = [
-                        (x_min, y_min),
-                        (x_max, y_min),
-                        (x_max, y_max),
-                        (x_min, y_max),
-                    ]
-                    room_id = str(segment_id)
-                    self.rooms_pos.append(
-                        {
-                            "name": name,
-                            "corners": corners,
-                        }
-                    )
-                    room_properties[room_id] = {
-                        "number": segment_id,
-                        "outline": corners,
-                        "name": name,
-                        "x": ((x_min + x_max) // 2),
-                        "y": ((y_min + y_max) // 2),
-                    }
+        for layer in model.layers:
+            if layer.segment_id is None:
+                continue
+            pixels = self.data.sublist(layer.runs, 3)
+            # Calculate x and y min/max from compressed pixels
+            x_min, y_min, x_max, y_max = await self.data.get_rooms_coordinates(
+                pixels, pixel_size
+            )
+            corners = [
+                (x_min, y_min),
+                (x_max, y_min),
+                (x_max, y_max),
+                (x_min, y_max),
+            ]
+            room_id = str(layer.segment_id)
+            self.rooms_pos.append(
+                {
+                    "name": layer.name,
+                    "corners": corners,
+                }
+            )
+            room_properties[room_id] = {
+                "number": layer.segment_id,
+                "outline": corners,
+                "name": layer.name,
+                "x": ((x_min + x_max) // 2),
+                "y": ((y_min + y_max) // 2),
+            }
         if room_properties != {}:
             _LOGGER.debug(f"{self.file_name}: Rooms data extracted!")
         else:
@@ -232,37 +252,64 @@ class MapImageHandler(object):
         color_move: Color = self.shared.user_colors[4]
         color_background: Color = self.shared.user_colors[3]
         color_zone_clean: Color = self.shared.user_colors[1]
+        color_path_grey: Color = color_grey
+        color_robot_outline: Color | None = None
+        if self.palette:
+            # In palette mode the colours are the palette indexes.
+            color_wall = PAL_WALL
+            color_no_go = PAL_NO_GO
+            color_go_to = PAL_GO_TO
+            color_robot = PAL_ROBOT
+            color_charger = PAL_CHARGER
+            color_move = PAL_MOVE
+            color_background = PAL_BACKGROUND
+            color_zone_clean = PAL_ZONE_CLEAN
+            color_path_grey = PAL_GREY
+            color_robot_outline = PAL_ROBOT_OUTLINE
         try:
             if m_json is not None:
-                # buffer json data
-                self.json_data = m_json
-                # Get the image size from the JSON data
-                size_x = int(m_json["size"]["x"])
-                size_y = int(m_json["size"]["y"])
+                # Only the compact model of the map is kept, not the json.
+                model = MapModel.from_hypfer(m_json)
+                self.map_model = model
+                size_x = model.size_x
+                size_y = model.size_y
                 self.img_size = {
                     "x": size_x,
                     "y": size_y,
                     "centre": [(size_x // 2), (size_y // 2)],
                 }
                 # Get the JSON ID from the JSON data.
-                self.json_id = await self.imd.async_get_json_id(m_json)
+                self.json_id = await self.imd.async_get_json_id(model)
                 # Check entity data.
-                entity_dict = await self.imd.async_get_entity_data(m_json)
+                entity_dict = await self.imd.async_get_entity_data(model)
                 # Update the Robot position.
                 robot_pos, robot_position, robot_position_angle = (
                     await self.imd.async_get_robot_position(entity_dict)
                 )
 
-                # Get the pixels size and layers from the JSON data
-                pixel_size = int(m_json["pixelSize"])
-                layers, active = self.data.find_layers(m_json["layers"])
+                # Get the pixels size and layers from the map
+                pixel_size = model.pixel_size
+                layers, active = model.find_layers()
                 new_frame_hash = await self.imd.calculate_array_hash(layers, active)
+                timings = self.shared.timings
+                if self.frame_number == 0 and self.warm_state is not None:
+                    # Warm start, reuse the saved base layer of the same map.
+                    if WarmStart.restore(self, self.warm_state, layers, active):
+                        _LOGGER.info(f"{self.file_name}: Base layer restored.")
+                        self.frame_number = 1
+                    self.warm_state = None
                 if self.frame_number == 0:
+                    started = timings.start()
                     self.img_hash = new_frame_hash
                     # empty image
-                    img_np_array = await self.draw.create_empty_image(
-                        size_x, size_y, color_background
-                    )
+                    if self.palette:
+                        img_np_array = self.palette.create_label_canvas(
+                            size_x, size_y, color_background
+                        )
+                    else:
+                        img_np_array = await self.draw.create_empty_image(
+                            size_x, size_y, color_background
+                        )
                     # overlapping layers
                     for layer_type, compressed_pixels_list in layers.items():
                         room_id, img_np_array = await self.imd.async_draw_base_layer(
@@ -275,7 +322,7 @@ class MapImageHandler(object):
                         )
                     # Draw the virtual walls if any.
                     img_np_array = await self.imd.async_draw_virtual_walls(
-                        m_json, img_np_array, color_no_go
+                        model, img_np_array, color_no_go
                     )
                     # Draw charger.
                     img_np_array = await self.imd.async_draw_charger(
@@ -288,7 +335,7 @@ class MapImageHandler(object):
                     # Robot and rooms position
                     if (room_id > 0) and not self.room_propriety:
                         self.room_propriety = await self.async_extract_room_properties(
-                            self.json_data
+                            model
                         )
                         if self.rooms_pos and robot_position and robot_position_angle:
                             self.robot_pos = await self.imd.async_get_robot_in_room(
@@ -298,7 +345,16 @@ class MapImageHandler(object):
                             )
                     _LOGGER.info(f"{self.file_name}: Completed base Layers")
                     # Copy the new array in base layer.
-                    self.img_base_layer = await self.imd.async_copy_array(img_np_array)
+                    if self.shared.layer_store:
+                        self.img_base_layer = self.shared.layer_store.store(
+                            "hypfer_base_layer", img_np_array
+                        )
+                    else:
+                        self.img_base_layer = await self.imd.async_copy_array(
+                            img_np_array
+                        )
+                    timings.stop("base_layer", started)
+                    self.base_layer_builds += 1
                 self.shared.frame_number = self.frame_number
                 self.frame_number += 1
                 if (self.frame_number > 1024) or (new_frame_hash != self.img_hash):
@@ -307,11 +363,12 @@ class MapImageHandler(object):
                     f"{self.file_name}: {self.json_id} at Frame Number: {self.frame_number}"
                 )
                 # Copy the base layer to the new image.
+                started = timings.start()
                 img_np_array = await self.imd.async_copy_array(self.img_base_layer)
                 # All below will be drawn at each frame.
                 # Draw zones if any.
                 img_np_array = await self.imd.async_draw_zones(
-                    m_json, img_np_array, color_zone_clean, color_no_go
+                    model, img_np_array, color_zone_clean, color_no_go
                 )
                 # Draw the go_to target flag.
                 img_np_array = await self.imd.draw_go_to_flag(
@@ -319,7 +376,7 @@ class MapImageHandler(object):
                 )
                 # Draw path prediction and paths.
                 img_np_array = await self.imd.async_draw_paths(
-                    img_np_array, m_json, color_move, color_grey
+                    img_np_array, model, color_move, color_path_grey
                 )
                 # Check if the robot is docked.
                 if self.shared.vacuum_state == "docked":
@@ -334,8 +391,11 @@ class MapImageHandler(object):
                         angle=robot_position_angle,
                         fill=color_robot,
                         log=self.file_name,
+                        outline=color_robot_outline,
                     )
+                timings.stop("overlays", started)
                 # Resize the image
+                started = timings.start()
                 img_np_array = await self.async_auto_trim_and_zoom_image(
                     img_np_array,
                     color_background,
@@ -343,10 +403,16 @@ class MapImageHandler(object):
                     int(self.shared.image_rotate),
                     self.zooming,
                 )
+                timings.stop("trim_rotate", started)
             # If the image is None return None and log the error.
             if img_np_array is None:
                 _LOGGER.warning(f"{self.file_name}: Image array is None.")
                 return None
+            elif self.palette:
+                # Tint the active rooms and get the "P" mode image.
+                self.palette.set_active_rooms(self.active_zones)
+                pil_img = self.palette.to_pil(img_np_array)
+                del img_np_array
             else:
                 # Convert the numpy array to a PIL image
                 pil_img = Image.fromarray(img_np_array, mode="RGBA")
@@ -373,7 +439,7 @@ class MapImageHandler(object):
                     else:
                         new_width = pil_img.width
                         new_height = int(pil_img.width / new_aspect_ratio)
-                    resized = ImageOps.pad(pil_img, (new_width, new_height))
+                    resized = pad_image(pil_img, (new_width, new_height))
                     self.crop_img_size[0], self.crop_img_size[1] = (
                         await self.async_map_coordinates_offset(
                             wsf, hsf, new_width, new_height
@@ -386,7 +452,7 @@ class MapImageHandler(object):
                     return resized
                 else:
                     _LOGGER.debug(f"{self.file_name}: Frame Completed.")
-                    return ImageOps.pad(pil_img, (width, height))
+                    return pad_image(pil_img, (width, height))
             else:
                 _LOGGER.debug(f"{self.file_name}: Frame Completed.")
                 return pil_img
@@ -422,10 +488,10 @@ class MapImageHandler(object):
         :return: The rooms attribute's."""
         if self.room_propriety:
             return self.room_propriety
-        if self.json_data:
+        if self.map_model is not None:
             _LOGGER.debug(f"\nChecking {self.file_name} Rooms data..")
             self.room_propriety = await self.async_extract_room_properties(
-                self.json_data
+                self.map_model
             )
             if self.room_propriety:
                 _LOGGER.debug(f"\nGot {self.file_name} Rooms Attributes.")
@@ -0,0 +1,140 @@
+"""
+Hypfer Map Stream Decoder.
+Low memory decoder of the Valetudo (Hypfer) map payloads.
+The payload is decompressed in chunks (zlib.decompressobj) and tokenized on
+the fly: the "compressedPixels" arrays, most of the map, are converted chunk
+by chunk in numpy int32 arrays, the rest of the map (metadata and entities)
+is small and it is decoded as usual to dicts and lists.
+The decompressed JSON and the list of Python ints of the pixels are never
+in memory at the same time.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+import logging
+import warnings
+import zlib
+
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.utils.json_backend import json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+PIXELS_KEY = b'"compressedPixels"'
+CHUNK_SIZE = 64 * 1024  # Max decompressed bytes of each chunk.
+NUMBER_BYTES = b"0123456789-, \t\r\n"  # Bytes of the pixels arrays.
+
+
+class MapStreamDecoder:
+    """Decode the Hypfer map payload, the layer pixels as numpy int32 arrays."""
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        self._chunk_size = chunk_size
+        self._meta = bytearray()  # Map JSON without the pixels arrays.
+        self._scan = 0  # Position of the next PIXELS_KEY search in _meta.
+        self._arrays: list[np.ndarray] = []  # Pixels arrays completed.
+        self._parts: list[np.ndarray] | None = None  # Pixels array in progress.
+        self._pending = b""  # Last number of the chunk (it could be split).
+
+    def decode(self, payload: bytes) -> dict:
+        """
+        Decode the map.
+        @param payload: zlib compressed map JSON.
+        @return: the map, "compressedPixels" of the layers as np.int32 arrays.
+        """
+        self._reset()
+        decompressor = zlib.decompressobj()
+        data = payload
+        while data:
+            self._feed(decompressor.decompress(data, self._chunk_size))
+            data = decompressor.unconsumed_tail
+        self._feed(decompressor.flush())
+        if self._parts is not None:
+            raise ValueError("Truncated map payload, compressedPixels not closed.")
+        result = json_loads(bytes(self._meta))
+        for layer in result.get("layers", []):
+            index = layer.get("compressedPixels")
+            if isinstance(index, int):
+                layer["compressedPixels"] = self._arrays[index]
+        self._reset()
+        return result
+
+    def _reset(self) -> None:
+        """Clear the decoder state."""
+        self._meta = bytearray()
+        self._scan = 0
+        self._arrays = []
+        self._parts = None
+        self._pending = b""
+
+    def _feed(self, chunk: bytes) -> None:
+        """Tokenize the decompressed chunk."""
+        while chunk:
+            if self._parts is None:
+                chunk = self._feed_meta(chunk)
+            else:
+                chunk = self._feed_pixels(chunk)
+
+    def _feed_meta(self, chunk: bytes) -> bytes:
+        """
+        Copy the chunk in the metadata up to the start of a pixels array.
+        @return: the rest of the chunk (the pixels) or b"".
+        """
+        meta = self._meta
+        meta += chunk
+        key = meta.find(PIXELS_KEY, self._scan)
+        if key < 0:
+            # The key could be split between this chunk and the next one.
+            self._scan = max(0, len(meta) - len(PIXELS_KEY) + 1)
+            return b""
+        start = meta.find(b"[", key + len(PIXELS_KEY))
+        if start < 0:
+            self._scan = key
+            return b""
+        # The array is replaced by its index in the metadata.
+        rest = bytes(meta[start + 1 :])
+        del meta[start:]
+        meta += str(len(self._arrays)).encode()
+        self._scan = len(meta)
+        self._parts = []
+        return rest
+
+    def _feed_pixels(self, chunk: bytes) -> bytes:
+        """
+        Convert the numbers of the chunk up to the end of the pixels array.
+        @return: the rest of the chunk (the metadata) or b"".
+        """
+        end = chunk.find(b"]")
+        if end < 0:
+            split = chunk.rfind(b",")
+            if split < 0:
+                self._pending += chunk
+                return b""
+            self._add_numbers(self._pending + chunk[:split])
+            self._pending = chunk[split + 1 :]
+            return b""
+        self._add_numbers(self._pending + chunk[:end])
+        self._pending = b""
+        parts, self._parts = self._parts, None
+        self._arrays.append(
+            np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+        )
+        return chunk[end + 1 :]
+
+    def _add_numbers(self, numbers: bytes) -> None:
+        """
+        Convert the comma separated numbers in a np.int32 array.
+        @raise ValueError: a number is not valid (fromstring would stop at it
+        or read it as 0, the pixels would be lost silently).
+        """
+        if numbers.strip():
+            if numbers.translate(None, NUMBER_BYTES):
+                raise ValueError("Invalid map payload, compressedPixels not numbers.")
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                array = np.fromstring(numbers, dtype=np.int32, sep=",")
+            if len(array) != numbers.count(b",") + 1:
+                raise ValueError("Invalid map payload, compressedPixels not numbers.")
+            self._parts.append(array)
@@ -0,0 +1,94 @@
+"""
+Rand256 Destinations Class.
+Index of the destinations published by Valetudo RE (rooms, zones and spots).
+The payload is parsed once when it changes (the hash of the payload is kept
+to detect the changes), the connector and the image handler use the index.
+Version: v2024.06.3
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+
+from custom_components.valetudo_vacuum_camera.utils.json_backend import json_loads
+
+
+@dataclass(slots=True, frozen=True)
+class DestinationRoom:
+    """Room (segment) of the vacuum."""
+
+    id: int
+    name: str | None
+
+
+@dataclass(slots=True, frozen=True)
+class DestinationZone:
+    """Predefined zone, rectangles x1, y1, x2, y2 (the first without repeats)."""
+
+    name: str | None
+    coordinates: list
+
+
+@dataclass(slots=True, frozen=True)
+class DestinationSpot:
+    """Predefined point x, y."""
+
+    name: str | None
+    coordinates: list
+
+
+@dataclass(slots=True)
+class Destinations:
+    """Rooms, zones and spots of a destinations payload."""
+
+    payload_hash: str
+    rooms: dict[int, DestinationRoom] = field(default_factory=dict)
+    zones: list[DestinationZone] = field(default_factory=list)
+    spots: list[DestinationSpot] = field(default_factory=list)
+    room_index: dict[int, int] = field(default_factory=dict)  # id: list position
+
+    @staticmethod
+    def payload_digest(payload: bytes | str) -> str:
+        """Return the hash of the payload, used to detect the changes."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    @classmethod
+    def from_payload(cls, payload: bytes | str) -> Destinations:
+        """
+        Parse the destinations payload.
+        @raise ValueError: the payload is not a valid json.
+        """
+        dest_json = dict(json_loads(payload))
+        destinations = cls(payload_hash=cls.payload_digest(payload))
+        for position, room in enumerate(dest_json.get("rooms", [])):
+            destinations.rooms[room["id"]] = DestinationRoom(
+                room["id"], room.get("name")
+            )
+            destinations.room_index[room["id"]] = position
+        for zone in dest_json.get("zones", []):
+            coordinates = zone.get("coordinates")
+            if coordinates:
+                coordinates = [list(rect) for rect in coordinates]
+                coordinates[0].pop()  # Repeats of the cleaning.
+                destinations.zones.append(
+                    DestinationZone(zone.get("name"), coordinates)
+                )
+        for spot in dest_json.get("spots", []):
+            coordinates = spot.get("coordinates")
+            if coordinates:
+                destinations.spots.append(
+                    DestinationSpot(spot.get("name"), list(coordinates))
+                )
+        return destinations
+
+    def active_segments(self, segment_ids: list) -> list[int]:
+        """Return the rooms flags (1 active, 0 not) of the cleaned segments."""
+        active = [0] * len(self.room_index)
+        for segment_id in segment_ids:
+            position = self.room_index.get(segment_id)
+            if position is not None:
+                active[position] = 1
+        return active
@@ -7,11 +7,10 @@ Version: v2024.04.3
 
 from __future__ import annotations
 
-import json
 import logging
 import uuid
 
-from PIL import Image, ImageOps
+from PIL import Image
 import numpy as np
 
 from custom_components.valetudo_vacuum_camera.types import (
@@ -25,6 +24,25 @@ from custom_components.valetudo_vacuum_camera.types import (
 from custom_components.valetudo_vacuum_camera.utils.colors_man import color_grey
 from custom_components.valetudo_vacuum_camera.utils.drawable import Drawable
 from custom_components.valetudo_vacuum_camera.utils.img_data import ImageData
+from custom_components.valetudo_vacuum_camera.utils.map_model import MapModel
+from custom_components.valetudo_vacuum_camera.utils.palette import (
+    PAL_BACKGROUND,
+    PAL_CHARGER,
+    PAL_GO_TO,
+    PAL_GO_TO_POLE,
+    PAL_GREY,
+    PAL_MOVE,
+    PAL_NO_GO,
+    PAL_ROBOT,
+    PAL_ROBOT_OUTLINE,
+    PAL_WALL,
+    PAL_ZONE_CLEAN,
+    ColorPalette,
+    pad_image,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.destinations import (
+    Destinations,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,17 +62,22 @@ class ReImageHandler(object):
         self.data = ImageData  # Image Data
         self.draw = Drawable  # Drawable
         self.frame_number = 0  # Image Frame number
+        self.base_layer_builds = 0  # Base layer (re)builds count
         self.go_to = None  # Go to position data
         self.img_base_layer = None  # Base image layer
         self.img_rotate = 0  # Image rotation
         self.img_size = None  # Image size
-        self.json_data = None  # Json data
+        self.map_model = None  # Map of the last frame (MapModel)
         self.json_id = None  # Json id
         self.path_pixels = None  # Path pixels data
         self.robot_in_room = None  # Robot in room data
         self.robot_pos = None  # Robot position
         self.room_propriety = None  # Room propriety data
         self.rooms_pos = None  # Rooms position data
+        self.rooms_version = 0  # Incremented when the rooms attributes change
+        self._room_entries = {}  # segment id: (bounds, room properties, position)
+        self._rooms_model = None  # Map model of the rooms attributes
+        self._destinations_hash = None  # Destinations of the rooms attributes
         self.shared = camera_shared  # Shared data
         self.active_zones = None  # Active zones
         self.trim_down = None  # Trim down
@@ -69,6 +92,9 @@ class ReImageHandler(object):
         self.offset_bottom = self.shared.offset_down  # offset bottom
         self.offset_left = self.shared.offset_left  # offset left
         self.offset_right = self.shared.offset_right  # offset right
+        self.palette = (
+            ColorPalette(self.shared) if self.shared.palette_mode else None
+        )  # palette of the label canvas (palette mode only).
 
     async def auto_crop_and_trim_array(
         self,
@@ -85,13 +111,16 @@ class ReImageHandler(object):
                 f"Image original size: {image_array.shape[1]}, {image_array.shape[0]}"
             )
             # Find the coordinates of the first occurrence of a non-background color
-            nonzero_coords = np.column_stack(
-                np.where(image_array != list(detect_colour))
-            )
+            if isinstance(detect_colour, int):
+                # palette mode, the label canvas has only two dimensions.
+                background = detect_colour
+            else:
+                background = list(detect_colour)
+            nonzero_coords = np.column_stack(np.where(image_array != background))
             # Calculate the crop box based on the first and last occurrences
-            min_y, min_x, dummy = np.min(nonzero_coords, axis=0)
-            max_y, max_x, dummy = np.max(nonzero_coords, axis=0)
-            del dummy, nonzero_coords
+            min_y, min_x = np.min(nonzero_coords, axis=0)[:2]
+            max_y, max_x = np.max(nonzero_coords, axis=0)[:2]
+            del nonzero_coords
             _LOGGER.debug(
                 "Found crop max and min values (y,x) ({}, {}) ({},{})...".format(
                     int(max_y), int(max_x), int(min_y), int(min_x)
@@ -181,34 +210,40 @@ class ReImageHandler(object):
         return rotated
 
     def extract_room_properties(
-        self, json_data: JsonType, destinations: JsonType
+        self, model: MapModel, destinations: Destinations
     ) -> RoomsProperties:
-        """Extract the room properties."""
-        unsorted_id = ImageData.get_rrm_segments_ids(json_data)
-        size_x, size_y = ImageData.get_rrm_image_size(json_data)
-        top, left = ImageData.get_rrm_image_position(json_data)
-        dummy_segments, outlines = ImageData.get_rrm_segments(
-            json_data, size_x, size_y, top, left, True
-        )
-        del dummy_segments  # free memory
-        dest_json = json.loads(destinations)
-        room_data = dict(dest_json).get("rooms", [])
-        zones_data = dict(dest_json).get("zones", [])
-        points_data = dict(dest_json).get("spots", [])
-        room_id_to_data = {room["id"]: room for room in room_data}
-        self.rooms_pos = []
-        room_properties = {}
-        zone_properties = {}
-        point_properties = {}
-        for id_x, room_id in enumerate(unsorted_id):
-            if room_id in room_id_to_data:
-                room_info = room_id_to_data[room_id]
-                name = room_info.get("name")
+        """
+        Extract the room properties.
+        The rooms are refreshed incrementally: only the rooms with a new outline
+        (or all of them if the destinations changed) are computed again.
+        """
+        changed = self.room_propriety is None
+        if self._destinations_hash != destinations.payload_hash:
+            self._room_entries = {}
+            changed = True
+        self._rooms_model = model
+        self._destinations_hash = destinations.payload_hash
+        entries = {}
+        scale = model.pixel_size * 10  # pixels to mm.
+        for segment in model.get_segments():
+            room_id = segment.segment_id
+            room_info = destinations.rooms.get(room_id)
+            if room_info is None or not len(segment.runs):
+                continue
+            # Outline of the segment in mm, the max corner first.
+            outline = (
+                tuple((segment.runs[:, :2].max(axis=0) * scale).tolist()),
+                tuple((segment.runs[:, :2].min(axis=0) * scale).tolist()),
+            )
+            entry = self._room_entries.get(room_id)
+            if entry is None or entry[0] != outline:
+                changed = True
+                name = room_info.name
                 # Calculate x and y min/max from outlines
-                x_min = outlines[id_x][0][0]
-                x_max = outlines[id_x][1][0]
-                y_min = outlines[id_x][0][1]
-                y_max = outlines[id_x][1][1]
+                x_min = outline[0][0]
+                x_max = outline[1][0]
+                y_min = outline[0][1]
+                y_max = outline[1][1]
                 corners = [
                     (x_min, y_min),
                     (x_max, y_min),
@@ -218,47 +253,48 @@ class ReImageHandler(object):
                 # rand256 vacuums accept int(room_id) or str(name)
                 # the card will soon support int(room_id) but the camera will send name
                 # this avoids the manual change of the values in the card.
-                self.rooms_pos.append(
+                entry = (
+                    outline,
+                    {
+                        "number": int(room_id),
+                        "outline": corners,
+                        "name": name,
+                        "x": (x_min + x_max) // 2,
+                        "y": (y_min + y_max) // 2,
+                    },
                     {
                         "name": name,
                         "corners": corners,
-                    }
+                    },
                 )
-                room_properties[int(room_id)] = {
-                    "number": int(room_id),
-                    "outline": corners,
-                    "name": name,
-                    "x": (x_min + x_max) // 2,
-                    "y": (y_min + y_max) // 2,
-                }
-        id_count = 1
-        for zone in zones_data:
-            zone_name = zone.get("name")
-            coordinates = zone.get("coordinates")
-            if coordinates and len(coordinates) > 0:
-                coordinates[0].pop()
-                x1, y1, x2, y2 = coordinates[0]
-                zone_properties[zone_name] = {
-                    "zones": coordinates,
-                    "name": zone_name,
-                    "x": ((x1 + x2) // 2),
-                    "y": ((y1 + y2) // 2),
-                }
-                id_count += 1
-        id_count = 1
-        for point in points_data:
-            point_name = point.get("name")
-            coordinates = point.get("coordinates")
-            if coordinates and len(coordinates) > 0:
-                coordinates = point.get("coordinates")
-                x1, y1 = coordinates
-                point_properties[id_count] = {
-                    "position": coordinates,
-                    "name": point_name,
-                    "x": x1,
-                    "y": y1,
-                }
-                id_count += 1
+            entries[room_id] = entry
+        if not changed and entries.keys() == self._room_entries.keys():
+            return self.room_propriety
+        self._room_entries = entries
+        self.rooms_version += 1
+        self.robot_in_room = None  # The rooms changed, search again.
+        self.rooms_pos = [entry[2] for entry in entries.values()]
+        room_properties = {
+            int(room_id): entry[1] for room_id, entry in entries.items()
+        }
+        zone_properties = {}
+        point_properties = {}
+        for zone in destinations.zones:
+            x1, y1, x2, y2 = zone.coordinates[0]
+            zone_properties[zone.name] = {
+                "zones": zone.coordinates,
+                "name": zone.name,
+                "x": ((x1 + x2) // 2),
+                "y": ((y1 + y2) // 2),
+            }
+        for id_count, spot in enumerate(destinations.spots, start=1):
+            x1, y1 = spot.coordinates
+            point_properties[id_count] = {
+                "position": spot.coordinates,
+                "name": spot.name,
+                "x": x1,
+                "y": y1,
+            }
         if room_properties != {}:
             if zone_properties != {}:
                 _LOGGER.debug("Rooms and Zones, data extracted!")
@@ -274,7 +310,7 @@ class ReImageHandler(object):
     async def get_image_from_rrm(
         self,
         m_json: JsonType,  # json data
-        destinations: None = None,  # MQTT destinations for labels
+        destinations: Destinations | None = None,  # MQTT destinations for labels
     ) -> PilPNG or None:
         """Generate Images from the json data."""
         color_wall: Color = self.shared.user_colors[0]
@@ -285,16 +321,32 @@ class ReImageHandler(object):
         color_move: Color = self.shared.user_colors[4]
         color_background: Color = self.shared.user_colors[3]
         color_zone_clean: Color = self.shared.user_colors[1]
+        color_path_grey: Color = color_grey
+        color_pole: Color = (0, 0, 255, 255)
+        color_robot_outline: Color | None = None
+        if self.palette:
+            # In palette mode the colours are the palette indexes.
+            color_wall = PAL_WALL
+            color_no_go = PAL_NO_GO
+            color_go_to = PAL_GO_TO
+            color_robot = PAL_ROBOT
+            color_charger = PAL_CHARGER
+            color_move = PAL_MOVE
+            color_background = PAL_BACKGROUND
+            color_zone_clean = PAL_ZONE_CLEAN
+            color_path_grey = PAL_GREY
+            color_pole = PAL_GO_TO_POLE
+            color_robot_outline = PAL_ROBOT_OUTLINE
         self.active_zones = self.shared.rand256_active_zone
 
         try:
             if (m_json is not None) and (not isinstance(m_json, tuple)):
                 _LOGGER.info(self.file_name + ":Composing the image for the camera.")
-                # buffer json data
-                self.json_data = m_json
+                # Only the compact model of the map is kept, not the json.
+                model = MapModel.from_rand256(m_json)
+                self.map_model = model
                 if self.room_propriety:
                     _LOGGER.info(self.file_name + ": Supporting Rooms Cleaning!")
-                size_x, size_y = self.data.get_rrm_image_size(m_json)
                 ##########################
                 self.img_size = {
                     "x": 5120,
@@ -304,30 +356,24 @@ class ReImageHandler(object):
                 ###########################
                 self.json_id = str(uuid.uuid4())  # image id
                 _LOGGER.info("Vacuum Data ID: %s", self.json_id)
-                # grab data from the json data
-                pos_top, pos_left = self.data.get_rrm_image_position(m_json)
-                floor_data = self.data.get_rrm_floor(m_json)
-                walls_data = self.data.get_rrm_walls(m_json)
-                robot_pos = self.data.get_rrm_robot_position(m_json)
-                go_to = self.data.get_rrm_goto_target(m_json)
-                charger_pos = self.data.rrm_coordinates_to_valetudo(
-                    self.data.get_rrm_charger_position(m_json)
-                )
-                zone_clean = self.data.get_rrm_currently_cleaned_zones(m_json)
-                no_go_area = self.data.get_rrm_forbidden_zones(m_json)
-                virtual_walls = self.data.get_rrm_virtual_walls(m_json)
-                path_pixel = self.data.get_rrm_path(m_json)
-                path_pixel2 = self.data.sublist_join(
-                    self.data.rrm_valetudo_path_array(path_pixel["points"]), 2
+                # grab data from the map (already in the Valetudo coordinates)
+                robot_pos = model.get_entities("robot_position")
+                go_to = model.get_entities("go_to_target")
+                charger_pos = model.get_entities("charger_location")
+                zone_clean = model.get_entities("active_zone")
+                no_go_area = model.get_entities("no_go_area")
+                virtual_walls = model.get_entities("virtual_wall")
+                path_pixel = model.get_entities("path")
+                path_pixel2 = (
+                    self.data.sublist_join(path_pixel[0].points, 2)
+                    if path_pixel
+                    else None
                 )
                 robot_position = None
                 robot_position_angle = None
-                # convert the data to reuse the current drawing library
-                robot_pos = self.data.rrm_coordinates_to_valetudo(robot_pos)
                 if robot_pos:
-                    robot_position = robot_pos
-                    angle = self.data.get_rrm_robot_angle(m_json)
-                    robot_position_angle = round(angle[0], 0)
+                    robot_position = robot_pos[0].points[0].tolist()
+                    robot_position_angle = robot_pos[0].angle
                     _LOGGER.debug(
                         f"robot position: {robot_pos}, robot angle: {robot_position_angle}"
                     )
@@ -345,6 +391,7 @@ class ReImageHandler(object):
                         )
                 _LOGGER.debug("charger position: %s", charger_pos)
                 if charger_pos:
+                    charger_pos = charger_pos[0].points[0].tolist()
                     self.charger_pos = {
                         "x": (charger_pos[0] * 10),
                         "y": (charger_pos[1] * 10),
@@ -352,26 +399,29 @@ class ReImageHandler(object):
 
                 pixel_size = 5
                 room_id = 0
+                timings = self.shared.timings
                 if self.frame_number == 0:
+                    started = timings.start()
                     _LOGGER.info(self.file_name + ": Empty image with background color")
-                    img_np_array = await self.draw.create_empty_image(
-                        5120, 5120, color_background
-                    )
+                    if self.palette:
+                        img_np_array = self.palette.create_label_canvas(
+                            5120, 5120, color_background
+                        )
+                    else:
+                        img_np_array = await self.draw.create_empty_image(
+                            5120, 5120, color_background
+                        )
                     _LOGGER.info(self.file_name + ": Overlapping Layers")
+                    layers, _ = model.find_layers()
                     # this below are floor data
-                    pixels = self.data.from_rrm_to_compressed_pixels(
-                        floor_data,
-                        image_width=size_x,
-                        image_height=size_y,
-                        image_top=pos_top,
-                        image_left=pos_left,
-                    )
+                    pixels = layers["floor"][0].tolist()
                     # checking if there are segments too (sorted pixels in the raw data).
-                    segments = self.data.get_rrm_segments(
-                        m_json, size_x, size_y, pos_top, pos_left
-                    )
-                    if (segments and pixels) or pixels:
-                        room_color = self.shared.rooms_colors[room_id]
+                    segments = [runs.tolist() for runs in layers.get("segment", [])]
+                    if pixels:
+                        if self.palette:
+                            room_color = self.palette.floor_index(room_id)
+                        else:
+                            room_color = self.shared.rooms_colors[room_id]
                         # drawing floor
                         if pixels:
                             img_np_array = await self.draw.from_json_to_image(
@@ -382,10 +432,15 @@ class ReImageHandler(object):
                         rooms_list = [color_wall]
                         if segments:
                             for pixels in segments:
-                                room_color = self.shared.rooms_colors[room_id]
+                                if self.palette:
+                                    # the active rooms are tinted in the palette.
+                                    room_color = self.palette.room_index(room_id)
+                                else:
+                                    room_color = self.shared.rooms_colors[room_id]
                                 rooms_list.append(room_color)
                                 if (
-                                    self.active_zones
+                                    not self.palette
+                                    and self.active_zones
                                     and len(self.active_zones) > room_id
                                     and self.active_zones[room_id] == 1
                                 ):
@@ -408,19 +463,13 @@ class ReImageHandler(object):
 
                     _LOGGER.info(self.file_name + ": Completed floor Layers")
                     # Drawing walls.
-                    walls = self.data.from_rrm_to_compressed_pixels(
-                        walls_data,
-                        image_width=size_x,
-                        image_height=size_y,
-                        image_left=pos_left,
-                        image_top=pos_top,
-                    )
+                    walls = layers["wall"][0].tolist()
                     if walls:
                         img_np_array = await self.draw.from_json_to_image(
                             img_np_array, walls, pixel_size, color_wall
                         )
                         _LOGGER.info(self.file_name + ": Completed base Layers")
-                    if (room_id > 0) and not self.room_propriety:
+                    if room_id > 0:
                         self.room_propriety = await self.get_rooms_attributes(
                             destinations
                         )
@@ -430,9 +479,17 @@ class ReImageHandler(object):
                                 (robot_position[1] * 10),
                                 robot_position_angle,
                             )
-                    self.img_base_layer = await self.async_copy_array(img_np_array)
+                    if self.shared.layer_store:
+                        self.img_base_layer = self.shared.layer_store.store(
+                            "rand256_base_layer", img_np_array
+                        )
+                    else:
+                        self.img_base_layer = await self.async_copy_array(img_np_array)
+                    timings.stop("base_layer", started)
+                    self.base_layer_builds += 1
 
                 # If there is a zone clean we draw it now.
+                started = timings.start()
                 self.frame_number += 1
                 img_np_array = await self.async_copy_array(self.img_base_layer)
                 _LOGGER.debug(self.file_name + ": Frame number %s", self.frame_number)
@@ -468,14 +525,18 @@ class ReImageHandler(object):
                 if go_to:
                     img_np_array = await self.draw.go_to_flag(
                         img_np_array,
-                        (go_to[0], go_to[1]),
+                        tuple(go_to[0].points[0].tolist()),
                         self.img_rotate,
                         color_go_to,
+                        color_pole,
                     )
-                    predicted_path = self.data.get_rrm_goto_predicted_path(m_json)
+                    predicted_path = model.get_entities("predicted_path")
                     if predicted_path:
+                        predicted_path = self.data.sublist_join(
+                            predicted_path[0].points, 2
+                        )
                         img_np_array = await self.draw.lines(
-                            img_np_array, predicted_path, 3, color_grey
+                            img_np_array, predicted_path, 3, color_path_grey
                         )
                 # draw the robot
                 if robot_position and robot_position_angle:
@@ -486,18 +547,27 @@ class ReImageHandler(object):
                         robot_position_angle,
                         color_robot,
                         self.file_name,
+                        color_robot_outline,
                     )
+                timings.stop("overlays", started)
                 _LOGGER.debug(
                     f"{self.file_name}:"
                     f" Auto cropping the image with rotation {int(self.shared.image_rotate)}"
                 )
+                started = timings.start()
                 img_np_array = await self.auto_crop_and_trim_array(
                     img_np_array,
                     color_background,
                     int(self.shared.margins),
                     int(self.shared.image_rotate),
                 )
-                pil_img = Image.fromarray(img_np_array, mode="RGBA")
+                timings.stop("trim_rotate", started)
+                if self.palette:
+                    # Tint the active rooms and get the "P" mode image.
+                    self.palette.set_active_rooms(self.active_zones)
+                    pil_img = self.palette.to_pil(img_np_array)
+                else:
+                    pil_img = Image.fromarray(img_np_array, mode="RGBA")
                 del img_np_array  # unload memory
                 # reduce the image size if the zoomed image is bigger then the original.
                 if (
@@ -524,7 +594,7 @@ class ReImageHandler(object):
                         else:
                             new_width = pil_img.width
                             new_height = int(pil_img.width / new_aspect_ratio)
-                        resized = ImageOps.pad(pil_img, (new_width, new_height))
+                        resized = pad_image(pil_img, (new_width, new_height))
                         self.crop_img_size[0], self.crop_img_size[1] = (
                             await self.async_map_coordinates_offset(
                                 wsf, hsf, new_width, new_height
@@ -535,7 +605,7 @@ class ReImageHandler(object):
                         )
                         return resized
                     else:
-                        return ImageOps.pad(pil_img, (width, height))
+                        return pad_image(pil_img, (width, height))
                 return pil_img
 
         except Exception as e:
@@ -566,15 +636,18 @@ class ReImageHandler(object):
         return self.json_id
 
     async def get_rooms_attributes(
-        self, destinations: JsonType = None
+        self, destinations: Destinations | None = None
     ) -> RoomsProperties:
-        """Return the rooms attributes."""
-        if self.room_propriety:
+        """Return the rooms attributes of the current map and destinations."""
+        if self.map_model is None or not destinations:
             return self.room_propriety
-        if self.json_data and destinations:
+        if (
+            self._rooms_model is not self.map_model
+            or self._destinations_hash != destinations.payload_hash
+        ):
             _LOGGER.debug("Checking for rooms data..")
             self.room_propriety = self.extract_room_properties(
-                self.json_data, destinations
+                self.map_model, destinations
             )
             if self.room_propriety:
                 _LOGGER.debug("Got Rooms Attributes.")
@@ -647,7 +720,7 @@ class ReImageHandler(object):
                 "x": robot_x,
                 "y": robot_y,
                 "angle": angle,
-                "in_room": self.robot_in_room["room"],
+                "in_room": last_room["room"] if last_room else None,
             }
             return temp
 
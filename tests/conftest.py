@@ -1,11 +1,32 @@
 """pytest fixtures."""
 
+import asyncio
+import gzip
+import json
+import os
+
+from PIL import Image
 import pytest
 
 from homeassistant.setup import async_setup_component
 
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+
 # from homeassistant.components import mqtt
-from custom_components.valetudo_vacuum_camera.const import DOMAIN
+from custom_components.valetudo_vacuum_camera.const import DEFAULT_VALUES, DOMAIN
+from custom_components.valetudo_vacuum_camera.utils.colors_man import (
+    ColorsManagment,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler import (
+    MapImageHandler,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.rrparser import (
+    RRMapParser,
+)
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+HYPFER_SAMPLE = os.path.join(TESTS_DIR, "mqtt_data.raw")  # PNG, map in zTXt.
+RAND256_SAMPLE = os.path.join(TESTS_DIR, "rand256_data.raw")  # gzip RRM map.
 
 
 async def test_async_setup(hass):
@@ -17,3 +38,49 @@ async def test_async_setup(hass):
 def auto_enable_custom_integrations(enable_custom_integrations):
     """Enable custom integrations defined in the test dir."""
     yield
+
+
+def _make_shared(**options) -> CameraShared:
+    """Return the CameraShared with the default options (and colours)."""
+    device_info = dict(DEFAULT_VALUES)
+    device_info.update(options)
+    shared = CameraShared()
+    shared.file_name = "test"
+    for key, value in device_info.items():
+        if hasattr(shared, key):
+            setattr(shared, key, value)
+    ColorsManagment(shared).set_initial_colours(device_info)
+    return shared
+
+
+@pytest.fixture(scope="session")
+def make_shared():
+    """Factory of the CameraShared with the default options."""
+    return _make_shared
+
+
+@pytest.fixture(scope="session")
+def hypfer_map() -> dict:
+    """Hypfer map json of the sample (copy it before changing it)."""
+    with Image.open(HYPFER_SAMPLE) as img:
+        return json.loads(img.text["ValetudoMap"])
+
+
+@pytest.fixture(scope="session")
+def rand256_payload() -> bytes:
+    """Rand256 map payload (gzip) of a simulated vacuum, three rooms."""
+    with open(RAND256_SAMPLE, "rb") as file:
+        return file.read()
+
+
+@pytest.fixture
+def rand256_map(rand256_payload) -> dict:
+    """Rand256 map parsed (with the pixels)."""
+    return RRMapParser().parse_data(gzip.decompress(rand256_payload), pixels=True)
+
+
+@pytest.fixture(scope="session")
+def hypfer_frame(hypfer_map) -> Image.Image:
+    """Frame of the sample Hypfer map, default options."""
+    handler = MapImageHandler(_make_shared())
+    return asyncio.run(handler.async_get_image_from_json(m_json=hypfer_map))
@@ -1,7 +1,12 @@
+import io
 import socket
+
+from PIL import Image
+import numpy as np
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from custom_components.valetudo_vacuum_camera.camera import ValetudoCamera
+from custom_components.valetudo_vacuum_camera.const import DEFAULT_VALUES
 from homeassistant.components.camera import Camera
 
 
@@ -60,3 +65,114 @@ async def test_update_success(
 
     # Assert that the MQTT topic is as expected
     assert mqtt_topic == "valetudo/my_vacuum/MapData/map-data-hass"
+
+
+def _make_camera(hass) -> ValetudoCamera:
+    """Camera of the vacuum valetudo/test (not added to Home Assistant)."""
+    device_info = {**DEFAULT_VALUES, "vacuum_map": "valetudo/test"}
+    camera = ValetudoCamera(hass, {**device_info, "show_vac_status": True})
+    camera._shared.user_language = "en"
+    return camera
+
+
+async def test_status_text_refresh(hass):
+    """A battery refresh draws the status text once, as a fresh render does."""
+    frame = Image.new("RGBA", (600, 400), (40, 40, 40, 255))
+    camera = _make_camera(hass)
+    camera._mqtt.state.update(connection="ready", status="docked", battery=85)
+    camera._set_frame(frame)
+    await camera.async_camera_image()
+    for battery in (86, 87):
+        camera._mqtt.state.update(battery=battery)
+        assert camera._refresh_status_text()
+        refreshed = await camera.async_camera_image()
+    fresh_camera = _make_camera(hass)
+    fresh_camera._mqtt.state.update(connection="ready", status="docked", battery=87)
+    fresh_camera._set_frame(frame.copy())
+    fresh = await fresh_camera.async_camera_image()
+    assert np.array_equal(
+        np.asarray(Image.open(io.BytesIO(refreshed))),
+        np.asarray(Image.open(io.BytesIO(fresh))),
+    )
+    # The rendered frame is kept without the status text.
+    assert np.asarray(frame).max() == 255 and np.asarray(frame)[:, :, 0].max() == 40
+
+
+async def test_battery_charged_without_viewer(hass):
+    """The charge state is updated with the vacuum state, not when drawing."""
+    camera = _make_camera(hass)
+    camera._mqtt.state.update(connection="ready", status="docked", battery=85)
+    assert camera._shared.vacuum_bat_charged is False
+    camera._mqtt.state.update(battery=100)
+    assert camera._shared.vacuum_bat_charged is True
+
+
+async def test_same_fingerprint_skips_render(hass):
+    """Same map payload and inputs of the last frame: nothing is rendered."""
+    camera = _make_camera(hass)
+    camera._mqtt.state.update(connection="ready", status="cleaning", battery=50)
+    camera._mqtt._img_payload = b"map payload"
+    camera._mqtt._data_in = True
+    camera._last_fingerprint = camera._render_fingerprint()
+    camera._mqtt.update_data = AsyncMock(return_value=None)
+    with patch(
+        "custom_components.valetudo_vacuum_camera.camera.is_auth_updated",
+        return_value=False,
+    ):
+        await camera.async_update()
+        assert camera._frames_skipped == 1
+        assert not await camera._mqtt.is_data_available()  # Discarded.
+        camera._mqtt.update_data.assert_not_awaited()
+        camera._shared.image_rotate = 90  # An input of the frame changed.
+        camera._mqtt._data_in = True
+        await camera.async_update()
+    assert camera._frames_skipped == 1
+    camera._mqtt.update_data.assert_awaited_once()
+
+
+async def test_idle_and_resume(hass):
+    """Docked with the snapshot taken and no data: idle until the vacuum moves."""
+    camera = _make_camera(hass)
+    camera.async_schedule_update_ha_state = MagicMock()
+    camera._mqtt.state.update(connection="ready", status="docked", battery=100)
+    camera._set_frame(Image.new("RGBA", (60, 40)))
+    camera._should_poll = True
+    camera._shared.snapshot_take = True
+    assert await camera._async_check_idle()
+    assert camera.should_poll is False
+    camera._mqtt.state.update(status="cleaning")
+    camera._mqtt._notify_activity()
+    assert not await camera._async_check_idle()
+    assert camera.should_poll is True
+    camera.async_schedule_update_ha_state.assert_called_once_with(True)
+
+
+async def test_new_frame_while_encoding(hass):
+    """A frame set while the previous one is encoded gets its own version."""
+    camera = _make_camera(hass)
+    camera._mqtt.state.update(connection="ready", status="docked", battery=85)
+    camera._set_frame(Image.new("RGBA", (60, 40), (40, 40, 40, 255)))
+    draw_text = camera.processor.run_async_draw_image_text
+
+    async def draw_text_and_set_frame(pil_img, color):
+        camera._set_frame(Image.new("RGBA", (60, 40), (0, 0, 90, 255)))
+        return await draw_text(pil_img, color)
+
+    camera.processor.run_async_draw_image_text = draw_text_and_set_frame
+    first = await camera.async_camera_image()
+    assert camera._frame_version == 2
+    assert camera._text_frame[0] == 1
+    assert camera._encoder.get_cached(1, None, None) == first
+    assert camera._encoder.get_cached(2, None, None) is None
+    second = await camera.async_camera_image()
+    assert np.asarray(Image.open(io.BytesIO(first)))[-1, -1, 2] == 40
+    assert np.asarray(Image.open(io.BytesIO(second)))[-1, -1, 2] == 90
+
+
+async def test_battery_not_received(hass):
+    """No battery level in the vacuum state: no battery in the status text."""
+    camera = _make_camera(hass)
+    camera._mqtt.state.update(connection="ready", status="docked")
+    assert camera._shared.vacuum_battery is None
+    camera._set_frame(Image.new("RGBA", (600, 400)))
+    assert await camera.async_camera_image()
@@ -0,0 +1,62 @@
+"""Tests of the MQTT connector."""
+
+import zlib
+
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+
+BASE_TOPIC = "valetudo/test"
+MAP_TOPIC = f"{BASE_TOPIC}/MapData/map-data"
+STATUS_TOPIC = f"{BASE_TOPIC}/StatusStateAttribute/status"
+
+
+class _Message:
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+async def test_duplicate_map_payloads_dropped():
+    """The same map is dropped unless the status changed since the last one."""
+    shared = CameraShared()
+    shared.file_name = "test"
+    connector = ValetudoConnector(BASE_TOPIC, None, shared)
+    connector.register_topic_handlers()
+    payload = zlib.compress(b'{"layers": [], "entities": []}')
+
+    await connector.async_message_received(_Message(MAP_TOPIC, payload))
+    assert await connector.is_data_available()
+    result, data_type = await connector.update_data(True)
+    assert data_type == "Hypfer" and result["layers"] == []
+
+    await connector.async_message_received(_Message(MAP_TOPIC, payload))
+    assert not await connector.is_data_available()  # Same map, dropped.
+
+    await connector.async_message_received(_Message(STATUS_TOPIC, b"cleaning"))
+    await connector.async_message_received(_Message(MAP_TOPIC, payload))
+    assert await connector.is_data_available()  # Status changed, accepted.
+    await connector.discard_data()
+
+    await connector.async_message_received(_Message(MAP_TOPIC, payload))
+    assert not await connector.is_data_available()
+
+    diagnostics = connector.get_diagnostics()
+    assert diagnostics["payloads_received"] == 4
+    assert diagnostics["payloads_dropped"] == 2
+    assert diagnostics["dedup_hit_rate"] == 0.5
+
+
+async def test_rand256_docked_without_battery():
+    """A Rand256 docked state without the battery level is accepted."""
+    shared = CameraShared()
+    shared.file_name = "test"
+    connector = ValetudoConnector(BASE_TOPIC, None, shared)
+    connector.register_topic_handlers()
+    await connector.async_message_received(
+        _Message(f"{BASE_TOPIC}/state", b'{"state": "docked"}')
+    )
+    assert connector.state.state.status == "docked"
+    assert connector.state.state.battery is None
+    assert not connector._data_in
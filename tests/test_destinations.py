@@ -0,0 +1,28 @@
+"""Tests of the Rand256 destinations index."""
+
+import json
+
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.destinations import (
+    Destinations,
+)
+
+PAYLOAD = json.dumps(
+    {
+        "rooms": [{"id": 16, "name": "Kitchen"}, {"id": 17, "name": "Bedroom"}],
+        "zones": [
+            {"name": "Sofa", "coordinates": [[100, 200, 300, 400, 1]]},
+            {"name": "Empty", "coordinates": []},
+        ],
+        "spots": [{"name": "Door", "coordinates": [250, 350]}],
+    }
+)
+
+
+def test_destinations_index():
+    """The payload is parsed once into rooms, zones and spots."""
+    destinations = Destinations.from_payload(PAYLOAD)
+    assert destinations.payload_hash == Destinations.payload_digest(PAYLOAD.encode())
+    assert destinations.rooms[17].name == "Bedroom"
+    assert [zone.coordinates for zone in destinations.zones] == [[[100, 200, 300, 400]]]
+    assert destinations.spots[0].coordinates == [250, 350]
+    assert destinations.active_segments([17, 99]) == [0, 1]
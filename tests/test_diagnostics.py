@@ -0,0 +1,53 @@
+"""Tests of the config entry diagnostics."""
+
+from PIL import Image
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.valetudo_vacuum_camera.camera import ValetudoCamera
+from custom_components.valetudo_vacuum_camera.const import DEFAULT_VALUES, DOMAIN
+from custom_components.valetudo_vacuum_camera.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+REDACTED = "**REDACTED**"
+
+
+def _add_entry(hass) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        options={
+            **DEFAULT_VALUES,
+            "vacuum_map": "valetudo/myvacuum",
+            "broker_password": "secret",
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_diagnostics_without_camera(hass):
+    """The options are redacted, no camera data before the camera is added."""
+    entry = _add_entry(hass)
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["camera"] is None
+    assert diagnostics["options"]["vacuum_map"] == REDACTED
+    assert diagnostics["options"]["broker_password"] == REDACTED
+    assert diagnostics["options"]["rotate_image"] == DEFAULT_VALUES["rotate_image"]
+    assert diagnostics["loop_watchdog"]["enabled"] is False
+
+
+async def test_diagnostics_with_camera(hass):
+    """The camera performance data, without the vacuum name."""
+    entry = _add_entry(hass)
+    camera = ValetudoCamera(hass, {**DEFAULT_VALUES, "vacuum_map": "valetudo/myvacuum"})
+    camera._set_frame(Image.new("RGBA", (60, 40)))
+    await camera.async_camera_image()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"camera": camera}
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    camera_data = diagnostics["camera"]
+    assert camera_data["file_name"] == REDACTED
+    assert "myvacuum" not in str(diagnostics)
+    assert camera_data["frame_version"] == 1
+    assert camera_data["encoder_cache"]["entries"] == 1
+    assert camera_data["frame_buffers"]["frame"] == 60 * 40 * 4
+    assert camera_data["mqtt"]["parser_mode"] is None
@@ -0,0 +1,104 @@
+"""Tests of the live stream frames broadcast."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from PIL import Image
+import pytest
+
+from custom_components.valetudo_vacuum_camera.camera import ValetudoCamera
+from custom_components.valetudo_vacuum_camera.const import DEFAULT_VALUES
+from custom_components.valetudo_vacuum_camera.utils.frame_broadcast import (
+    FrameBroadcast,
+    multipart_frame,
+)
+
+
+async def test_publish_slow_viewer():
+    """A slow viewer gets only the last frame, the older one is dropped."""
+    broadcast = FrameBroadcast("test")
+    fast, slow = broadcast.subscribe(), broadcast.subscribe()
+    broadcast.publish(1, b"frame 1")
+    assert await fast.get() == (1, b"frame 1")
+    broadcast.publish(2, b"frame 2")
+    broadcast.publish(2, b"same version")
+    broadcast.publish(3, b"")
+    assert await fast.get() == (2, b"frame 2")
+    assert slow.qsize() == 1
+    assert await slow.get() == (2, b"frame 2")
+
+
+async def test_unsubscribe():
+    """An unsubscribed viewer gets no more frames."""
+    broadcast = FrameBroadcast("test")
+    queue = broadcast.subscribe()
+    assert broadcast.has_viewers and broadcast.viewers == 1
+    broadcast.unsubscribe(queue)
+    broadcast.unsubscribe(queue)
+    broadcast.publish(1, b"frame")
+    assert not broadcast.has_viewers
+    assert queue.empty()
+
+
+def test_multipart_frame():
+    """The frame is a part of the x-mixed-replace stream."""
+    assert multipart_frame("image/png", b"\x89PNG") == (
+        b"--frameboundary\r\n"
+        b"Content-Type: image/png\r\n"
+        b"Content-Length: 4\r\n\r\n"
+        b"\x89PNG\r\n"
+    )
+
+
+def _make_stream_camera(hass) -> tuple[ValetudoCamera, MagicMock]:
+    """Camera with a frame and the response of its stream."""
+    device_info = {**DEFAULT_VALUES, "vacuum_map": "valetudo/test"}
+    camera = ValetudoCamera(hass, device_info)
+    camera._set_frame(Image.new("RGBA", (60, 40)))
+    response = MagicMock()
+    response.prepare = AsyncMock()
+    response.write = AsyncMock()
+    return camera, response
+
+
+async def _first_frame_written(response: MagicMock) -> bytes:
+    """Wait for the first frame of the stream (encoded in the executor)."""
+    async with asyncio.timeout(5):
+        while not response.write.await_count:
+            await asyncio.sleep(0.01)
+    return response.write.await_args.args[0]
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError, ConnectionAbortedError])
+async def test_stream_viewer_disconnected(hass, error):
+    """The viewer is removed when the connection is lost."""
+    camera, response = _make_stream_camera(hass)
+    response.write.side_effect = [None, error()]
+    with patch(
+        "custom_components.valetudo_vacuum_camera.camera.web.StreamResponse",
+        return_value=response,
+    ):
+        stream = hass.async_create_task(camera.handle_async_mjpeg_stream(MagicMock()))
+        first = await _first_frame_written(response)
+        assert first.startswith(b"--frameboundary\r\nContent-Type: image/png\r\n")
+        camera._set_frame(Image.new("RGBA", (60, 40), (255, 0, 0, 255)))
+        await camera._async_publish_frame()
+        assert await stream is response
+    assert response.write.await_count == 2
+    assert not camera._broadcast.has_viewers
+
+
+async def test_stream_cancelled(hass):
+    """The viewer is removed when the stream is cancelled."""
+    camera, response = _make_stream_camera(hass)
+    with patch(
+        "custom_components.valetudo_vacuum_camera.camera.web.StreamResponse",
+        return_value=response,
+    ):
+        stream = hass.async_create_task(camera.handle_async_mjpeg_stream(MagicMock()))
+        await _first_frame_written(response)
+        assert camera._broadcast.viewers == 1
+        stream.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await stream
+    assert not camera._broadcast.has_viewers
@@ -0,0 +1,63 @@
+"""Tests of the camera frames encoder."""
+
+from io import BytesIO
+
+from PIL import Image
+import numpy as np
+import pytest
+
+from custom_components.valetudo_vacuum_camera.utils.image_encoder import ImageEncoder
+
+
+def test_quantize_round_trip(make_shared, hypfer_frame):
+    """The exact quantization keeps the RGBA pixels (and the transparency)."""
+    frame = hypfer_frame.convert("RGBA")
+    pixels = np.asarray(frame).copy()
+    pixels[:10, :10] = (0, 0, 0, 0)  # Transparent corner.
+    frame = Image.fromarray(pixels, mode="RGBA")
+    p_img = ImageEncoder.quantize_to_palette(frame)
+    assert p_img.mode == "P"
+    assert np.array_equal(np.asarray(p_img.convert("RGBA")), pixels)
+    encoded = ImageEncoder(make_shared(png_indexed=True)).to_png_bytes(frame)
+    decoded = Image.open(BytesIO(encoded))
+    assert decoded.mode == "P"
+    assert np.array_equal(np.asarray(decoded.convert("RGBA")), pixels)
+
+
+@pytest.mark.parametrize(
+    ("codec", "content_type", "image_format"),
+    [
+        ("png", "image/png", "PNG"),
+        ("webp", "image/webp", "WEBP"),
+        ("jpeg", "image/jpeg", "JPEG"),
+        ("bmp", "image/png", "PNG"),  # Not supported, png.
+    ],
+)
+def test_codecs(make_shared, hypfer_frame, codec, content_type, image_format):
+    """Each codec has its content type and its bytes decode to the frame size."""
+    encoder = ImageEncoder(make_shared(image_codec=codec))
+    assert encoder.content_type == content_type
+    decoded = Image.open(BytesIO(encoder.encode(hypfer_frame, 1)))
+    assert decoded.format == image_format
+    assert decoded.size == hypfer_frame.size
+    decoded.load()
+
+
+def test_variants_cache(make_shared, hypfer_frame):
+    """The variants are cached by (version, width, height, codec)."""
+    shared = make_shared()
+    encoder = ImageEncoder(shared)
+    full = encoder.encode(hypfer_frame, 1)
+    small = encoder.encode(hypfer_frame, 1, 200, 200)
+    assert encoder.get_cached(1) is full
+    assert encoder.get_cached(1, 200, 200) is small
+    assert max(Image.open(BytesIO(small)).size) <= 200
+    assert encoder.get_cached(1, 100, 100) is None  # Other size.
+    shared.image_codec = "webp"
+    assert encoder.get_cached(1) is None  # Other codec.
+    shared.image_codec = "png"
+    encoder.encode(hypfer_frame, 2)
+    assert encoder.get_cached(1) is None  # A new version evicts the old ones.
+    assert encoder.get_cached(1, 200, 200) is None
+    assert encoder.get_cached(2) is not None
+    assert encoder.get_stats()["misses"] == 3
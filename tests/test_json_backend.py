@@ -0,0 +1,44 @@
+"""Tests of the map JSON decoder backend."""
+
+import builtins
+import json
+
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.utils import json_backend
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+
+MAP_BYTES = b'{"size": {"x": 5120, "y": 5120}, "layers": [], "name": "\xc3\xa9"}'
+
+
+def test_orjson_backend():
+    """orjson is shipped with Home Assistant, it is the backend."""
+    name, loads = json_backend._select_backend()
+    assert name == "orjson"
+    assert loads(MAP_BYTES) == json.loads(MAP_BYTES)
+
+
+def test_stdlib_fallback(monkeypatch):
+    """Without orjson the json standard library decodes the bytes."""
+    real_import = builtins.__import__
+
+    def import_without_orjson(name, *args, **kwargs):
+        if name == "orjson":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", import_without_orjson)
+    name, loads = json_backend._select_backend()
+    assert name == "json"
+    assert loads is json.loads
+    assert loads(MAP_BYTES)["name"] == "é"
+
+
+def test_backend_in_diagnostics():
+    """The backend used is reported in the MQTT diagnostics."""
+    shared = CameraShared()
+    shared.file_name = "test"
+    connector = ValetudoConnector("valetudo/test", None, shared)
+    diagnostics = connector.get_diagnostics()
+    assert diagnostics["json_backend"] == json_backend.JSON_BACKEND == "orjson"
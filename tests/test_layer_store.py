@@ -0,0 +1,67 @@
+"""Tests of the memory mapped base layers."""
+
+import os
+
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.utils.layer_store import LayerStore
+
+
+def _layer(shape=(40, 60, 4), value: int = 7, dtype=np.uint8):
+    return np.full(shape, value, dtype=dtype)
+
+
+def test_layer_reused(tmp_path):
+    """The same file is reused at each rebuild and by a new store."""
+    store = LayerStore(str(tmp_path), "test")
+    first = store.store("base", _layer(value=1))
+    assert isinstance(first, np.memmap)
+    assert store.store("base", _layer(value=2)) is first
+    assert store.get_stats() == {"base": 40 * 60 * 4}
+    (layer_file,) = tmp_path.iterdir()
+    inode = os.stat(layer_file).st_ino
+    store.close()
+    assert store.get_stats() == {}
+    # After a restart the file is opened again, not created.
+    restarted = LayerStore(str(tmp_path), "test")
+    assert (restarted._open("base", (40, 60, 4), np.uint8) == 2).all()
+    restarted.store("base", _layer(value=3))
+    assert os.stat(layer_file).st_ino == inode
+    restarted.close()
+    assert (np.load(layer_file) == 3).all()
+
+
+def test_layer_recreated(tmp_path):
+    """A new shape or type creates the layer file again."""
+    store = LayerStore(str(tmp_path), "test")
+    store.store("base", _layer())
+    resized = store.store("base", _layer(shape=(20, 30, 4)))
+    assert resized.shape == (20, 30, 4)
+    labels = store.store("base", _layer(shape=(20, 30), dtype=np.int16))
+    assert labels.dtype == np.int16 and (labels == 7).all()
+    store.close()
+    assert np.load(tmp_path / "test_base.mmap.npy").shape == (20, 30)
+
+
+def test_invalid_layer_file(tmp_path):
+    """A truncated layer file is created again."""
+    (tmp_path / "test_base.mmap.npy").write_bytes(b"\x93NUMPY")
+    store = LayerStore(str(tmp_path), "test")
+    assert (store.store("base", _layer()) == 7).all()
+    store.close()
+
+
+def test_unreadable_layer_file(tmp_path, monkeypatch):
+    """A layer file that can't be opened is created again."""
+    LayerStore(str(tmp_path), "test").store("base", _layer())
+    open_memmap = np.lib.format.open_memmap
+
+    def open_or_fail(filename, mode="r+", **kwargs):
+        if mode == "r+":
+            raise OSError("I/O error")
+        return open_memmap(filename, mode=mode, **kwargs)
+
+    monkeypatch.setattr(np.lib.format, "open_memmap", open_or_fail)
+    store = LayerStore(str(tmp_path), "test")
+    assert (store.store("base", _layer(value=9)) == 9).all()
+    store.close()
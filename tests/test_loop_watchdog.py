@@ -0,0 +1,54 @@
+"""Tests of the event loop watchdog test helper."""
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.valetudo_vacuum_camera.utils.loop_watchdog import (
+    LOOP_WATCHDOG,
+    assert_no_loop_stall,
+    watched,
+)
+
+
+@watched
+async def _cooperative_entry_point() -> str:
+    for _ in range(3):
+        await asyncio.sleep(0.02)
+    return "done"
+
+
+@watched
+async def _blocking_entry_point() -> str:
+    await asyncio.sleep(0)
+    time.sleep(0.1)
+    return "done"
+
+
+async def test_no_loop_stall_passes():
+    """The awaited time is not a stall."""
+    with assert_no_loop_stall(threshold=0.05):
+        assert await _cooperative_entry_point() == "done"
+    assert not LOOP_WATCHDOG.enabled
+
+
+async def test_loop_stall_fails():
+    """A blocking call of a watched coroutine fails with the stack sample."""
+    with pytest.raises(AssertionError, match="_blocking_entry_point"):
+        with assert_no_loop_stall(threshold=0.05) as stalls:
+            assert await _blocking_entry_point() == "done"
+    assert stalls[0]["duration"] >= 50
+    assert "time.sleep" in stalls[0]["stack"]
+    assert not LOOP_WATCHDOG.enabled
+
+
+async def test_plain_coroutine_is_measured():
+    """A coroutine not decorated can be measured with the watchdog run."""
+
+    async def stage():
+        time.sleep(0.1)
+
+    with pytest.raises(AssertionError, match="stage"):
+        with assert_no_loop_stall(threshold=0.05):
+            await LOOP_WATCHDOG.run("stage", stage())
@@ -0,0 +1,106 @@
+"""Tests of the compact map model of the image handlers."""
+
+import os
+
+import numpy as np
+from PIL import Image
+
+from custom_components.valetudo_vacuum_camera.utils.map_model import MapModel
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler import (
+    MapImageHandler,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.image_handler import (
+    ReImageHandler,
+)
+
+# Frames rendered (default options) before the handlers used the map model.
+HYPFER_RENDER = os.path.join(os.path.dirname(__file__), "hypfer_render.png")
+RAND256_RENDER = os.path.join(os.path.dirname(__file__), "rand256_render.png")
+
+
+def _assert_int32(array, columns: int) -> None:
+    assert array.dtype == np.int32
+    assert array.ndim == 2 and array.shape[1] == columns
+
+
+def _assert_same_render(pil_img, reference: str) -> None:
+    with Image.open(reference) as expected:
+        assert np.array_equal(
+            np.asarray(pil_img.convert("RGBA")), np.asarray(expected.convert("RGBA"))
+        )
+
+
+def test_hypfer_model(hypfer_map):
+    """The Hypfer layers are (N, 3) runs, the entities (N, 2) points."""
+    model = MapModel.from_hypfer(hypfer_map)
+    assert (model.firmware, model.size_x, model.size_y) == ("Hypfer", 5120, 5120)
+    assert model.pixel_size == 5
+    assert model.json_id == hypfer_map["metaData"]["nonce"]
+    assert [layer.type for layer in model.layers] == ["floor", "wall"]
+    for layer, json_layer in zip(model.layers, hypfer_map["layers"]):
+        _assert_int32(layer.runs, 3)
+        assert layer.runs.ravel().tolist() == json_layer["compressedPixels"]
+    assert sorted(model.entities) == ["charger_location", "path", "robot_position"]
+    (path,) = model.get_entities("path")
+    _assert_int32(path.points, 2)
+    json_path = next(e for e in hypfer_map["entities"] if e["type"] == "path")
+    assert path.points.ravel().tolist() == json_path["points"]
+    (robot,) = model.get_entities("robot_position")
+    assert robot.points.shape == (1, 2) and robot.angle == 270.0
+    assert model.get_entities("obstacle") == []
+    assert model.get_segments() == []
+
+
+def test_rand256_model(rand256_map):
+    """The Rand256 data is converted to the Valetudo coordinates."""
+    model = MapModel.from_rand256(rand256_map)
+    assert (model.firmware, model.size_x, model.pixel_size) == ("Rand256", 5120, 5)
+    assert [layer.type for layer in model.layers] == [
+        "floor",
+        "segment",
+        "segment",
+        "segment",
+        "wall",
+    ]
+    assert [layer.segment_id for layer in model.get_segments()] == (
+        rand256_map["image"]["segments"]["id"]
+    )
+    for layer in model.layers:
+        _assert_int32(layer.runs, 3)
+        assert len(layer.runs) and (layer.runs[:, 2] > 0).all()
+    assert sorted(model.entities) == [
+        "active_zone",
+        "charger_location",
+        "no_go_area",
+        "path",
+        "robot_position",
+        "virtual_wall",
+    ]
+    for entities in model.entities.values():
+        for entity in entities:
+            _assert_int32(entity.points, 2)
+    (robot,) = model.get_entities("robot_position")
+    robot_x, robot_y = rand256_map["robot"]
+    assert robot.points.tolist() == [[robot_x // 10, (51200 - robot_y) // 10]]
+    (path,) = model.get_entities("path")
+    points = rand256_map["path"]["points"]
+    assert path.points.shape == (len(points), 2)
+    assert path.points[0].tolist() == [value // 10 for value in points[0]]
+    (zone,) = model.get_entities("active_zone")
+    assert zone.points.shape == (4, 2)
+
+
+async def test_hypfer_render_unchanged(make_shared, hypfer_map):
+    """The Hypfer frame is the same rendered from the decoded json."""
+    pil_img = await MapImageHandler(make_shared()).async_get_image_from_json(
+        m_json=hypfer_map
+    )
+    _assert_same_render(pil_img, HYPFER_RENDER)
+
+
+async def test_rand256_render_unchanged(make_shared, rand256_map):
+    """The Rand256 frame is the same rendered from the parsed map."""
+    pil_img = await ReImageHandler(make_shared()).get_image_from_rrm(
+        m_json=rand256_map
+    )
+    _assert_same_render(pil_img, RAND256_RENDER)
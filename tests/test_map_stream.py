@@ -0,0 +1,70 @@
+"""Tests of the Hypfer map stream decoder."""
+
+import json
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.map_stream import (
+    MapStreamDecoder,
+)
+
+
+def _map_payload() -> bytes:
+    """Return the compressed map JSON of the sample (zTXt chunk of the PNG)."""
+    with open("tests/mqtt_data.raw", "rb") as file:
+        data = file.read()
+    position = 8  # PNG signature.
+    while position < len(data):
+        size, chunk_type = struct.unpack(">I4s", data[position : position + 8])
+        body = data[position + 8 : position + 8 + size]
+        if chunk_type == b"zTXt" and body.startswith(b"ValetudoMap\0"):
+            return body[len(b"ValetudoMap\0") + 1 :]  # After the method byte.
+        position += 12 + size
+    raise AssertionError("No map in the sample.")
+
+
+def _as_lists(value):
+    """Return the decoded map with the numpy arrays as lists."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _as_lists(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_as_lists(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 17, 64, 1000, 4096, 65536])
+def test_stream_decode_matches_json(chunk_size):
+    """The map is the same of json.loads, whatever the chunk boundaries."""
+    payload = _map_payload()
+    expected = json.loads(zlib.decompress(payload))
+    assert any(layer["compressedPixels"] for layer in expected["layers"])
+    decoded = MapStreamDecoder(chunk_size=chunk_size).decode(payload)
+    assert _as_lists(decoded) == expected
+
+
+def test_stream_decode_empty_pixels():
+    """An empty pixels array is decoded as an empty array."""
+    payload = zlib.compress(b'{"layers": [{"compressedPixels": []}]}')
+    decoded = MapStreamDecoder(chunk_size=5).decode(payload)
+    assert decoded["layers"][0]["compressedPixels"].tolist() == []
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        zlib.compress(b'{"layers": [{"compressedPixels": [1, 2, 3')[:-4],
+        zlib.compress(b'{"layers": [{"compressedPixels": [1, 2, 3'),
+        _map_payload()[:-200],
+        zlib.compress(b'{"layers": [{"compressedPixels": [1, 2, x, 4]}]}'),
+        zlib.compress(b'{"layers": [{"compressedPixels": [1, 2,, 4]}]}'),
+    ],
+)
+def test_stream_decode_invalid(payload):
+    """A truncated or corrupt map raises ValueError, no pixels are lost."""
+    with pytest.raises(ValueError):
+        MapStreamDecoder(chunk_size=7).decode(payload)
@@ -0,0 +1,76 @@
+"""Tests of the process metrics sampler and the metrics sensors."""
+
+from unittest.mock import MagicMock
+
+from custom_components.valetudo_vacuum_camera.sensor import (
+    SENSORS,
+    CameraMetricsSensor,
+)
+from custom_components.valetudo_vacuum_camera.utils.metrics import (
+    CameraMetrics,
+    ProcessMetrics,
+)
+
+SENSOR_KEYS = [description.key for description in SENSORS]
+
+
+def test_process_sample():
+    """The process CPU and memory are sampled."""
+    process = ProcessMetrics()
+    process.sample()
+    process.sample()
+    assert process.cpu_percent >= 0
+    assert process.rss_mb > 0
+    assert 0 < process.memory_percent < 100
+
+
+async def test_shared_sampler(hass):
+    """One sampler at the shortest interval, stopped with the last camera."""
+    process = ProcessMetrics()
+    process.async_start(hass, "entry_1", 30)
+    process.async_start(hass, "entry_2", 10)
+    await hass.async_block_till_done()
+    assert process._interval == 10
+    assert process.rss_mb is not None
+    process.async_stop("entry_2")
+    assert process._interval == 30
+    process.async_stop("entry_1")
+    assert not process.in_use
+    assert process._unsub_sampler is None
+
+
+def test_camera_metrics_listeners():
+    """The camera listeners are called at each render and process sample."""
+    process = ProcessMetrics()
+    metrics = CameraMetrics("test", process)
+    listener = MagicMock()
+    remove_listener = metrics.add_listener(listener)
+    metrics.record_render(0.25)
+    process._notify()
+    assert listener.call_count == 2
+    remove_listener()
+    metrics.record_render(0.5)
+    process._notify()
+    assert listener.call_count == 2
+    assert metrics.frames_rendered == 2
+
+
+def test_sensors_values():
+    """The sensors publish the process metrics and the camera render time."""
+    process = ProcessMetrics()
+    process.cpu_percent, process.rss_mb = 3.5, 512.0
+    metrics = CameraMetrics("test", process)
+    metrics.record_render(0.1234)
+    config = {"unique_id": "test_camera", "vacuum_map": "valetudo/test"}
+    sensors = [CameraMetricsSensor(config, metrics, item) for item in SENSORS]
+    assert [sensor.native_value for sensor in sensors] == [3.5, 512.0, 123.4]
+    assert [sensor.unique_id for sensor in sensors] == [
+        f"test_camera_{key}" for key in SENSOR_KEYS
+    ]
+
+
+def test_sensors_unique_id_from_topic():
+    """No unique id in the config: it is computed from the vacuum topic."""
+    config = {"unique_id": None, "vacuum_map": "valetudo/MyVacuum"}
+    sensor = CameraMetricsSensor(config, CameraMetrics(), SENSORS[0])
+    assert sensor.unique_id == f"myvacuum_camera_{SENSOR_KEYS[0]}"
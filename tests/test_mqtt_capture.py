@@ -0,0 +1,80 @@
+"""Tests of the MQTT capture recorder and replay."""
+
+import os
+import zlib
+
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.capture import (
+    MqttRecorder,
+    MqttReplay,
+    read_capture,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+
+BASE_TOPIC = "valetudo/test"
+
+
+def _record(tmp_path) -> str:
+    recorder = MqttRecorder(str(tmp_path), "test", BASE_TOPIC)
+    recorder.record(f"{BASE_TOPIC}/StatusStateAttribute/status", b"cleaning", 0.0)
+    recorder.record(f"{BASE_TOPIC}/BatteryStateAttribute/level", b"80", 0.5)
+    recorder.flush()
+    recorder.record(f"{BASE_TOPIC}/MapData/map-data", zlib.compress(b"{}"), 1.0)
+    recorder.flush()
+    return recorder.file_path
+
+
+def test_capture_round_trip(tmp_path):
+    """The messages of all the flushes are read back in order."""
+    messages = list(read_capture(_record(tmp_path), "valetudo/other"))
+    assert [m.topic for m in messages] == [
+        "valetudo/other/StatusStateAttribute/status",
+        "valetudo/other/BatteryStateAttribute/level",
+        "valetudo/other/MapData/map-data",
+    ]
+    assert [m.timestamp for m in messages] == [0.0, 0.5, 1.0]
+    assert messages[1].payload == b"80"
+
+
+async def test_replay_in_connector(tmp_path):
+    """The replayed messages reach the connector handlers without broker."""
+    shared = CameraShared()
+    shared.file_name = "test"
+    connector = ValetudoConnector(BASE_TOPIC, None, shared)
+    stats = await MqttReplay(connector, BASE_TOPIC).async_replay(
+        _record(tmp_path), speed=0
+    )
+    assert stats["messages"] == 3
+    assert await connector.get_vacuum_status() == "cleaning"
+    assert await connector.get_battery_level() == "80"
+    assert await connector.is_data_available()
+    assert connector.get_topic_stats()["MapData/map-data"]["messages"] == 1
+
+
+def test_capture_limit(tmp_path):
+    """The recording stops at the max size, the capture is still readable."""
+    recorder = MqttRecorder(str(tmp_path), "test", BASE_TOPIC, max_size=120)
+    for timestamp in range(5):
+        recorder.record(f"{BASE_TOPIC}/map_data", b"x" * 30, float(timestamp))
+    assert recorder.stopped
+    recorder.flush()
+    assert recorder.messages == 2
+    assert [m.timestamp for m in read_capture(recorder.file_path)] == [0.0, 1.0]
+    # The size of the capture file counts after a restart.
+    file_size = os.path.getsize(recorder.file_path)
+    recorder = MqttRecorder(str(tmp_path), "test", BASE_TOPIC, max_size=file_size)
+    assert not recorder.record(f"{BASE_TOPIC}/map_data", b"x" * 30, 0.0)
+    assert recorder.stopped
+
+
+def test_truncated_capture(tmp_path):
+    """The messages before a truncated record are read."""
+    file_path = _record(tmp_path)
+    with open(file_path, "rb") as file:
+        data = file.read()
+    with open(file_path, "wb") as file:
+        file.write(data[:-10])
+    messages = list(read_capture(file_path))
+    assert [m.timestamp for m in messages] == [0.0, 0.5]
@@ -0,0 +1,62 @@
+"""Tests of the palette (8-bit indexed) rendering mode."""
+
+import copy
+
+import numpy as np
+import pytest
+
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler import (
+    MapImageHandler,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.image_handler import (
+    ReImageHandler,
+)
+
+
+def _assert_parity(palette_image, rgba_image) -> None:
+    assert palette_image.mode == "P"
+    assert np.array_equal(
+        np.asarray(palette_image.convert("RGBA")), np.asarray(rgba_image)
+    )
+
+
+@pytest.mark.parametrize("active_zones", [False, True])
+async def test_hypfer_palette_parity(make_shared, hypfer_map, active_zones):
+    """The Hypfer palette frame has the same pixels of the RGBA frame."""
+    m_json = copy.deepcopy(hypfer_map)
+    if active_zones:
+        # Two rooms on the floor, the first one active (tinted): the floor is
+        # drawn with the colour of the first room, not tinted.
+        floor = m_json["layers"][0]
+        runs = floor["compressedPixels"]
+        third = len(runs) // 9 * 3
+        for segment_id in (1, 2):
+            segment = copy.deepcopy(floor)
+            segment["type"] = "segment"
+            segment["compressedPixels"] = runs[(segment_id - 1) * third :][:third]
+            segment["metaData"].update(
+                segmentId=str(segment_id),
+                name=f"Room {segment_id}",
+                active=segment_id == 1,
+            )
+            m_json["layers"].append(segment)
+    images = [
+        await MapImageHandler(
+            make_shared(palette_mode=palette_mode)
+        ).async_get_image_from_json(m_json=m_json)
+        for palette_mode in (True, False)
+    ]
+    _assert_parity(*images)
+
+
+@pytest.mark.parametrize("active_zones", [None, [1, 0, 1]])
+async def test_rand256_palette_parity(make_shared, rand256_map, active_zones):
+    """The Rand256 palette frame has the same pixels of the RGBA frame."""
+    images = []
+    for palette_mode in (True, False):
+        shared = make_shared(palette_mode=palette_mode)
+        shared.rand256_active_zone = active_zones
+        images.append(
+            await ReImageHandler(shared).get_image_from_rrm(m_json=rand256_map)
+        )
+    _assert_parity(*images)
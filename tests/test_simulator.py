@@ -0,0 +1,56 @@
+"""Tests of the simulated vacuum used by the load tests."""
+
+import gzip
+
+from benchmarks.simulator import InProcessMqtt, VacuumSimulator
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.utils.map_model import MapModel
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+from custom_components.valetudo_vacuum_camera.valetudo.rand256.rrparser import (
+    RRMapParser,
+)
+
+
+def test_firmwares_same_map():
+    """The Hypfer and the Rand256 payloads describe the same house and robot."""
+    options = {"house_m": (6.0, 4.0), "rooms": 3, "path_length": 300, "frames": 3}
+    hypfer = MapModel.from_hypfer(
+        VacuumSimulator("valetudo/a", "Hypfer", **options).hypfer_map(1)
+    )
+    payload = VacuumSimulator("valetudo/b", "Rand256", **options).rand256_payload(1)
+    rand256 = MapModel.from_rand256(
+        RRMapParser().parse_data(gzip.decompress(payload), pixels=True)
+    )
+    for model in (hypfer, rand256):
+        assert len(model.get_segments()) == 3
+    for entity in ("robot_position", "charger_location", "path"):
+        assert (
+            hypfer.get_entities(entity)[0].points.tolist()
+            == rand256.get_entities(entity)[0].points.tolist()
+        )
+    hypfer_layers, _ = hypfer.find_layers()
+    rand256_layers, _ = rand256.find_layers()
+    for layer_type in ("segment", "wall"):
+        assert sum(runs[:, 2].sum() for runs in hypfer_layers[layer_type]) == sum(
+            runs[:, 2].sum() for runs in rand256_layers[layer_type]
+        )
+
+
+async def test_rand256_run_in_connector():
+    """The connector receives the maps and the destinations from the stand-in."""
+    broker = InProcessMqtt()
+    shared = CameraShared()
+    shared.file_name = "test"
+    connector = ValetudoConnector("valetudo/test", None, shared, mqtt_client=broker)
+    await connector.async_subscribe_to_topics()
+    simulator = VacuumSimulator("valetudo/test", "Rand256", frames=2, rooms=2)
+    await simulator.async_run(broker, None, speed=0)
+    assert await connector.is_data_available()
+    assert await connector.get_vacuum_status() == "docked"
+    destinations = await connector.get_destinations()
+    assert [room.name for room in destinations.rooms.values()] == ["Room 1", "Room 2"]
+    result, data_type = await connector.update_data(True)
+    assert data_type == "Rand256"
+    assert sorted(result["image"]["segments"]["id"]) == [1, 2]
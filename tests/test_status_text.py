@@ -0,0 +1,73 @@
+"""Tests of the status text translations and strips caches."""
+
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.utils import drawable
+from custom_components.valetudo_vacuum_camera.utils.drawable import (
+    DEFAULT_FONT,
+    Drawable,
+)
+from custom_components.valetudo_vacuum_camera.utils.status_text import StatusText
+
+
+def _write_translations(path, docked: str, mtime_ns: int) -> None:
+    translations = {"selector": {"vacuum_status": {"options": {"docked": docked}}}}
+    path.write_text(json.dumps(translations))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_translations_cache(tmp_path):
+    """The translations file is read again only when modified."""
+    translations_file = tmp_path / "en.json"
+    _write_translations(translations_file, "Docked", 1_000_000_000)
+    hass = MagicMock()
+    hass.config.path.return_value = str(tmp_path)
+    shared = CameraShared()
+    shared.file_name = "test"
+    shared.vacuum_state, shared.user_language = "docked", "en"
+    status_text = StatusText(hass, shared)
+    translations = status_text.load_translations("en")
+    assert status_text.load_translations("en") is translations
+    assert status_text.translate_vacuum_status() == "Docked"
+    _write_translations(translations_file, "At the dock", 2_000_000_000)
+    assert status_text.load_translations("en") is not translations
+    assert status_text.translate_vacuum_status() == "At the dock"
+    assert status_text.load_translations("missing") is None
+
+
+@pytest.fixture
+def strips(monkeypatch):
+    """Empty strips cache."""
+    monkeypatch.setattr(drawable, "_strips", type(drawable._strips)())
+    return drawable._strips
+
+
+def test_strip_cache_key(strips):
+    """A strip is drawn again only when the text, colour, size or width change."""
+    args = (400, 20, (255, 255, 255, 255), ["Docked", " 100%"], DEFAULT_FONT)
+    strip = Drawable.status_text_strip(*args)
+    assert strip.size[0] == 400
+    assert Drawable.status_text_strip(*args) is strip
+    changed = [
+        (600, *args[1:]),
+        (args[0], 30, *args[2:]),
+        (*args[:2], (255, 0, 0, 255), *args[3:]),
+        (*args[:3], ["Cleaning", " 80%"], args[4]),
+    ]
+    for changed_args in changed:
+        assert Drawable.status_text_strip(*changed_args) is not strip
+    assert len(strips) == 5
+
+
+def test_strip_cache_size(strips):
+    """The least recently used strips are dropped."""
+    size = drawable.STRIPS_CACHE_SIZE
+    for width in range(100, 100 + size + 2):
+        Drawable.status_text_strip(width, 20, (0, 0, 0, 255), ["Idle"], DEFAULT_FONT)
+    assert len(strips) == size
+    assert [key[0] for key in strips][0] == 102
@@ -0,0 +1,43 @@
+"""Tests of the render pipeline stage timings."""
+
+from custom_components.valetudo_vacuum_camera.utils.timings import StageTimings
+
+
+def _record(monkeypatch, timings: StageTimings, stage: str, durations) -> None:
+    """Record spans of the given durations (seconds) with a fake clock."""
+    clock = iter([value for duration in durations for value in (0.0, duration)])
+    monkeypatch.setattr(
+        "custom_components.valetudo_vacuum_camera.utils.timings.time.perf_counter",
+        lambda: next(clock),
+    )
+    for _ in durations:
+        timings.stop(stage, timings.start())
+
+
+def test_disabled_timings():
+    """Disabled: no start time and no samples."""
+    timings = StageTimings()
+    started = timings.start()
+    assert started is None
+    timings.stop("parse", started)
+    assert timings.summary() == {}
+
+
+def test_percentiles(monkeypatch):
+    """p50, p95 and max of the samples, in milliseconds."""
+    timings = StageTimings(enabled=True)
+    _record(monkeypatch, timings, "encode", [ms / 1000 for ms in range(100, 0, -1)])
+    assert timings.summary() == {
+        "encode": {"count": 100, "p50": 51.0, "p95": 95.0, "max": 100.0}
+    }
+    timings.reset()
+    assert timings.summary() == {}
+
+
+def test_window_eviction(monkeypatch):
+    """Only the last window samples of each stage are kept."""
+    timings = StageTimings(enabled=True, window=4)
+    _record(monkeypatch, timings, "trim", [ms / 1000 for ms in range(10, 0, -1)])
+    assert timings.summary() == {
+        "trim": {"count": 4, "p50": 3.0, "p95": 4.0, "max": 4.0}
+    }
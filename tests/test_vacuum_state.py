@@ -0,0 +1,34 @@
+"""Tests of the vacuum state store."""
+
+from custom_components.valetudo_vacuum_camera.camera_shared import CameraShared
+from custom_components.valetudo_vacuum_camera.valetudo.MQTT.connector import (
+    ValetudoConnector,
+)
+
+
+class _Message:
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+async def test_state_changes_notified():
+    """Only the changed fields are notified, a repeated message is not."""
+    shared = CameraShared()
+    shared.file_name = "test"
+    connector = ValetudoConnector("valetudo/test", None, shared)
+    connector.register_topic_handlers()
+    notified = []
+    unsubscribe = connector.state.subscribe(notified.append)
+    battery = "valetudo/test/BatteryStateAttribute/level"
+    for payload in (b"80", b"80", b"81"):
+        await connector.async_message_received(_Message(battery, payload))
+    await connector.async_message_received(
+        _Message("valetudo/test/StatusStateAttribute/status", b"cleaning")
+    )
+    assert notified == [{"battery"}, {"battery"}, {"status"}]
+    assert connector.state.versions["battery"] == 2
+    assert connector.state.state.battery == 81
+    unsubscribe()
+    await connector.async_message_received(_Message(battery, b"82"))
+    assert len(notified) == 3
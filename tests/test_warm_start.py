@@ -0,0 +1,49 @@
+"""Tests of the camera warm start (render state saved between the restarts)."""
+
+import copy
+
+import numpy as np
+
+from custom_components.valetudo_vacuum_camera.utils.warm_start import WarmStart
+from custom_components.valetudo_vacuum_camera.valetudo.hypfer.image_handler import (
+    MapImageHandler,
+)
+
+
+async def _render(shared, m_json, state=None):
+    handler = MapImageHandler(shared)
+    handler.warm_state = state
+    image = await handler.async_get_image_from_json(m_json=m_json)
+    return handler, np.asarray(image)
+
+
+async def test_warm_start_round_trip(tmp_path, make_shared, hypfer_map):
+    """The saved base layer is reused, the first frame is the same."""
+    m_json = hypfer_map
+    shared = make_shared()
+    handler, image = await _render(shared, m_json)
+    WarmStart(str(tmp_path), "test").save(shared, handler, b"frame", "image/png")
+
+    state = WarmStart(str(tmp_path), "test").load(make_shared())
+    assert state["frame"] == b"frame"
+    restored, restored_image = await _render(make_shared(), m_json, state)
+    assert restored.base_layer_builds == 0
+    assert np.array_equal(restored_image, image)
+
+
+async def test_warm_start_invalidated(tmp_path, make_shared, hypfer_map):
+    """Other options (render key) or another map (map hash): cold start."""
+    m_json = hypfer_map
+    shared = make_shared()
+    handler, _ = await _render(shared, m_json)
+    WarmStart(str(tmp_path), "test").save(shared, handler, b"frame", "image/png")
+
+    rotated = make_shared()
+    rotated.image_rotate = 90
+    assert WarmStart(str(tmp_path), "test").load(rotated) is None
+
+    other_map = copy.deepcopy(m_json)
+    other_map["layers"] = other_map["layers"][:-1]
+    state = WarmStart(str(tmp_path), "test").load(make_shared())
+    rebuilt, _ = await _render(make_shared(), other_map, state)
+    assert rebuilt.base_layer_builds == 1